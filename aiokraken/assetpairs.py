@@ -58,6 +58,8 @@ class AssetPairs:
                                             d.wsname in filter)})
         else:
             self._proxy = MappingProxyType({d.wsname: d for n, d in pairs.items() if d.wsname is not None})
+        # restnames and altnames to the wsname key, for constant time lookups
+        self._names = {name: w for w, d in self._proxy.items() for name in (d.altname, d.restname)}
 
     def __repr__(self):
         return repr(self._proxy)
@@ -66,12 +68,9 @@ class AssetPairs:
         return str(self._proxy)
 
     def __getitem__(self, item):
-        if item in self._proxy.keys():
-            return self._proxy[item]
-        else:
-            for v in self._proxy.values():
-                if item == v.restname or item == v.altname:
-                    return v
+        try:
+            return self._proxy[item if item in self._proxy else self._names[item]]
+        except KeyError:
             raise KeyError(f"{item} not found")
 
     def __iter__(self):
@@ -79,13 +78,7 @@ class AssetPairs:
         return iter(self._proxy.values())
 
     def __contains__(self, item):
-        if item in self._proxy.keys():
-            return True
-        else:
-            for v in self._proxy.values():
-                if item== v.restname or item == v.altname:
-                    return True
-            return False
+        return item in self._proxy or item in self._names
 
     def __len__(self):
         return len(self._proxy)
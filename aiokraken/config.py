@@ -24,6 +24,12 @@ KRAKEN_PERSIST_FILE = os.path.normpath(KRAKEN_PERSIST_FILE)
 KRAKEN_ACCOUNT_PERSIST_FILE = os.getenv('AIOKRAKEN_ACCOUNT_PERSIST', DEFAULT_KRAKEN_ACCOUNT_PERSIST)
 KRAKEN_ACCOUNT_PERSIST_FILE = os.path.normpath(KRAKEN_ACCOUNT_PERSIST_FILE)
 
+# What the clients learn (throttle rates, asset and pair names) is persisted only if this is set.
+# ex: AIOKRAKEN_STATE=~/.config/aiokraken/kraken.json
+KRAKEN_STATE_FILE = os.getenv('AIOKRAKEN_STATE')
+if KRAKEN_STATE_FILE is not None:
+    KRAKEN_STATE_FILE = os.path.normpath(os.path.expanduser(KRAKEN_STATE_FILE))
+
 # KRAKEN_DB_FILE = os.getenv('AIOKRAKEN_DB_FILE', DEFAULT_KRAKEN_DB_FILE)
 # KRAKEN_DB_FILE = os.path.normpath(KRAKEN_DB_FILE)
 
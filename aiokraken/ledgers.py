@@ -11,8 +11,41 @@ from aiokraken.assets import Assets
 from aiokraken.model.asset import Asset
 
 from aiokraken.rest import RestClient
+from aiokraken.rest.paginate import paginate
+from aiokraken.rest.stream import Columns
 
 from aiokraken.model.ledgerframe import ledgerframe, LedgerFrame
+from aiokraken.store import HistoryStore
+
+
+async def _retrieve(rest: RestClient, start: datetime = None, end: datetime = None,
+                    assets: typing.Optional[typing.List[typing.Union[Asset, str]]] = None,
+                    store: HistoryStore = None):
+
+    async def fetch(start, end, assets=None):
+        # retrieving *everything*, page after page (concurrent pages need a nonce window on the key)
+        ledgerinfos = dict()
+        async for page in paginate(lambda offset: rest.ledgers(start=start, end=end, asset=assets, offset=offset)):
+            ledgerinfos.update(page)
+        return ledgerinfos
+
+    if store is None:
+        # streaming pages straight into columns, for the frame
+        ledgercolumns = Columns()
+        async for page in paginate(lambda offset: rest.ledgers(start=start, end=end, asset=assets, offset=offset, columns=True)):
+            ledgercolumns.extend(page)
+        return ledgercolumns
+
+    # past data doesnt change : only retrieving what is not stored locally yet.
+    # The store has ledgers for all assets, we filter them here.
+    ledgerinfos = await store.sync(fetch, start=start, end=end)
+    if assets is None:
+        return ledgerinfos
+    if not all(isinstance(a, Asset) for a in assets):
+        cleanassets = await rest.retrieve_assets()
+        assets = [a if isinstance(a, Asset) else cleanassets[a] for a in assets]
+    restnames = {a.restname for a in assets}
+    return {i: l for i, l in ledgerinfos.items() if l.asset in restnames}
 
 
 class Ledger:
@@ -25,23 +58,16 @@ class Ledger:
     @classmethod
     async def retrieve(cls, start: datetime, end: datetime, rest: RestClient,
                        assets: typing.Optional[typing.List[typing.Union[Asset, str]]] = None,
-                       loop = None):
+                       loop = None, store: typing.Optional[HistoryStore] = None):
         """ Retrieving all ledgers for a specific time period.
-        Time is enforced to avoid long retrieval period. This can be relaxed when we have storage...
+        Time is enforced to avoid long retrieval period. With a store, only ledgers not already stored are requested.
         Note this is intentionally somewhat orthogonal to construction of OHLC interface, based on assets... """
         # we retrieve all matching ledgerinfos...
-        ledgerinfos, count = await rest.ledgers(start=start, end=end, asset=assets)
-
-        # loop until we get *everything*
-        # Note : if this is too much, leverage local storage (TODO ! - in relation with time... assume past data doesnt change)
-        while len(ledgerinfos) < count:
-            # Note : here we recurse only one time. we need to recurse to respect ratelimit...
-            more_ledgers, count = await rest.ledgers(start=start, end=end, asset=assets, offset=len(ledgerinfos))
-            ledgerinfos.update(more_ledgers)
+        ledgerinfos = await _retrieve(rest, start=start, end=end, assets=assets, store=store)
 
         model = ledgerframe(ledger_as_dict=ledgerinfos).value
 
-        return cls(ledgers=model, assets=assets, rest=rest, loop=loop)
+        return cls(ledgers=model, assets=assets, rest=rest, loop=loop, store=store)
 
     @property
     def begin(self):
@@ -53,11 +79,12 @@ class Ledger:
 
     def __init__(self,  ledgers: LedgerFrame, rest: RestClient,
                  assets: typing.Optional[typing.List[typing.Union[Asset, str]]]=None,
-                 loop = None):
+                 loop = None, store: typing.Optional[HistoryStore] = None):
         # We want just one asset at a time. Just like ohlc is one pair at a time.
         # Note ledger instances are mergeable vertically on this...
 
         self.restclient = rest if rest is not None else RestClient()
+        self.store = store
 
         self.loop = loop if loop is not None else asyncio.get_event_loop()   # TODO : use restclient loop ??
 
@@ -79,15 +106,8 @@ class Ledger:
 
         if self.restclient is not None and (self.model is None or start < self.model.begin or stop > self.model.end):
             # we retrieve all matching ledgerinfos... lazy on times !
-            ledgerinfos, count = await self.restclient.ledgers(asset=self.assets, start=start, end=stop, offset=0)
-
-            # loop until we get *everything*
-            # Note : if this is too much, leverage local storage (TODO ! - in relation with time... assume past data doesnt change)
-            #  or refine filters (time, etc.)
-            while len(ledgerinfos) < count:
-                # Note : here we recurse only one time. we need to recurse to respect ratelimit...
-                more_ledgers, count = await self.restclient.ledgers(asset=self.assets, start=start, end=stop, offset=len(ledgerinfos))
-                ledgerinfos.update(more_ledgers)
+            # Note : if this is too much, refine filters (time, etc.)
+            ledgerinfos = await _retrieve(self.restclient, start=start, end=stop, assets=self.assets, store=self.store)
 
             model = ledgerframe(ledger_as_dict=ledgerinfos)
             if model:
@@ -119,7 +139,7 @@ class Ledger:
                     ))
                     self.loop.run_until_complete(update_task)  # run the task in background and sync block.
 
-                return Ledger(ledgers=self.model[item.start:item.stop], rest=self.restclient, assets=self.assets, loop=self.loop)
+                return Ledger(ledgers=self.model[item.start:item.stop], rest=self.restclient, assets=self.assets, loop=self.loop, store=self.store)
 
         else:  # anything else : rely on the model
             # TODO : also access per asset or asset list - container-style
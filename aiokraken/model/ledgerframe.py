@@ -13,6 +13,7 @@ from aiokraken.model.asset import Asset
 from result import Result, Ok
 
 from aiokraken.rest.schemas.kledger import KLedgerInfo
+from aiokraken.rest.stream import Columns
 
 """ A common data structure for ledger based on pandas """
 from datetime import datetime, timezone
@@ -111,9 +112,11 @@ class LedgerFrame(TimeindexedDataframe):
         return len(self.dataframe)
 
 
-def ledgerframe(ledger_as_dict: typing.Dict[str, KLedgerInfo]) -> Result[LedgerFrame]:
+def ledgerframe(ledger_as_dict: typing.Union[typing.Dict[str, KLedgerInfo], Columns]) -> Result[LedgerFrame]:
     if not ledger_as_dict:
         df = pd.DataFrame(columns=[f.name for f in dataclasses.fields(KLedgerInfo)])  # we only know about index name
+    elif isinstance(ledger_as_dict, Columns):  # streamed : already in columns
+        df = ledger_as_dict.frame()
     else:
         # Note we drop the key (should already be replicated in the value)
         df = pd.DataFrame.from_records(data=[dataclasses.asdict(v) for v in ledger_as_dict.values()])
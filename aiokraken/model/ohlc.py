@@ -14,6 +14,7 @@ from bokeh.plotting import figure
 """ A common data structure for OHLC based on pandas """
 from datetime import datetime, timezone
 
+import numpy as np
 import pandas as pd
 import pandas_ta as ta
 import pandas.util
@@ -26,6 +27,43 @@ OHLCValue = namedtuple("OHLCValue", ["datetime", "open", "high", "low", "close",
 
 from aiokraken.utils.timeindexeddataframe import TimeindexedDataframe
 
+PRICES = ["open", "high", "low", "close", "vwap", "volume"]
+
+
+def ohlc_frame(records: typing.Sequence[typing.Sequence]) -> pd.DataFrame:
+    """ Typed dataframe, indexed on datetime, from kraken records [time, open, high, low, close, vwap, volume, count].
+    Each column is converted once, from the records, into its final array (no intermediate dataframe of strings).
+
+    >>> df = ohlc_frame([[1567039620, '8746.4', '8751.5', '8745.7', '8745.7', '8749.3', '0.09663298', 8]])
+    >>> df.dtypes.to_dict()
+    {'open': dtype('float64'), 'high': dtype('float64'), 'low': dtype('float64'), 'close': dtype('float64'), \
+'vwap': dtype('float64'), 'volume': dtype('float64'), 'count': dtype('int32')}
+    >>> df.index
+    DatetimeIndex(['2019-08-29 00:47:00+00:00'], dtype='datetime64[ns, UTC]', name='datetime', freq=None)
+    """
+    columns = list(zip(*records)) or [()] * 8
+    if len(columns) != 8:
+        raise ValueError(f"OHLC records should have 8 values, not {len(columns)}")
+    # seconds -> nanoseconds, in place
+    times = np.array(columns[0], dtype=np.int64)
+    times *= 1_000_000_000
+    index = pd.DatetimeIndex(times.view("datetime64[ns]"), name="datetime").tz_localize(timezone.utc)
+    # one (columns, rows) block : the dataframe uses it as it is
+    prices = np.array(columns[1:7], dtype=np.float64).reshape(6, len(times))
+    frame = pd.DataFrame(prices.T, index=index, columns=PRICES, copy=False)
+    frame["count"] = np.array(columns[7], dtype=np.int32)
+    return frame
+
+
+def as_datetime(last: typing.Union[datetime, int]) -> datetime:
+    if not isinstance(last, datetime):
+        # attempt conversion from timestamp
+        return datetime.fromtimestamp(last, tz=timezone.utc)
+    elif isinstance(last, pd.Timestamp):
+        return last.to_pydatetime()
+    else:
+        return last
+
 
 class OHLC(TimeindexedDataframe):
 
@@ -45,13 +83,7 @@ class OHLC(TimeindexedDataframe):
         self.dataframe = self.dataframe[["open", "high", "low", "close", "vwap", "volume", "count"]]
 
         # TODO : FIX : sometimes index is duplicated (happens for XTZ on begining of kraken timeseries)
-        if not isinstance(last, datetime):
-            # attempt conversion from timestamp
-            self.last = datetime.fromtimestamp(last, tz = timezone.utc)
-        elif isinstance(last, pd.Timestamp):
-            self.last = last.to_pydatetime()
-        else:
-            raise RuntimeError("OHLC.last it not a datetime and could not be converted")
+        self.last = as_datetime(last)
 
         # TODO : take in account we only get last 720 intervals
         #  Ref : https://support.kraken.com/hc/en-us/articles/218198197-How-to-retrieve-historical-time-and-sales-trading-history-using-the-REST-API-Trades-endpoint-
@@ -73,6 +105,26 @@ class OHLC(TimeindexedDataframe):
         #                                        self.dataframe.index[-1])
         #                               ))
 
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, last: typing.Union[datetime, int]) -> OHLC:
+        """ Wrapping a dataframe built by ohlc_frame(), as it is : no copy, no conversion. """
+        ohlc = cls.__new__(cls)
+        TimeindexedDataframe.__init__(ohlc, data=frame, copy=False)
+        ohlc.last = as_datetime(last)
+        return ohlc
+
+    @classmethod
+    def from_records(cls, records: typing.Sequence[typing.Sequence], last: typing.Union[datetime, int]) -> OHLC:
+        """ OHLC from kraken records, directly typed.
+
+        >>> ohlc = OHLC.from_records([[1567039620, '8746.4', '8751.5', '8745.7', '8745.7', '8749.3', '0.09663298', 8],
+        ...                           [1567039680, '8745.7', '8747.3', '8745.7', '8747.3', '8747.3', '0.00929540', 1]],
+        ...                          last=1567039680)
+        >>> len(ohlc), ohlc.end
+        (2, datetime.datetime(2019, 8, 29, 0, 48, tzinfo=datetime.timezone.utc))
+        """
+        return cls.from_frame(ohlc_frame(records), last=last)
+
     # TODO : we should probably provide "simple"/explicit interface to useful property of the dataframe ???
 
     @property
@@ -336,6 +388,17 @@ class OHLC(TimeindexedDataframe):
 
         return OHLC(data=newdf, last=newdf.index[-1])
 
+    def update(self, newer: OHLC) -> OHLC:
+        """ Appending candles retrieved with the `since` cursor (ie. after our last).
+        Candles we already have, from the first new one onward, are replaced : the last one may not have been closed yet.
+        This is much cheaper than stitch(), but assumes newer is at least as recent as self.
+        """
+        if not len(newer):
+            return OHLC(data=self.dataframe, last=max(self.last, newer.last))
+        kept = self.dataframe[self.dataframe.index < newer.dataframe.index[0]]
+        newdf = pd.concat([kept, newer.dataframe])
+        return OHLC(data=newdf, last=newer.last)
+
     def head(self):
         return self.dataframe.head()
 
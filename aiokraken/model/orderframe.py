@@ -25,6 +25,7 @@ from pandas._libs.tslibs.np_datetime import OutOfBoundsDatetime
 from result import Result, Ok
 
 from aiokraken.rest.schemas.ktrade import KTradeModel
+from aiokraken.rest.stream import Columns
 
 """ A common data structure for trades based on pandas """
 from datetime import datetime, timezone
@@ -161,11 +162,13 @@ def unflatten_orderdict(dict_data):
     return unflatten
 
 
-def closedorderframe(closedorders_as_dict: typing.Dict[str, KClosedOrderModel]) -> Result[OrderFrame]:
+def closedorderframe(closedorders_as_dict: typing.Union[typing.Dict[str, KClosedOrderModel], Columns]) -> Result[OrderFrame]:
 
     if not closedorders_as_dict:
         # TODO :we probably want to expand descr to multiple columns here as well...
         df = pd.DataFrame(columns=[f.name for f in dataclasses.fields(KClosedOrderModel)])  # we only know about index name
+    elif isinstance(closedorders_as_dict, Columns):  # streamed : already in flattened columns
+        df = closedorders_as_dict.frame()
     else:
         # Note we drop the key (should already be replicated in the value)
         df = pd.DataFrame.from_records(data=[dataclasses.asdict(v, dict_factory=flatten_orderdict) for v in closedorders_as_dict.values()])
@@ -99,6 +99,47 @@ class TestOHLC(unittest.TestCase):
         stitched2 = ohlc2.stitch(ohlc1)
         assert stitched1 == stitched2
 
+    def test_ohlc_update(self):
+        """ Verifying that candles retrieved with since replace the unfinished one and are appended """
+        ohlc = OHLC(data=pd.DataFrame(
+            [[1567039620, 8746.4, 8751.5, 8745.7, 8745.7, 8749.3, 0.09663298, 8],
+             [1567039680, 8745.7, 8747.3, 8745.7, 8747.3, 8747.3, 0.00929540, 1]],  # not closed yet
+            columns=["time", "open", "high", "low", "close", "vwap", "volume", "count"]
+        ), last=1567039620)
+        newer = OHLC(data=pd.DataFrame(
+            [[1567039680, 8745.7, 8748.3, 8745.7, 8748.1, 8747.5, 0.01929540, 2],
+             [1567039740, 8748.1, 8751.4, 8745.3, 8745.4, 8748.1, 0.09663297, 3]],
+            columns=["time", "open", "high", "low", "close", "vwap", "volume", "count"]
+        ), last=1567039680)
+
+        updated = ohlc.update(newer)
+
+        assert len(updated) == 3
+        assert (updated.dataframe.iloc[0] == ohlc.dataframe.iloc[0]).all()
+        assert (updated.dataframe.iloc[1:] == newer.dataframe).all().all()
+        assert updated.last == datetime.fromtimestamp(1567039680, tz=timezone.utc)
+        # same result as the full stitch, when there is no conflict to resolve
+        assert updated == ohlc.stitch(newer)
+
+    def test_ohlc_from_records(self):
+        """ Verifying that records from kraken are typed directly, like the dataframe path """
+        records = [[1567039620, '8746.4', '8751.5', '8745.7', '8745.7', '8749.3', '0.09663298', 8],
+                   [1567039680, '8745.7', '8747.3', '8745.7', '8747.3', '8747.3', '0.00929540', 1]]
+        ohlc = OHLC.from_records(records, last=1567041780)
+        expected = OHLC(data=pd.DataFrame(records, columns=["time", "open", "high", "low", "close", "vwap", "volume", "count"]),
+                        last=1567041780)
+
+        assert ohlc == expected
+        assert ohlc.last == expected.last
+        assert list(ohlc.dataframe.columns) == list(expected.dataframe.columns)
+        assert str(ohlc.dataframe.index.dtype) == "datetime64[ns, UTC]"
+        assert all(ohlc.dataframe[c].dtype == "float64" for c in ["open", "high", "low", "close", "vwap", "volume"])
+        assert ohlc.dataframe["count"].dtype == "int32"
+
+        assert len(OHLC.from_records([], last=1567041780)) == 0
+        with self.assertRaises(ValueError):
+            OHLC.from_records([[1567039620, '8746.4']], last=1567041780)
+
 
 if __name__ == "__main__":
     unittest.main()
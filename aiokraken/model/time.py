@@ -18,10 +18,10 @@ class Time:
     timezone: timezone = timezone.utc
 
     def __post_init__(self):
-        # TODO : currently assumed perfect  (0)
+        # server clock - local clock, set by the client retrieving this time, with its own clock. 0 when unknown.
         object.__setattr__(self, 'clockskew', 0)  # careful to not include timezone here
 
-    # TODO : make sure we have proper time sync with server (and with pandas datetime methods...)
+    # TODO : make sure we have proper time sync with pandas datetime methods...
     # REf : https://stackoverflow.com/questions/10256093/how-to-convert-ctime-to-datetime-in-python
 
     def __repr__(self):
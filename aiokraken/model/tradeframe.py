@@ -16,6 +16,7 @@ from pandas._libs.tslibs.np_datetime import OutOfBoundsDatetime
 from result import Result, Ok
 
 from aiokraken.rest.schemas.ktrade import KTradeModel
+from aiokraken.rest.stream import Columns
 
 """ A common data structure for trades based on pandas """
 from datetime import datetime, timezone
@@ -103,9 +104,11 @@ class TradeFrame(TimeindexedDataframe):
         return len(self.dataframe)
 
 
-def tradeframe(tradehistory_as_dict: typing.Dict[str, KTradeModel]) -> Result[TradeFrame]:
+def tradeframe(tradehistory_as_dict: typing.Union[typing.Dict[str, KTradeModel], Columns]) -> Result[TradeFrame]:
     if not tradehistory_as_dict:
         df = pd.DataFrame(columns=[f.name for f in dataclasses.fields(KTradeModel)])  # we only know about index name
+    elif isinstance(tradehistory_as_dict, Columns):  # streamed : already in columns
+        df = tradehistory_as_dict.frame()
     else:
         # Note we drop the key (should already be replicated in the value)
         df = pd.DataFrame.from_records(data=[dataclasses.asdict(v) for v in tradehistory_as_dict.values()])
@@ -24,6 +24,11 @@ from aiokraken.model.ohlc import OHLC as OHLCModel, OHLCValue
 from aiokraken.websockets.publicapi import ohlc
 
 
+async def _ohlc(pairs, rest: RestClient, interval: KTimeFrameModel) -> typing.List[OHLCModel]:
+    """ the ohlc of all pairs, requested concurrently. The client limiters pace them. """
+    return await asyncio.gather(*(rest.ohlc(pair=p, interval=interval) for p in pairs))
+
+
 class OHLCV:
     """
     Class/Type to represent a multi-resolution OHLC.
@@ -42,25 +47,25 @@ class OHLCV:
         proper_pairs = await rest.retrieve_assetpairs()
         pairs = [p if isinstance(p, AssetPair) else proper_pairs[p] for p in pairs]
 
-        ohlcmodels = {p.wsname: await rest.ohlc(pair=p, interval=KTimeFrameModel.one_minute) for p in pairs}
+        ohlcmodels = dict(zip([p.wsname for p in pairs], await _ohlc(pairs, rest=rest, interval=KTimeFrameModel.one_minute)))
         return OHLCV(pair_ohlcmodels=ohlcmodels, rest=rest, loop=loop)
 
     @classmethod
     async def five_minutes(cls, pairs: AssetPairs, rest: RestClient, loop=None):
         # TODO : validate the pairs using the rest client pair = await self.restclient.validate_pair(pair=self.pair)
-        ohlcmodels = {p: await rest.ohlc(pair=p, interval=KTimeFrameModel.five_minutes) for p in pairs}
+        ohlcmodels = dict(zip(pairs, await _ohlc(pairs, rest=rest, interval=KTimeFrameModel.five_minutes)))
         return OHLCV(pair_ohlcmodels=ohlcmodels, rest=rest, loop=loop)
 
     @classmethod
     async def fifteen_minutes(cls, pairs: AssetPairs, rest: RestClient, loop=None):
         # TODO : validate the pairs using the rest client pair = await self.restclient.validate_pair(pair=self.pair)
-        ohlcmodels = {p: await rest.ohlc(pair=p, interval=KTimeFrameModel.fifteen_minutes) for p in pairs}
+        ohlcmodels = dict(zip(pairs, await _ohlc(pairs, rest=rest, interval=KTimeFrameModel.fifteen_minutes)))
         return OHLCV(pair_ohlcmodels=ohlcmodels, rest=rest, loop=loop)
 
     @classmethod
     async def thirty_minutes(cls, pairs: AssetPairs, rest: RestClient, loop=None):
         # TODO : validate the pairs using the rest client pair = await self.restclient.validate_pair(pair=self.pair)
-        ohlcmodels = {p: await rest.ohlc(pair=p, interval=KTimeFrameModel.thirty_minutes) for p in pairs}
+        ohlcmodels = dict(zip(pairs, await _ohlc(pairs, rest=rest, interval=KTimeFrameModel.thirty_minutes)))
         return OHLCV(pair_ohlcmodels=ohlcmodels, rest=rest, loop=loop)
 
     half_an_hour = thirty_minutes
@@ -68,7 +73,7 @@ class OHLCV:
     @classmethod
     async def sixty_minutes(cls, pairs: AssetPairs, rest: RestClient, loop=None):
         # TODO : validate the pairs using the rest client pair = await self.restclient.validate_pair(pair=self.pair)
-        ohlcmodels = {p: await rest.ohlc(pair=p, interval=KTimeFrameModel.sixty_minutes) for p in pairs}
+        ohlcmodels = dict(zip(pairs, await _ohlc(pairs, rest=rest, interval=KTimeFrameModel.sixty_minutes)))
         return OHLCV(pair_ohlcmodels=ohlcmodels, rest=rest, loop=loop)
 
     one_hour = sixty_minutes
@@ -76,7 +81,7 @@ class OHLCV:
     @classmethod
     async def four_hours(cls, pairs: AssetPairs, rest: RestClient, loop=None):
         # TODO : validate the pairs using the rest client pair = await self.restclient.validate_pair(pair=self.pair)
-        ohlcmodels = {p: await rest.ohlc(pair=p, interval=KTimeFrameModel.four_hours) for p in pairs}
+        ohlcmodels = dict(zip(pairs, await _ohlc(pairs, rest=rest, interval=KTimeFrameModel.four_hours)))
         return OHLCV(pair_ohlcmodels=ohlcmodels, rest=rest, loop=loop)
 
     @classmethod
@@ -84,7 +89,7 @@ class OHLCV:
         proper_pairs = await rest.retrieve_assetpairs()
         pairs = [p if isinstance(p, AssetPair) else proper_pairs[p] for p in pairs]
 
-        ohlcmodels = {p: await rest.ohlc(pair=p, interval=KTimeFrameModel.one_day) for p in pairs}
+        ohlcmodels = dict(zip(pairs, await _ohlc(pairs, rest=rest, interval=KTimeFrameModel.one_day)))
         return OHLCV(pair_ohlcmodels=ohlcmodels, rest=rest, loop=loop)
 
     twenty_four_hours = one_day
@@ -92,13 +97,13 @@ class OHLCV:
     @classmethod
     async def seven_days(cls, pairs: AssetPairs, rest: RestClient, loop=None):
         # TODO : validate the pairs using the rest client pair = await self.restclient.validate_pair(pair=self.pair)
-        ohlcmodels = {p: await rest.ohlc(pair=p, interval=KTimeFrameModel.seven_days) for p in pairs}
+        ohlcmodels = dict(zip(pairs, await _ohlc(pairs, rest=rest, interval=KTimeFrameModel.seven_days)))
         return OHLCV(pair_ohlcmodels=ohlcmodels ,rest=rest, loop=loop)
 
     @classmethod
     async def fifteen_days(cls, pairs: AssetPairs, rest: RestClient, loop=None):
         # TODO : validate the pairs using the rest client pair = await self.restclient.validate_pair(pair=self.pair)
-        ohlcmodels = {p: await rest.ohlc(pair=p, interval=KTimeFrameModel.fifteen_days) for p in pairs}
+        ohlcmodels = dict(zip(pairs, await _ohlc(pairs, rest=rest, interval=KTimeFrameModel.fifteen_days)))
         return OHLCV(pair_ohlcmodels=ohlcmodels, rest=rest, loop=loop)
 
     # TODO : get rid of async on initialization.
@@ -149,6 +154,21 @@ class OHLCV:
     def timeframe(self) -> typing.Dict[AssetPair, KTimeFrameModel]:
         return {p: m.timeframe for p, m in self.models.items()}
 
+    @property
+    def next_close(self) -> typing.Dict[AssetPair, datetime]:
+        """ when the current (unfinished) candle of each pair closes """
+        return {p: m.end + m.timeframe.to_timedelta() for p, m in self.models.items()}
+
+    async def until_close(self):
+        """ Waits until the earliest candle close, on the server clock. Useful to request the closed candle right away. """
+        delay = (min(self.next_close.values()) - self.rest.clock.now()).total_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def closed(self, update) -> bool:
+        """ Whether the candle of this (websocket) update is closed, on the server clock : no more update will come. """
+        return update.etime <= self.rest.clock.time()
+
     def __repr__(self):
         return f"<OHLC {self.models.keys()} from {self.begin} to {self.end}>"
 
@@ -160,15 +180,19 @@ class OHLCV:
         This is a call mutating this object after async rest data retrieval.
         """
         newmodels = dict()
+        now = self.rest.clock.now()
         for p, m in self.models.items():
-            old_limit = datetime.now(tz=timezone.utc) - m.timeframe
+            old_limit = now - m.timeframe.to_timedelta()
             if m.last < old_limit:  # last data before old_limit : update required
 
-                new_ohlc = (await self.rest.ohlc(pair=p, interval=m.timeframe))
+                # only retrieving candles after the ones we already have
+                new_ohlc = (await self.rest.ohlc(pair=p, interval=m.timeframe, since=m.last))
 
                 if new_ohlc:  # TODO : betterhandling of errors via exceptions...
-                    newmodels[p] = m.stitch(new_ohlc)
+                    # no need to stitch, we know new candles come after ours
+                    newmodels[p] = m.update(new_ohlc)
 
+        self.models.update(newmodels)
         return self
 
     # TODO : maybe we need something to express the value of the asset relative to the fees
@@ -225,7 +249,7 @@ class OHLCV:
         # Using minimal timeframe of all for this update
         async for ohlc_update in ohlc(pairs=[k for k in self.models.keys()], interval=min(tf.value for tf in self.timeframe.values()),
                                       restclient=self.rest):
-            # TODO : decides if this update means the previous one is final (we cannot do better until we synchronize client and server time...)
+            # TODO : use self.closed() to decide when the previous update is final
             # TODO : store this update until next iteration
             # TODO : update internal model
 
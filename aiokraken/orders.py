@@ -17,24 +17,41 @@ from aiokraken.model.orderframe import OrderFrame, closedorderframe, openorderfr
 from aiokraken.rest.schemas.kclosedorder import KClosedOrderModel
 
 from aiokraken.rest import RestClient, Server
+from aiokraken.rest.paginate import paginate
+from aiokraken.rest.stream import Columns
 from aiokraken.rest.schemas.kopenorder import KOpenOrderModel
+from aiokraken.store import HistoryStore
 
 
+async def _retrieve_closed(rest: RestClient, start: datetime = None, end: datetime = None, store: HistoryStore = None):
+
+    async def fetch(start, end):
+        # retrieving *everything*, page after page (concurrent pages need a nonce window on the key)
+        corders = dict()
+        async for page in paginate(lambda offset: rest.closedorders(start=start, end=end, offset=offset)):
+            corders.update(page)
+        return corders
+
+    if store is None:
+        # streaming pages straight into columns, for the frame
+        ordercolumns = Columns()
+        async for page in paginate(lambda offset: rest.closedorders(start=start, end=end, offset=offset, columns=True)):
+            ordercolumns.extend(page)
+        return ordercolumns
+    # closed orders dont change : only retrieving what is not stored locally yet
+    return await store.sync(fetch, start=start, end=end)
+
 class Orders:
     """
     """
     @classmethod
-    async def retrieve(cls, rest: RestClient = None, start: datetime =None, end: datetime = None, loop=None):
+    async def retrieve(cls, rest: RestClient = None, start: datetime =None, end: datetime = None, loop=None,
+                       store: typing.Optional[HistoryStore] = None):
+        """ Retrieving all closed orders for a time period, and currently open orders.
+        With a store, only closed orders not already stored are requested. """
         rest = RestClient() if rest is None else rest
 
-        corders, count = await rest.closedorders(start=start, end=end)
-
-        # loop until we get *everything*
-        # Note : if this is too much, leverage local storage (TODO ! - in relation with time... assume past data doesnt change)
-        while len(corders) < count:
-            # Note : here we recurse only one time. we need to recurse to respect ratelimit...
-            more_corders, count = await rest.closedorders(start=start, end=end, offset=len(corders))
-            corders.update(more_corders)
+        corders = await _retrieve_closed(rest, start=start, end=end, store=store)
 
         cmodel = closedorderframe(closedorders_as_dict=corders).value
 
@@ -44,7 +61,7 @@ class Orders:
 
         omodel = openorderframe(openorders_as_dict=oorders).value
 
-        return cls(closedorders=cmodel, openorders=omodel, rest=rest, loop=loop)
+        return cls(closedorders=cmodel, openorders=omodel, rest=rest, loop=loop, store=store)
 
     closed: OrderFrame
     open: OrderFrame
@@ -57,9 +74,11 @@ class Orders:
     def end(self):
         return self.closed.end
 
-    def __init__(self, closedorders: OrderFrame, openorders: OrderFrame, rest: RestClient, loop = None):
+    def __init__(self, closedorders: OrderFrame, openorders: OrderFrame, rest: RestClient, loop = None,
+                 store: typing.Optional[HistoryStore] = None):
 
         self.rest = rest if rest is not None else RestClient()
+        self.store = store
 
         self.loop = loop if loop is not None else asyncio.get_event_loop()   # TODO : use restclient loop ??
 
@@ -86,14 +105,7 @@ class Orders:
 
         if self.rest is not None and (self.model is None or start < self.model.begin or end > self.model.end):
             # we retrieve all matching ledgerinfos... lazy on times !
-            closedorders, count= await rest.closedorders(start=start, end=end)
-
-            # loop until we get *everything*
-            # Note : if this is too much, leverage local storage (TODO ! - in relation with time... assume past data doesnt change)
-            while len(closedorders) < count:
-                # Note : here we recurse only one time. we need to recurse to respect ratelimit...
-                more_orders, count = await rest.closedorders(start=start, end=end, offset=len(closedorders))
-                closedorders.update(more_orders)
+            closedorders = await _retrieve_closed(self.rest, start=start, end=end, store=self.store)
 
             model = closedorderframe(closedorders_as_dict=closedorders)
             if model:
@@ -102,7 +114,7 @@ class Orders:
                 raise RuntimeError("Something went wrong")
 
             # ALso update open orders, replacing older content
-            oorders = await rest.openorders()
+            oorders = await self.rest.openorders()
 
             self.open = openorderframe(openorders_as_dict=oorders).value
         # we keep aggregating in place on the same object
@@ -127,7 +139,7 @@ class Orders:
                                 end=max(item.stop, self.end) if self.closed else item.stop
                         ))
                         self.loop.run_until_complete(update_task)  # run the task in background and sync block.
-                return Orders(closedorders=self.closed[item.start:item.stop], openorders=self.open, rest=self.rest, loop=self.loop)
+                return Orders(closedorders=self.closed[item.start:item.stop], openorders=self.open, rest=self.rest, loop=self.loop, store=self.store)
 
         else:  # anything else : rely on the model
             # TODO : also access per asset or asset list - container-style
@@ -2,20 +2,21 @@ import types
 
 import typing
 
-from aiokraken.rest.schemas.kledger import KLedgersResponseSchema
+from aiokraken.rest.schemas.kledger import KLedgersResponseSchema, KLedgerInfoSchema
 
-from aiokraken.rest.schemas.ktrade import TradeResponseSchema
+from aiokraken.rest.schemas.ktrade import TradeResponseSchema, KTradeSchema
 
 from aiokraken.model.timeframe import KTimeFrameModel
 
 from aiokraken.rest.payloads import TickerPayloadSchema, AssetPayloadSchema, AssetPairPayloadSchema
-from aiokraken.rest.schemas.kclosedorder import ClosedOrdersResponseSchema
+from aiokraken.rest.schemas.kclosedorder import ClosedOrdersResponseSchema, KClosedOrderSchema
 from .schemas.websockettoken import KWebSocketTokenResponseSchema
 
 if not __package__:
     __package__ = 'aiokraken.rest'
 
 from .request import Request
+from .signer import Signer
 from .schemas.payload import PayloadSchema
 from .schemas.time import TimeSchema
 from .schemas.ohlc import PairOHLCSchema
@@ -27,6 +28,8 @@ from .schemas.krequestorder import (
     RequestOrderSchema,
 )
 from .response import Response
+from .decoders import decode_ticker, decode_trades, ohlc_decoder
+from .stream import StreamedResult
 
 from ..model.assetpair import AssetPair
 from ..model.asset import Asset
@@ -109,18 +112,18 @@ pairs_id = {
 }
 
 
-def private(api: API, key, secret):
+def private(api: API, signer: Signer):
     api.api_url = 'private/'
 
     # TODO :call function (arg) to grab them from somewhere...
-    api.key = key
-    api.secret = secret
+    api.key = signer.key
+    api.signer = signer
 
     def request(self, endpoint, headers=None, data=None, expected=None):
         h = headers or {}
         d = data or {}
         r = Request(urlpath=self.url_path + '/' + endpoint, headers=h, data=d, expected=expected)
-        s = r.sign(key=key, secret = secret)
+        s = r.sign(signer)
         return s
 
     api.request = types.MethodType(request, api)
@@ -130,15 +133,21 @@ def private(api: API, key, secret):
 class Server:
     # TODO : LOG actual requests. Important for usage and for testing...
 
-    def __init__(self, key=None, secret=None):
+    def __init__(self, key=None, secret=None, nonce=None):
+        """
+        :param nonce: the nonce source for private requests. Use a NonceSource with a path,
+            to share the key with other processes. The process-wide nonce source is used by default.
+        """
         # building the API structure as a dict
         self.API = Host(hostname='api.kraken.com')  # TODO : pass as argument ?
         self.API['0'] = Version()
         self.API['0']['public'] = API('public')
 
         if key and secret:  # we only have private API access if we provide key and secret
-            self.API['0']['private'] = private(api=API('private'), key=key, secret=secret)
+            self.signer = Signer(key=key, secret=secret, nonce=nonce)
+            self.API['0']['private'] = private(api=API('private'), signer=self.signer)
         else:  # But we still need to have access simulated for replays (no key)
+            self.signer = None
             self.API['0']['private'] = API('private')
         # TODO : do this declaratively ???
 
@@ -194,15 +203,19 @@ class Server:
                                                      schema=AssetPairPayloadSchema())
         )
 
-    def ohlc(self, pair: AssetPair, interval: KTimeFrameModel):
+    def ohlc(self, pair: AssetPair, interval: KTimeFrameModel, since: typing.Optional[int] = None):
         pairstr = pair.restname
+        data = {'pair': pairstr, 'interval': int(interval)}
+        if since is not None:  # only candles after this cursor (usually the 'last' of a previous response)
+            data['since'] = since
         return self.public.request('OHLC',
-                                   data={'pair': pairstr, 'interval': int(interval)},
+                                   data=data,
                                    expected=Response(status=200,
                                                      schema=PayloadSchema(
                                                         result_schema=PairOHLCSchema(
                                                             pair=pairstr)
-                                                        )
+                                                        ),
+                                                     decoder=ohlc_decoder(pair=pairstr),
                                                      )
                                    )
 
@@ -234,7 +247,8 @@ class Server:
         return self.public.request('Ticker',
                                    data={'pair': ",".join(pairlist)},
                                    expected=Response(status=200,
-                                                     schema=TickerPayloadSchema()
+                                                     schema=TickerPayloadSchema(),
+                                                     decoder=decode_ticker,
                                                      )
                                    )
 
@@ -277,7 +291,8 @@ class Server:
                                    expected=Response(status=200,
                                                      schema=PayloadSchema(
                                                         result_schema=ClosedOrdersResponseSchema()
-                                                        )
+                                                        ),
+                                                     stream=StreamedResult('closed', schema=KClosedOrderSchema())
                                                      )
                                    )
 
@@ -331,7 +346,9 @@ class Server:
                                     expected=Response(status=200,
                                                       schema=PayloadSchema(
                                                           result_schema=TradeResponseSchema()
-                                                      ))
+                                                      ),
+                                                      decoder=decode_trades,
+                                                      stream=StreamedResult('trades', schema=KTradeSchema(), id_field='trade_id'))
                                     )
     #
     # def query_trades(self):
@@ -366,7 +383,8 @@ class Server:
                                     expected=Response(status=200,
                                                       schema=PayloadSchema(
                                                           result_schema=KLedgersResponseSchema()
-                                                      ))
+                                                      ),
+                                                      stream=StreamedResult('ledger', schema=KLedgerInfoSchema(), id_field='ledger_id'))
                                     )
 
     def websocket_token(self):
@@ -39,7 +39,13 @@ class AssetPairs(Mapping):
 
     """
     def __init__(self, assetpairs_as_dict: typing.Mapping[str, AssetPair]):
-           self.impl = assetpairs_as_dict
+        self.impl = assetpairs_as_dict
+        # every name of the pairs, to their key in impl. Built once : lookups are on the websocket dispatch path.
+        self._names: typing.Dict[str, str] = dict()
+        for attr in ('wsname', 'altname', 'restname'):  # later ones take precedence
+            for n, p in self.impl.items():
+                if getattr(p, attr) is not None:
+                    self._names[getattr(p, attr)] = n
 
     def __repr__(self):
         return repr(self.impl)
@@ -49,31 +55,16 @@ class AssetPairs(Mapping):
 
     def __contains__(self, item):
         #  We need the list of markets to validate pair string passed in the request
-        return (item in self.impl or
-                item in {p.altname for n, p in self.impl.items()} or
-                item in {p.restname for n, p in self.impl.items()} or
-                item in {p.wsname for n, p in self.impl.items()})
+        return item in self.impl or item in self._names
 
-    # TODO : build and cache alternate mapping to optimize ?
     def __getitem__(self, item: str):
         #  We need the list of markets to validate pair string passed in the request
         try:
-            assetpair = self.impl[item]
+            return self.impl[item]
         except KeyError as ke:
-            restname_map = {p.restname: p for n, p in self.impl.items()}
-            altname_map = {p.altname: p for n, p in self.impl.items()}
-            wsname_map = {p.wsname: p for n, p in self.impl.items()}
-            if item in restname_map.keys():
-                assetpair = restname_map[item]  # get the proper type.
-            elif item in altname_map.keys():
-                assetpair = altname_map[item]  # get the proper type.
-            elif item in wsname_map.keys():
-                assetpair = wsname_map[item]  # get the proper type.
-            else:
+            if item not in self._names:
                 raise ke  # TODO also mention addressable via alternative names...
-                # RuntimeError(f"{item} not in {[k for k in self.impl.keys()]} nor {altname_map.keys()}")
-
-        return assetpair
+            return self.impl[self._names[item]]
 
     def __len__(self):
         return len(self.impl)
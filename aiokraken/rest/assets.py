@@ -27,7 +27,12 @@ class Assets(Mapping):
 
     """
     def __init__(self, assets_as_dict: typing.Mapping[str, Asset]):
-           self.impl = assets_as_dict
+        self.impl = assets_as_dict
+        # every name of the assets, to their key in impl. Built once, for constant time lookups.
+        self._names: typing.Dict[str, str] = dict()
+        for attr in ('altname', 'restname'):  # later ones take precedence
+            for n, a in self.impl.items():
+                self._names[getattr(a, attr)] = n
 
     def __repr__(self):
         return repr(self.impl)
@@ -36,28 +41,17 @@ class Assets(Mapping):
         return str(self.impl)
 
     def __contains__(self, item):
-        #  We need the list of markets to validate pair string passed in the request
-        return (item in self.impl or
-                item in {p.altname for n, p in self.impl.items()} or
-                item in {p.restname for n, p in self.impl.items()})
-        # TODO : build and cache alternate mapping to optimize ?
+        #  We need the list of assets to validate asset string passed in the request
+        return item in self.impl or item in self._names
 
     def __getitem__(self, item: str):
-        #  We need the list of markets to validate pair string passed in the request
+        #  We need the list of assets to validate asset string passed in the request
         try:
-            asset = self.impl[item]
+            return self.impl[item]
         except KeyError as ke:
-            altname_map = {p.altname: p for n, p in self.impl.items()}
-            restname_map = {p.restname: p for n, p in self.impl.items()}
-            if item in restname_map.keys():
-                asset = restname_map[item]
-            elif item in altname_map.keys():
-                asset = altname_map[item]  # get the proper type.
-            else:
+            if item not in self._names:
                 raise ke  # TODO also mention addressable via alternative names...
-                # RuntimeError(f"{item} not in {[k for k in self.impl.keys()]} nor {altname_map.keys()}")
-
-        return asset
+            return self.impl[self._names[item]]
 
     def __len__(self):
         return len(self.impl)
@@ -0,0 +1,81 @@
+""" Micro-batching of requests over a short time window.
+
+Some endpoints (Ticker) accept a list of keys (pairs). When many independent coroutines ask for their own keys
+at nearly the same time, we can wait a few milliseconds, and send only one request for the union of all keys.
+Each caller then takes its own slice of the (shared) result.
+"""
+import asyncio
+import typing
+from dataclasses import dataclass
+
+
+@dataclass
+class BatchStats:
+    calls: int = 0
+    batches: int = 0
+
+    @property
+    def ratio(self) -> float:
+        """ average number of calls served by one request """
+        return self.calls / self.batches if self.batches else 0.0
+
+
+class MicroBatcher:
+    """
+    Aggregates keys requested during a time window into one call.
+
+    >>> async def fake_ticker(pairs):
+    ...     return {p: p.lower() for p in pairs}
+    >>> batcher = MicroBatcher(fake_ticker, window=0.01)
+    >>> async def strategies():
+    ...     return await asyncio.gather(batcher(["XBTEUR"]), batcher(["ETHEUR", "XBTEUR"]))
+    >>> asyncio.run(strategies())
+    [{'XBTEUR': 'xbteur', 'ETHEUR': 'etheur'}, {'XBTEUR': 'xbteur', 'ETHEUR': 'etheur'}]
+    >>> batcher.stats
+    BatchStats(calls=2, batches=1)
+    """
+
+    def __init__(self, call: typing.Callable[[typing.List[typing.Hashable]], typing.Awaitable],
+                 window: float = 0.02, max_keys: typing.Optional[int] = None):
+        self.call = call
+        self.window = window
+        self.max_keys = max_keys  # to flush early, if the request would get too long
+
+        self._keys: typing.Optional[typing.Dict[typing.Hashable, None]] = None  # as an ordered set
+        self._result: typing.Optional[asyncio.Future] = None
+        self._timer: typing.Optional[asyncio.TimerHandle] = None
+
+        self.stats = BatchStats()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        keys, result = list(self._keys), self._result
+        self._keys, self._result, self._timer = None, None, None
+
+        async def send():
+            try:
+                result.set_result(await self.call(keys))
+            except Exception as exc:
+                result.set_exception(exc)
+
+        self.stats.batches += 1
+        asyncio.ensure_future(send())
+
+    async def __call__(self, keys: typing.Iterable[typing.Hashable]):
+        """ returns the result for the whole batch. Slicing it is up to the caller. """
+        if self._keys is None:
+            loop = asyncio.get_running_loop()
+            self._keys = dict()
+            self._result = loop.create_future()
+            self._timer = loop.call_later(self.window, self._flush)
+
+        self._keys.update((k, None) for k in keys)
+        result = self._result
+        self.stats.calls += 1
+
+        if self.max_keys is not None and len(self._keys) >= self.max_keys:
+            self._flush()
+
+        # shielding so that one cancelled caller does not cancel the request for everyone
+        return await asyncio.shield(result)
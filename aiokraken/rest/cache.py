@@ -0,0 +1,174 @@
+""" TTL cache for public REST responses, with stale-while-revalidate.
+
+Public data (assets, pairs, time, ticker, ohlc) is the same for everyone, and is requested over and over by dashboards.
+Each endpoint has its own time-to-live. After it, the cached response is still served for a while (stale),
+while a refresh is done in the background. Only after that is the caller blocked waiting for a new request.
+"""
+import asyncio
+import functools
+import inspect
+import time
+import typing
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from aiokraken.model.timeframe import KTimeFrameModel
+from aiokraken.rest.coalesce import call_key
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+
+def _ohlc_ttl(arguments: typing.Mapping) -> float:
+    # one candle does not change more often than its interval
+    return KTimeFrameModel(arguments['interval']).secs()
+
+
+# Time-to-live in seconds, per client method. A callable receives the call arguments.
+DEFAULT_TTL: typing.Dict[str, typing.Union[float, typing.Callable[[typing.Mapping], float]]] = {
+    'time': 1,
+    'retrieve_assets': 3600,
+    'retrieve_assetpairs': 3600,
+    'ticker': 2,
+    'ohlc': _ohlc_ttl,
+}
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class ResponseCache:
+    """
+    LRU cache of responses, with a time-to-live per endpoint.
+
+    >>> clock = [0.0]
+    >>> cache = ResponseCache(ttl={'time': 10}, stale=0.5, timer=lambda: clock[0])
+    >>> cache.put('time', ('time', ()), "response", arguments={})
+    >>> cache.get(('time', ()))
+    ('response', True)
+    >>> clock[0] = 12
+    >>> cache.get(('time', ()))
+    ('response', False)
+    >>> clock[0] = 16
+    >>> cache.get(('time', ())) is None
+    True
+    """
+
+    def __init__(self, ttl: typing.Optional[typing.Mapping] = None, stale: float = 1.0, maxsize: int = 256,
+                 timer: typing.Callable[[], float] = time.monotonic):
+        """
+        :param ttl: time-to-live per client method name, overriding DEFAULT_TTL. None disables caching for a method.
+        :param stale: how long a response can still be served while it is refreshed, as a fraction of its ttl.
+        :param maxsize: maximum number of cached responses. Least recently used are evicted first.
+        """
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.stale = stale
+        self.maxsize = maxsize
+        self.timer = timer
+
+        # key -> (value, expiry time, stale expiry time)
+        self._entries: typing.OrderedDict[typing.Hashable, typing.Tuple[typing.Any, float, float]] = OrderedDict()
+        self._refreshing: typing.Dict[typing.Hashable, asyncio.Future] = dict()
+
+        self.stats = CacheStats()
+
+    def __contains__(self, name: str):
+        """ whether a method is cached """
+        return self.ttl.get(name) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ttl_for(self, name: str, arguments: typing.Mapping) -> float:
+        ttl = self.ttl[name]
+        return ttl(arguments) if callable(ttl) else ttl
+
+    def get(self, key: typing.Hashable) -> typing.Optional[typing.Tuple[typing.Any, bool]]:
+        """ returns (value, fresh), or None if missing or expired """
+        try:
+            value, expiry, stale_expiry = self._entries[key]
+        except KeyError:
+            return None
+        now = self.timer()
+        if now > stale_expiry:
+            self._entries.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value, now <= expiry
+
+    def put(self, name: str, key: typing.Hashable, value: typing.Any, arguments: typing.Mapping):
+        ttl = self.ttl_for(name, arguments)
+        now = self.timer()
+        self._entries[key] = (value, now + ttl, now + ttl * (1 + self.stale))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, name: typing.Optional[str] = None):
+        """ drop all cached responses, or only the ones for one method """
+        for k in [k for k in self._entries if name is None or k[0] == name]:
+            self._entries.pop(k)
+
+    def refresh(self, key: typing.Hashable, fetch: typing.Callable[[], typing.Awaitable]):
+        """ refresh in the background, once per key """
+        if key in self._refreshing:
+            return
+
+        async def background():
+            try:
+                await fetch()
+            except Exception as exc:  # the caller already has its (stale) answer, we only log.
+                LOGGER.warning(f"Background refresh of {key[0]} failed: {exc}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.ensure_future(background())
+
+
+def _cacheable(value: typing.Any) -> bool:
+    # errors are returned as {'error': err} by the client, we do not want to keep them.
+    return not (isinstance(value, dict) and 'error' in value)
+
+
+def cached(fn):
+    """ Decorator for client coroutine methods, using the cache attribute of the instance, if any.
+    Should be the outermost decorator, so that cache hits do not touch any limiter."""
+    name = fn.__name__
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        cache = self.cache
+        if cache is None or name not in cache:
+            return await fn(self, *args, **kwargs)
+
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (name, call_key(signature, self, *args, **kwargs))
+
+        async def fetch():
+            value = await fn(self, *args, **kwargs)
+            if _cacheable(value):
+                cache.put(name, key, value, arguments=bound.arguments)
+            return value
+
+        entry = cache.get(key)
+        if entry is None:
+            cache.stats.misses += 1
+            return await fetch()
+
+        value, fresh = entry
+        if fresh:
+            cache.stats.hits += 1
+        else:
+            cache.stats.stale += 1
+            cache.refresh(key, fetch)
+        return value
+
+    return wrapper
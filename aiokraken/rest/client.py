@@ -2,6 +2,7 @@
 import asyncio
 import datetime
 import functools
+import math
 import ssl
 import time
 
@@ -24,10 +25,23 @@ from aiokraken.rest.schemas.kledger import KLedgerInfo
 from aiokraken.model.assetpair import AssetPair
 from aiokraken.model.asset import Asset
 from aiokraken.model.timeframe import KTimeFrameModel
+from aiokraken.model.time import Time
 
 from aiokraken.utils import get_kraken_logger, get_nonce
+from aiokraken.utils.clock import Clock, server_clock
+from aiokraken.utils.session import acquire_session, prewarm, release_session, shared_session
 from aiokraken.rest.api import Server, API
-from timecontrol import calllimiter
+from aiokraken.rest.limiter import KTier, LimiterState, endpoint_cost, private_limiter, public_limiter, ratelimit, unlimited
+from aiokraken.rest.throttle import AdaptiveThrottle, EndpointClass, adaptive_throttle, throttled
+from aiokraken.rest.scheduler import PriorityScheduler, limiter_scheduler, scheduled
+from aiokraken.rest.coalesce import CoalesceStats, coalesced
+from aiokraken.rest.batch import MicroBatcher
+from aiokraken.rest.cache import ResponseCache, cached
+from aiokraken.rest.hedge import Hedging
+from aiokraken.rest.stream import Columns
+from aiokraken.rest.replay import ReplaySession
+from aiokraken.rest.symbols import SymbolRegistry, symbols as process_symbols
+from aiokraken.rest.warmup import WarmupReport, warmup as warmup_client
 
 BASE_URL = 'https://api.kraken.com'
 LOGGER = get_kraken_logger(__name__)
@@ -42,13 +56,8 @@ LOGGER = get_kraken_logger(__name__)
 Intent : usability of the API...
 """
 
-# Because we need one limiter for multiple decorators
-# public_limiter = UnderLimiter(period=3)
-# private_limiter = UnderLimiter(period=5)
-# rest_command = Command(timer=datetime.datetime.now)
-
-private_limiter = calllimiter(ratelimit=datetime.timedelta(seconds=5))
-public_limiter = calllimiter(ratelimit=datetime.timedelta(seconds=3))
+# Limiters are shared between clients (per key for private ones), the decorators retrieve them from the instance.
+# Ref : https://support.kraken.com/hc/en-us/articles/206548367-What-are-the-API-rate-limits-
 
 
 class RestClient:
@@ -56,7 +65,17 @@ class RestClient:
     _tokens: typing.Dict[str, int]  # dict of tokens as key, with retrieval time as value
 
     # TODO : better async design... maybe session building as part of theclass, or maybe no class ???
-    def __init__(self, server = None, loop=None, protocol = "https://"):
+    def __init__(self, server = None, loop=None, protocol = "https://", tier: KTier = KTier.starter,
+                 throttle: typing.Optional[AdaptiveThrottle] = None,
+                 coalesce: typing.Iterable[str] = (),
+                 ticker_window: typing.Optional[float] = None,
+                 cache: typing.Optional[ResponseCache] = None,
+                 fast_decode: bool = False,
+                 clock: typing.Optional[Clock] = None,
+                 clock_sync: typing.Optional[float] = None,
+                 hedging: typing.Optional[Hedging] = None,
+                 symbols: typing.Optional[SymbolRegistry] = None,
+                 replay: typing.Optional[ReplaySession] = None):
         self.server = server or Server()
         if loop is None:
             # TODO : CAREFUL here ! This might not be the actual running loop started by the user !!!!!!
@@ -71,6 +90,47 @@ class RestClient:
 
         self.protocol = protocol
 
+        # recorded responses, served instead of kraken's. Limits are the server's : a replay does not wait for them.
+        self.replay = replay
+        if replay is None:
+            # kraken counts calls per key, so clients with the same key share the same limiter.
+            self.public_limiter = public_limiter()
+            self.private_limiter = private_limiter(key=getattr(self.server.private, 'key', None), tier=tier)
+            # private requests go through a priority queue, so orders do not wait behind history retrieval
+            self.scheduler = limiter_scheduler(self.private_limiter)
+        else:
+            self.public_limiter = unlimited()
+            self.private_limiter = unlimited()
+            self.scheduler = PriorityScheduler(self.private_limiter)
+
+        # names of the (public) methods where identical concurrent calls share one request. ex: {'ohlc', 'ticker'}
+        self.coalesce = set(coalesce)
+        self.coalesce_stats: typing.Dict[str, CoalesceStats] = dict()
+        self._inflight = dict()
+        # public responses are kept for a while, and refreshed in the background once stale.
+        self.cache = cache
+        # decoding hot endpoints (ticker, ohlc, trades) without marshmallow. Same results, less CPU.
+        self.fast_decode = fast_decode
+        # the server clock, estimated from our time requests. Run clock.synchronize(self.time) to keep it accurate.
+        # Recorded times would mislead the process clock : a replay has its own.
+        self.clock = clock if clock is not None else server_clock if replay is None else Clock()
+        # period (in seconds) of the clock synchronization, run in the background while the client is entered.
+        # ex: 60. One client is enough for a shared clock.
+        self.clock_sync = clock_sync
+        self._clock_task = None
+        # slow idempotent public requests are sent a second time, the first answer wins.
+        self.hedging = hedging
+        # names and ids of assets and pairs, kept up to date by retrieval, and persisted if AIOKRAKEN_STATE is set.
+        self.symbols = symbols if symbols is not None else process_symbols
+
+        # aggregation window (in seconds) for ticker calls, merged into one request for all pairs. ex: 0.02
+        self._ticker_batcher = MicroBatcher(self._ticker, window=ticker_window) if ticker_window else None
+        # adapting to the actual limits, learned from kraken responses
+        if throttle is None:
+            throttle = adaptive_throttle(key=getattr(self.server.private, 'key', None)) if replay is None \
+                else AdaptiveThrottle(persist=None, maximum=math.inf)
+        self.throttle = throttle
+
         self._headers = {  # TODO : aiokraken useragent
             'User-Agent': (
                 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_14_4) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/74.0.3729.131 Safari/537.36'
@@ -82,6 +142,11 @@ class RestClient:
         self._assets = None
         self._assetpairs = None
 
+    @property
+    def limits(self) -> typing.Dict[str, LimiterState]:
+        """ Current state of the rate limiters, for schedulers to plan around them """
+        return {'public': self.public_limiter.state(), 'private': self.private_limiter.state()}
+
     # TODO : verify if actually useful ??
     @async_cached_property
     async def assets(self) -> typing.Union[Assets, typing.Coroutine[None, None, Assets]]:
@@ -99,16 +164,39 @@ class RestClient:
         return await self.retrieve_assetpairs()
 
     async def __aenter__(self):
-        """ Initializes a session.
+        """ Uses the process-wide session.
         Although very useful for proper usage, this is not mandatory,
         as per https://docs.aiohttp.org/en/stable/client_reference.html#client-session
+        Without it, requests still go through the shared session, it just stays open.
         """
-        self.session = await aiohttp.ClientSession(headers=self._headers, raise_for_status=True, trust_env=True).__aenter__()
+        if self.replay is None:
+            self.session = await acquire_session()
+            if self.clock_sync is not None:
+                self._clock_task = asyncio.ensure_future(self.clock.synchronize(self.time, period=self.clock_sync))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """ Close aiohttp session """
-        await self.session.__aexit__(exc_type=exc_type, exc_val=exc_val, exc_tb=exc_tb)
+        """ Release the shared session, closed by its last user """
+        if self.replay is None:
+            if self._clock_task is not None:
+                self._clock_task.cancel()
+                self._clock_task = None
+            self.throttle.save()  # keeping what we learned for next time
+            self.session = None
+            await release_session()
+
+    async def prewarm(self, connections: int = 2) -> int:
+        """ Open connections to the server in advance, to save the handshakes on the first requests """
+        if self.replay is not None:
+            return 0
+        return await prewarm(urls=[self.protocol + self.server.url], connections=connections)
+
+    async def warmup(self, pairs: typing.Iterable[typing.Union[AssetPair, str]] = (),
+                     interval: typing.Optional[KTimeFrameModel] = KTimeFrameModel.one_minute,
+                     ticker: bool = True) -> WarmupReport:
+        """ Requests concurrently everything needed before trading : assets, pairs, time, websockets token,
+        and initial ohlc and ticker of the pairs. Returns how long each took. """
+        return await warmup_client(self, pairs=pairs, interval=interval, ticker=ticker)
 
     # TODO : maybe in Request somehow, and track the "type" (get/post) of request ??
     async def _get(self, request):  # request is coming from the API
@@ -117,94 +205,116 @@ class RestClient:
         :param request:
         :return:
         """
-        if self.session is None:
-            getter = functools.partial(aiohttp.request, method='GET')  # TODO : useragent : common / anonymous.
-        else:
-            getter = self.session.get
-
         LOGGER.info(f"GET {request.urlpath}")  # CAREFUL with {request.data}, it can contain keys ! => TODO : lower level, in request ??
-        try:
-            # TODO : pass protocol & host into the request url in order to have it displayed when erroring !
-            async with getter(url=self.protocol + self.server.url + request.urlpath, headers=request.headers,
-                                         params=request.data) as response:  # NOTE : for GET, data has to be interpreted as params !
-                return await request(response)
-                # Note : response log should be done in caller (which can choose if it is appropriate to show or not.
-        except (ssl.SSLError, aiohttp.ClientOSError) as err:  # for example : [Errno 104] Connection reset by peer / SSLError
-            LOGGER.error(err, exc_info=True)
-            # should be ponctual. just try again
-            retry_attempt = asyncio.create_task(self.time())
-            await retry_attempt  # waiting to get a result
-            return retry_attempt.result()
-            # TODO : check for error 5XX before retry
-        except aiohttp.ClientConnectorError as err:
-            LOGGER.error(err, exc_info=True)
-            return {'error': err}
-        except aiohttp.ClientResponseError as err:
-            LOGGER.error(err, exc_info=True)
-            return {'error': err}
-
-    async def _post(self, request):  # request is coming from the API
+        endpoint = request.urlpath.rsplit('/', 1)[-1]
+        for attempt in range(2):
+            try:
+                if self.hedging is not None:
+                    return await self.hedging(endpoint, functools.partial(self._get_once, request),
+                                              limiter=self.public_limiter)
+                return await self._get_once(request)
+            except (ssl.SSLError, aiohttp.ClientOSError) as err:  # for example : [Errno 104] Connection reset by peer / SSLError
+                LOGGER.error(err, exc_info=True)
+                if attempt:
+                    return {'error': err}
+                # should be ponctual. just try again the same request : public requests are idempotent.
+                # TODO : check for error 5XX before retry
+                await self.public_limiter.acquire()
+            except aiohttp.ClientResponseError as err:
+                LOGGER.error(err, exc_info=True)
+                return {'error': err}
+
+    async def _get_once(self, request):
+        # Note : the pooled session keeps connections alive, even when not used as a context manager.
+        getter = (self.replay or self.session or shared_session()).get
+        # TODO : pass protocol & host into the request url in order to have it displayed when erroring !
+        async with self.throttle(request.urlpath, limiter=self.public_limiter), \
+                getter(url=self.protocol + self.server.url + request.urlpath, headers={**self._headers, **request.headers},
+                       params=request.data) as response:  # NOTE : for GET, data has to be interpreted as params !
+            return await request(response, fast=self.fast_decode)
+            # Note : response log should be done in caller (which can choose if it is appropriate to show or not.
+
+    async def _post(self, request, stream=False):  # request is coming from the API
         """
         POST request helper. the goal here is to ensure stability.
         :param request:
+        :param stream: parse the response as it arrives, into columns (see .stream)
         :return:
         """
-        if self.session is None:
-            poster = functools.partial(aiohttp.request, method='POST')  # TODO : useragent : common / anonymous.
-        else:
-            poster = self.session.post
+        poster = (self.replay or self.session or shared_session()).post
 
         LOGGER.info(
             f"POST {request.urlpath}")  # CAREFUL with {request.data}, it can contain keys ! => TODO : lower level, in request ??
         try:
             # TODO : pass protocol & host into the request url in order to have it displayed when erroring !
-            async with poster(url=self.protocol + self.server.url + request.urlpath, headers=request.headers,
-                                         data=request.data) as response:
-                return await request(response)
+            async with self.throttle(request.urlpath, limiter=self.private_limiter), \
+                    poster(url=self.protocol + self.server.url + request.urlpath, headers={**self._headers, **request.headers},
+                           data=request.data) as response:
+                return await request(response, fast=self.fast_decode, stream=stream)
                 # Note : response log should be done in caller (which can choose if it is appropriate to show or not.
         except (ssl.SSLError, aiohttp.ClientOSError) as err:  # for example : [Errno 104] Connection reset by peer / SSLError
             LOGGER.error(err, exc_info=True)
-            # should be ponctual. just try again
-            retry_attempt = asyncio.create_task(self.time())
-            await retry_attempt  # waiting to get a result
-            return retry_attempt.result()
-        except aiohttp.ClientConnectorError as err:
-            LOGGER.error(err, exc_info=True)
+            # No retry : the nonce is spent, and kraken may have executed the request already.
             return {'error': err}
         except aiohttp.ClientResponseError as err:
             LOGGER.error(err, exc_info=True)
             return {'error': err}
 
-    @public_limiter
+    @cached
+    @coalesced
+    @throttled(EndpointClass.public)
+    @ratelimit('public_limiter')
     async def time(self):
-        """ make public requests to kraken api"""
-        # TODO : build a property, similar to assets and assetpairs, but with a local clock, sync with the server clock.
+        """ make public requests to kraken api. Also a sample for the server clock estimation. """
         req = self.server.time()   # returns the request to be made for this API.
-        return await self._get(request=req)
-
-    @public_limiter
+        # after the limiters. Throttling in _get may still lengthen the round trip : it only loosens this sample.
+        sent = self.clock.local()
+        res = await self._get(request=req)
+        if isinstance(res, Time):
+            self.clock.observe(sent=sent, received=self.clock.local(), server=res.unixtime)
+            object.__setattr__(res, 'clockskew', self.clock.offset)  # as estimated by this client (Time is frozen)
+        return res
+
+    @cached
+    @coalesced
+    @throttled(EndpointClass.public)
+    @ratelimit('public_limiter')
     async def retrieve_assets(self, assets: typing.Optional[typing.List[typing.Union[Asset, str]]]=None):
         """ make assets request to kraken api"""
-        if self._assets is None:  # we only need it once !
+        # we only need it once, unless the cache expires it ! (the cache calls us only on a miss, or to refresh)
+        if self._assets is None or (self.cache is not None and 'retrieve_assets' in self.cache):
             req = self.server.assets(assets=assets)   # returns the request to be made for this API.)
             # This request is special, because it will give us more information about other possible requests.
             resp = await self._get(request=req)
             self._assets = Assets(assets_as_dict=resp)
+            if isinstance(resp, dict):  # not on errors
+                self.symbols.update(assets=resp.values())
         return self._assets
 
-    @public_limiter
+    @cached
+    @coalesced
+    @throttled(EndpointClass.public)
+    @ratelimit('public_limiter')
     async def retrieve_assetpairs(self, pairs: typing.Optional[typing.List[typing.Union[AssetPair, str]]]=None) -> AssetPairs:
         """ make assetpairs request to kraken api"""
-        if self._assetpairs is None:  # we only need it once !
+        # we only need it once, unless the cache expires it ! (the cache calls us only on a miss, or to refresh)
+        if self._assetpairs is None or (self.cache is not None and 'retrieve_assetpairs' in self.cache):
             req = self.server.assetpair(pairs=pairs)   # returns the request to be made for this API.)
             # This request is special, because it will give us more information about other possible requests.
             resp = await self._get(request=req)
             self._assetpairs = AssetPairs(assetpairs_as_dict=resp)
+            if isinstance(resp, dict):  # not on errors
+                self.symbols.update(pairs=resp.values())
         return self._assetpairs
 
-    @public_limiter  # skippable because OHLC is not supposed to change very often, and changes should apper in later results.
-    async def ohlc(self, pair: typing.Union[AssetPair, str], interval: KTimeFrameModel = KTimeFrameModel.one_minute) -> OHLC:  # TODO: make pair mandatory
-        """ make ohlc request to kraken api"""
+    @cached
+    @coalesced
+    @throttled(EndpointClass.public)
+    @ratelimit('public_limiter')  # skippable because OHLC is not supposed to change very often, and changes should apper in later results.
+    async def ohlc(self, pair: typing.Union[AssetPair, str], interval: KTimeFrameModel = KTimeFrameModel.one_minute,
+                   since: typing.Optional[typing.Union[datetime.datetime, int]] = None) -> OHLC:  # TODO: make pair mandatory
+        """ make ohlc request to kraken api.
+        With since (usually the last of a previous OHLC), only newer candles are retrieved, to use with OHLC.update() """
 
         # cleaning up pair list
         if isinstance(pair, AssetPair):
@@ -215,12 +325,15 @@ class RestClient:
         pair = pair_proper
 
         # TODO : or maybe we should pass the assetpair from model, and let the api deal with it ??
-        req = self.server.ohlc(pair=pair, interval=interval)   # returns the request to be made for this API.)
+        if isinstance(since, datetime.datetime):
+            since = int(since.timestamp())
+        req = self.server.ohlc(pair=pair, interval=interval, since=since)   # returns the request to be made for this API.)
         resp = await self._get(request=req)
         # Note : marshmallow has already checked that the response pair matches what was requested.
         return resp
 
-    @private_limiter
+    @throttled(EndpointClass.private)
+    @scheduled(EndpointClass.private)
     async def balance(self):
         """ make balance requests to kraken api"""
         #  We need the list of assets to return proper types in balance
@@ -230,14 +343,16 @@ class RestClient:
         resp = await self._post(request=req)  # Private request must use POST !
         return resp.accounts  # Note : this depends on the schema.
 
-    @private_limiter
+    @throttled(EndpointClass.private)
+    @scheduled(EndpointClass.private)
     async def trade_balance(self):
         """ make trade balance requests to kraken api"""
 
         req = self.server.trade_balance()
         return await self._post(request=req)
 
-    @public_limiter
+    @cached
+    @coalesced
     async def ticker(self, pairs: typing.Optional[typing.List[typing.Union[str, AssetPair]]]=None):  # TODO : model currency pair/'market' in ccxt (see crypy)
         """ make public requests to kraken api"""
 
@@ -246,24 +361,40 @@ class RestClient:
         if len(pairs) > len(pair_proper):
             # retrieving assetpairs if necessary
             cleanpairs = await self.retrieve_assetpairs(pairs=pairs)
-            pair_translated = [cleanpairs[p] for p in pairs if not isinstance(p, Asset)]
+            pair_translated = [cleanpairs[p] for p in pairs if not isinstance(p, AssetPair)]
             pairs = pair_proper + pair_translated
         else:
             pairs = pair_proper
 
+        if self._ticker_batcher is None:
+            return await self._ticker(pairs=pairs)
+
+        # one request for all concurrent callers, then we take only our slice.
+        tickers = await self._ticker_batcher(pairs)
+        if 'error' in tickers:
+            return tickers
+        names = {p.restname for p in pairs}
+        return {n: t for n, t in tickers.items() if n in names}
+
+    @throttled(EndpointClass.public)
+    @ratelimit('public_limiter')
+    async def _ticker(self, pairs: typing.List[AssetPair]):
         req = self.server.ticker(pairs=pairs)   # returns the request to be made for this API.)
         return await self._get(request=req)
 
-    @private_limiter
+    @throttled(EndpointClass.trading)
+    @scheduled(EndpointClass.trading)
     async def openorders(self, trades=False):  # TODO : trades
         """ make private openorders request to kraken api"""
 
         req = self.server.openorders(trades=trades)   # returns the request to be made for this API.)
         return await self._post(request=req)
 
-    @private_limiter
-    async def closedorders(self, trades=False, start: datetime =None, end: datetime = None, offset = 0) -> typing.Tuple[typing.Dict[str, KClosedOrderModel], int]:  # offset 0 or None ??
-        """ make private closedorders request to kraken api"""
+    @throttled(EndpointClass.history)
+    @scheduled(EndpointClass.history)
+    async def closedorders(self, trades=False, start: datetime =None, end: datetime = None, offset = 0, columns: bool = False) -> typing.Tuple[typing.Union[typing.Dict[str, KClosedOrderModel], Columns], int]:  # offset 0 or None ??
+        """ make private closedorders request to kraken api
+        With columns, the response is streamed into flattened columns, instead of a dict of orders."""
         # Note : here there is no filtering by assetpair from Kraken API, it needs to be managed one level up...
         if end is None:
             end = datetime.datetime.now()
@@ -271,26 +402,30 @@ class RestClient:
             start = datetime.datetime(year=1970, month=1, day=1, hour=1)  # EPOCH
 
         req = self.server.closedorders(trades=trades, start=int(start.timestamp()), end=int(end.timestamp()), offset=offset)
-        corders_list, count = await self._post(request=req)
+        corders_list, count = await self._post(request=req, stream=columns)
         return corders_list, count  # making multiple return explicit in interface
 
-    @private_limiter
+    @throttled(EndpointClass.trading)
+    @scheduled(EndpointClass.trading, cost=endpoint_cost('AddOrder'))
     async def addorder(self, order):
         """ make public requests to kraken api"""
 
         req = self.server.addorder(order=order)
         return await self._post(request=req)
 
-    @private_limiter
+    @throttled(EndpointClass.trading)
+    @scheduled(EndpointClass.trading, cost=endpoint_cost('CancelOrder'))
     async def cancel(self, txid_userref):
         """ make public requests to kraken api"""
         # TODO : accept order, (but only use its userref or id)
         req = self.server.cancel(txid_userref = txid_userref)
         return await self._post(request=req)
 
-    @private_limiter
-    async def trades(self, start: datetime =None, end: datetime = None, offset = 0) -> typing.Tuple[typing.Dict[str, KTradeModel], int]:  # offset 0 or None ??
-        """ make tradeshistory requests to kraken api"""
+    @throttled(EndpointClass.history)
+    @scheduled(EndpointClass.history, cost=endpoint_cost('TradesHistory'))
+    async def trades(self, start: datetime =None, end: datetime = None, offset = 0, columns: bool = False) -> typing.Tuple[typing.Union[typing.Dict[str, KTradeModel], Columns], int]:  # offset 0 or None ??
+        """ make tradeshistory requests to kraken api
+        With columns, the response is streamed into columns, instead of a dict of trades."""
         # Note : here there is no filtering by assetpair from Kraken API, it needs to be managed one level up...
         if end is None:
             end = datetime.datetime.now()
@@ -298,12 +433,14 @@ class RestClient:
             start = datetime.datetime(year=1970, month=1, day=1, hour=1)  # EPOCH
 
         req = self.server.trades_history(start=int(start.timestamp()), end=int(end.timestamp()), offset = offset)
-        trades_list, count = await self._post(request=req)
+        trades_list, count = await self._post(request=req, stream=columns)
         return trades_list, count  # making multiple return explicit in interface
 
-    @private_limiter
-    async def ledgers(self, start: datetime =None, end: datetime = None, asset: typing.Optional[typing.List[typing.Union[Asset, str]]] = None, offset=0) -> typing.Tuple[typing.Dict[str, KLedgerInfo], int]:
-        """ make ledgers requests to kraken api """
+    @throttled(EndpointClass.history)
+    @scheduled(EndpointClass.history, cost=endpoint_cost('Ledgers'))
+    async def ledgers(self, start: datetime =None, end: datetime = None, asset: typing.Optional[typing.List[typing.Union[Asset, str]]] = None, offset=0, columns: bool = False) -> typing.Tuple[typing.Union[typing.Dict[str, KLedgerInfo], Columns], int]:
+        """ make ledgers requests to kraken api
+        With columns, the response is streamed into columns, instead of a dict of ledger entries. """
 
         # cleaning up asset list
         if asset is not None:  # means for all assets
@@ -326,10 +463,11 @@ class RestClient:
             start = int(start.timestamp())
 
         req = self.server.ledgers(asset=asset, start=start, end=end, offset=offset)
-        more_ledgers, count = await self._post(request=req)
+        more_ledgers, count = await self._post(request=req, stream=columns)
         return more_ledgers, count  # making multiple return explicit in interface
 
-    @private_limiter
+    @throttled(EndpointClass.private)
+    @scheduled(EndpointClass.private)
     async def websockets_token(self):
         # Note : token is valid for 15 minutes, no need to retrieve another to setup multiple websocket connexions.
         if not hasattr(self, "_token"):
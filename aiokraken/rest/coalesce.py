@@ -0,0 +1,68 @@
+""" Single-flight coalescing of identical concurrent requests.
+
+When many coroutines ask for the same public data at the same time (same ohlc, same ticker...),
+only the first one actually sends a request. The others wait for it, and share the parsed result.
+This is opt-in per endpoint, since the result is shared (and not copied) between callers.
+"""
+import asyncio
+import functools
+import inspect
+import typing
+from dataclasses import dataclass
+
+
+@dataclass
+class CoalesceStats:
+    calls: int = 0
+    deduplicated: int = 0
+
+
+def _freeze(value: typing.Any) -> typing.Hashable:
+    """ build a hashable key from call arguments
+    >>> _freeze({'pairs': ['XBTEUR', 'ETHEUR'], 'interval': 1})
+    (('interval', 1), ('pairs', ('XBTEUR', 'ETHEUR')))
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    elif isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def call_key(signature: inspect.Signature, *args, **kwargs) -> typing.Hashable:
+    """ a hashable key for a method call, independent of how arguments were passed (positional, keyword, default) """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return _freeze({k: v for k, v in bound.arguments.items() if k != 'self'})
+
+
+def coalesced(fn):
+    """ Decorator for client coroutine methods. Coalescing is active only if the method name is in the client coalesce set.
+    Must be above the limiter decorators, so that the shared call goes through limiters only once."""
+    name = fn.__name__
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        if name not in self.coalesce:
+            return await fn(self, *args, **kwargs)
+
+        key = (name, call_key(signature, self, *args, **kwargs))
+
+        stats = self.coalesce_stats.setdefault(name, CoalesceStats())
+        stats.calls += 1
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(fn(self, *args, **kwargs))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            stats.deduplicated += 1
+
+        # shielding so that one cancelled caller does not cancel the request for everyone
+        return await asyncio.shield(inflight)
+
+    return wrapper
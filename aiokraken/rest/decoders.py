@@ -0,0 +1,136 @@
+""" Fast decoders for hot REST endpoints (Ticker, OHLC, TradesHistory), bypassing marshmallow.
+
+Marshmallow validates everything, field by field, with nested schemas and hooks. This is safe, but slow for
+responses we receive very often, or that are very long. These decoders build the same models directly.
+Whenever a payload does not have the exact expected shape, they give up and the marshmallow schema is used instead,
+so that the same validation errors are raised.
+
+orjson is used to decode JSON when it is installed.
+"""
+import json
+import typing
+from decimal import Decimal
+
+
+from aiokraken.model.ohlc import OHLC
+from aiokraken.model.ticker import DailyValue, MinOrder, MinTrade, Ticker
+from aiokraken.rest.exceptions import AIOKrakenServerError
+from aiokraken.rest.schemas.kabtype import KABTypeModel
+from aiokraken.rest.schemas.kordertype import KOrderTypeModel
+from aiokraken.rest.schemas.ktrade import KTradeModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(raw: typing.Union[bytes, str]) -> typing.Any:
+    """
+    >>> loads(b'{"error":[],"result":{"unixtime":1571150298}}')
+    {'error': [], 'result': {'unixtime': 1571150298}}
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class UnexpectedPayload(Exception):
+    """ The payload does not have the shape a fast decoder expects. The schema must be used instead. """
+
+
+def result(payload: typing.Mapping) -> typing.Any:
+    """ raising kraken errors (like the ErrorsField of schemas) and returning the result """
+    if set(payload) - {'error', 'result'}:
+        raise UnexpectedPayload(f"Unexpected keys in payload: {set(payload)}")
+    for e in payload.get('error', []):
+        raise AIOKrakenServerError(e)
+    return payload['result']
+
+
+def _decimal(value) -> Decimal:
+    # like marshmallow fields.Decimal.
+    # floats are left to the schema : some fields convert them exactly (Decimal(value)), others via str.
+    if not isinstance(value, (str, int, Decimal)) or isinstance(value, bool):
+        raise UnexpectedPayload(f"Not a valid number: {value}")
+    num = Decimal(str(value))
+    if not num.is_finite():
+        raise UnexpectedPayload(f"Special numeric value not allowed: {value}")
+    return num
+
+
+def _str(value, allow_none=False) -> typing.Optional[str]:
+    # like marshmallow fields.Str
+    if not isinstance(value, str) and not (allow_none and value is None):
+        raise UnexpectedPayload(f"Not a valid string: {value}")
+    return value
+
+
+_ticker_keys = {'a', 'b', 'c', 'v', 'p', 't', 'l', 'h', 'o'}
+
+
+def decode_ticker(payload: typing.Mapping) -> typing.Dict[str, Ticker]:
+    tickers = dict()
+    for name, t in result(payload).items():
+        if t.keys() != _ticker_keys:
+            raise UnexpectedPayload(f"Unexpected keys in ticker: {set(t)}")
+        a, b, c, v, p, n, l, h = t['a'], t['b'], t['c'], t['v'], t['p'], t['t'], t['l'], t['h']
+        tickers[name] = Ticker(
+            ask=MinOrder(price=_decimal(a[0]), whole_lot_volume=_decimal(a[1]), lot_volume=_decimal(a[2])),
+            bid=MinOrder(price=_decimal(b[0]), whole_lot_volume=_decimal(b[1]), lot_volume=_decimal(b[2])),
+            last_trade_closed=MinTrade(price=_decimal(c[0]), lot_volume=_decimal(c[1])),
+            volume=DailyValue(today=_decimal(v[0]), last_24_hours=_decimal(v[1])),
+            volume_weighted_average_price=DailyValue(today=_decimal(p[0]), last_24_hours=_decimal(p[1])),
+            high=DailyValue(today=_decimal(h[0]), last_24_hours=_decimal(h[1])),
+            number_of_trades=DailyValue(today=_decimal(n[0]), last_24_hours=_decimal(n[1])),
+            low=DailyValue(today=_decimal(l[0]), last_24_hours=_decimal(l[1])),
+            todays_opening=_decimal(t['o']),
+            pairname=name,
+        )
+    return tickers
+
+
+def ohlc_decoder(pair: str) -> typing.Callable[[typing.Mapping], OHLC]:
+    """ the OHLC payload has the pair name as key """
+
+    def decode_ohlc(payload: typing.Mapping) -> OHLC:
+        res = result(payload)
+        if res.keys() != {pair, 'last'} or not isinstance(res['last'], int):
+            raise UnexpectedPayload(f"Unexpected keys in OHLC: {set(res)}")
+        return OHLC.from_records(res[pair], last=res['last'])
+
+    return decode_ohlc
+
+
+_trade_keys = {'ordertxid', 'pair', 'time', 'type', 'ordertype', 'price', 'cost', 'fee', 'vol', 'margin', 'misc'}
+_trade_optional_keys = {'postxid', 'posstatus', 'trade_id'}
+
+
+def decode_trades(payload: typing.Mapping) -> typing.Tuple[typing.Dict[str, KTradeModel], int]:
+    res = result(payload)
+    if res.keys() != {'trades', 'count'}:
+        raise UnexpectedPayload(f"Unexpected keys in trades history: {set(res)}")
+    trades = dict()
+    for txid, t in res['trades'].items():
+        keys = t.keys()
+        if not (_trade_keys <= keys) or keys - _trade_keys - _trade_optional_keys:
+            raise UnexpectedPayload(f"Unexpected keys in trade: {set(keys)}")
+        trades[txid] = KTradeModel(
+            ordertxid=_str(t['ordertxid']),
+            pair=_str(t['pair']),
+            time=None if t['time'] is None else int(t['time']),  # like marshmallow Integer, truncating
+            type=KABTypeModel(t['type']),
+            ordertype=KOrderTypeModel(t['ordertype']),
+            price=_decimal(t['price']),
+            cost=_decimal(t['cost']),
+            fee=_decimal(t['fee']),
+            vol=_decimal(t['vol']),
+            margin=_decimal(t['margin']),
+            misc=_str(t['misc']),
+            postxid=_str(t.get('postxid'), allow_none=True),
+            posstatus=_str(t.get('posstatus'), allow_none=True),
+            trade_id=_str(t.get('trade_id', txid), allow_none=True),
+        )
+    if not isinstance(res['count'], int):
+        raise UnexpectedPayload(f"Unexpected count: {res['count']}")
+    return trades, res['count']
@@ -0,0 +1,128 @@
+""" Hedged requests, to cut the latency tail of idempotent public calls.
+
+Most responses come quickly, but a few get stuck (slow TLS, lost packet, overloaded server...).
+If a request has not answered after a usual latency (a high percentile of recent ones), we send the same request again.
+The pool gives it another connection. The first answer wins, the other request is cancelled.
+Ref : "The tail at scale", J. Dean and L. A. Barroso
+
+Hedges are extra calls : they are only sent for a fraction of the calls, and when the rate limiter has headroom for them.
+The primary call has just been counted, so a tight limiter (public : one call) never has room right away.
+A hedge may go over the limiter maximum, by up to the headroom. It is spent on the limiter all the same :
+the following calls wait for it.
+"""
+import asyncio
+import collections
+import time
+import typing
+from dataclasses import dataclass
+
+from aiokraken.rest.limiter import CounterDecayLimiter
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+# Public endpoints safe to send twice
+IDEMPOTENT = frozenset({'Ticker', 'OHLC', 'AssetPairs', 'Time'})
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0
+    hedged: int = 0  # calls where a hedge was sent
+    won: int = 0  # calls answered by the hedge first
+    skipped: int = 0  # calls slow enough for a hedge, but without budget for it
+
+
+class Hedging:
+    """ Hedging policy and latency tracking, for one client.
+
+    >>> hedging = Hedging(percentile=0.9, warmup=10)
+    >>> hedging.delay('Ticker')  # not enough samples yet : the default delay
+    0.5
+    >>> for latency in range(1, 21):
+    ...     hedging.record('Ticker', latency / 100)
+    >>> hedging.delay('Ticker')
+    0.18
+    """
+
+    def __init__(self, endpoints: typing.Iterable[str] = IDEMPOTENT, percentile: float = 0.95, delay: float = 0.5,
+                 window: int = 200, warmup: int = 20, budget: float = 0.1, headroom: float = 1,
+                 timer: typing.Callable[[], float] = time.monotonic):
+        """
+        :param endpoints: the endpoints to hedge. They must be idempotent.
+        :param percentile: of recent latencies, after which a hedge is sent
+        :param delay: the hedge delay, until we have enough latencies
+        :param window: number of latencies kept, for each endpoint
+        :param warmup: number of latencies needed, before relying on them
+        :param budget: maximum fraction of calls that can be hedged
+        :param headroom: how far over the limiter maximum hedges may go, in calls
+        """
+        self.endpoints = frozenset(endpoints)
+        self.percentile = percentile
+        self.default_delay = delay
+        self.window = window
+        self.warmup = warmup
+        self.budget = budget
+        self.headroom = headroom
+        self.timer = timer
+        self.latencies: typing.Dict[str, typing.Deque[float]] = dict()
+        self.stats: typing.Dict[str, HedgeStats] = dict()
+
+    def record(self, endpoint: str, latency: float):
+        self.latencies.setdefault(endpoint, collections.deque(maxlen=self.window)).append(latency)
+
+    def delay(self, endpoint: str) -> float:
+        latencies = self.latencies.get(endpoint, ())
+        if len(latencies) < self.warmup:
+            return self.default_delay
+        return sorted(latencies)[int(self.percentile * (len(latencies) - 1))]
+
+    def _affordable(self, stats: HedgeStats, limiter: typing.Optional[CounterDecayLimiter]) -> bool:
+        if stats.hedged >= self.budget * stats.calls:
+            return False
+        if limiter is not None:
+            if limiter.counter + 1 > limiter.maximum + self.headroom:
+                return False
+            limiter.spend()
+        return True
+
+    async def __call__(self, endpoint: str, send: typing.Callable[[], typing.Awaitable],
+                       limiter: typing.Optional[CounterDecayLimiter] = None):
+        """ send the request, and hedge it if it is too slow.
+        :param send: sends the request and returns the parsed response. Called twice when hedging.
+        :param limiter: the rate limiter hedges are spent on
+        """
+        if endpoint not in self.endpoints:
+            return await send()
+        stats = self.stats.setdefault(endpoint, HedgeStats())
+        stats.calls += 1
+
+        start = self.timer()
+        primary = asyncio.ensure_future(send())
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.delay(endpoint))
+            if not done:
+                if self._affordable(stats, limiter):
+                    LOGGER.debug(f"Hedging {endpoint} after {self.timer() - start:.3f}s")
+                    stats.hedged += 1
+                    pending.add(asyncio.ensure_future(send()))
+                else:
+                    stats.skipped += 1
+
+            error = None
+            while True:
+                for f in done:
+                    if f.exception() is None:
+                        if f is not primary:
+                            stats.won += 1
+                        # when the hedge wins, the primary latency is (at least) this
+                        self.record(endpoint, self.timer() - start)
+                        return f.result()
+                    error = error or f.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for f in pending:
+                f.cancel()
@@ -0,0 +1,204 @@
+""" Rate limiting modelled on the Kraken API call counter.
+
+Ref : https://support.kraken.com/hc/en-us/articles/206548367-What-are-the-API-rate-limits-
+Each API key has a counter, starting at 0. Every call increases it by the cost of the endpoint,
+and the counter decays over time at a rate depending on the account tier.
+When the counter goes over the tier maximum, kraken answers with "EAPI:Rate limit exceeded".
+"""
+import asyncio
+import functools
+import math
+import time
+import typing
+from dataclasses import dataclass
+from enum import Enum
+
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+
+class KTier(Enum):
+    """
+    Kraken account verification tiers, as (maximum counter, decay per second).
+
+    >>> KTier.starter.maximum
+    15
+    >>> KTier.pro.decay
+    1.0
+    """
+    starter = (15, 0.33)
+    intermediate = (20, 0.5)
+    pro = (20, 1.0)
+
+    @property
+    def maximum(self) -> int:
+        return self.value[0]
+
+    @property
+    def decay(self) -> float:
+        return self.value[1]
+
+
+# Cost of each private endpoint on the counter. Anything not listed here costs 1.
+# Note : AddOrder and CancelOrder are limited by the matching engine, separately from this counter.
+ENDPOINT_COST = {
+    'Ledgers': 2,
+    'QueryLedgers': 2,
+    'TradesHistory': 2,
+    'QueryTrades': 2,
+    'AddOrder': 0,
+    'CancelOrder': 0,
+}
+
+
+def endpoint_cost(endpoint: str) -> int:
+    """
+    >>> endpoint_cost('Ledgers')
+    2
+    >>> endpoint_cost('Balance')
+    1
+    """
+    return ENDPOINT_COST.get(endpoint, 1)
+
+
+@dataclass(frozen=True)
+class LimiterState:
+    """ A snapshot of a limiter, for schedulers to plan around it. """
+    counter: float
+    maximum: float
+    decay: float
+
+    def wait(self, cost: float = 1) -> float:
+        """ projected wait (in seconds) before a call of this cost can be made
+        >>> LimiterState(counter=15, maximum=15, decay=0.5).wait(cost=2)
+        4.0
+        >>> LimiterState(counter=3, maximum=15, decay=0.5).wait(cost=2)
+        0.0
+        """
+        return max(0.0, (self.counter + cost - self.maximum) / self.decay)
+
+
+class CounterDecayLimiter:
+    """
+    A counter that decays linearly over time, and can be spent up to its maximum.
+    Calls over budget wait until the counter has decayed enough.
+
+    >>> clock = [0.0]
+    >>> lim = CounterDecayLimiter(maximum=3, decay=1, timer=lambda: clock[0])
+    >>> lim.spend(cost=2)
+    0.0
+    >>> lim.spend(cost=2)
+    1.0
+    >>> lim.counter
+    4.0
+    >>> clock[0] = 2.0
+    >>> lim.counter
+    2.0
+    >>> lim.state().wait(cost=1)
+    0.0
+    """
+
+    def __init__(self, maximum: float, decay: float,
+                 timer: typing.Callable[[], float] = time.monotonic,
+                 sleeper: typing.Callable[[float], typing.Awaitable] = asyncio.sleep):
+        self.maximum = maximum
+        self.decay = decay
+        self.timer = timer
+        self.sleeper = sleeper
+
+        self._counter = 0.0
+        self._stamp = self.timer()
+
+    @classmethod
+    def from_tier(cls, tier: KTier, **kwargs):
+        return cls(maximum=tier.maximum, decay=tier.decay, **kwargs)
+
+    @property
+    def counter(self) -> float:
+        """ current value of the counter, after decay """
+        elapsed = self.timer() - self._stamp
+        return max(0.0, self._counter - elapsed * self.decay)
+
+    def state(self) -> LimiterState:
+        return LimiterState(counter=self.counter, maximum=self.maximum, decay=self.decay)
+
+    def wait_time(self, cost: float = 1) -> float:
+        return self.state().wait(cost=cost)
+
+    def spend(self, cost: float = 1) -> float:
+        """ Reserve the cost on the counter immediately, and return how long the caller must wait before calling.
+        Reserving before waiting keeps concurrent callers in order, without any lock."""
+        wait = self.wait_time(cost=cost)
+        self._counter = self.counter + cost
+        self._stamp = self.timer()
+        return wait
+
+    def set_tier(self, tier: KTier):
+        """ new limits for the same counter, when the account tier changes """
+        self._counter = self.counter  # decayed at the previous rate until now
+        self._stamp = self.timer()
+        self.maximum, self.decay = tier.maximum, tier.decay
+
+    def saturate(self):
+        """ To be called when the server tells us we went over the limit : our counter was wrong. """
+        self._counter = max(self.counter, self.maximum)
+        self._stamp = self.timer()
+
+    async def acquire(self, cost: float = 1) -> float:
+        """ wait until the call can be made. returns the time waited. """
+        wait = self.spend(cost=cost)
+        if wait > 0:
+            await self.sleeper(wait)
+        return wait
+
+    def __repr__(self):
+        return f"<CounterDecayLimiter {self.counter:.2f}/{self.maximum} -{self.decay}/s>"
+
+
+def unlimited() -> CounterDecayLimiter:
+    """ a limiter that never waits, for clients not talking to kraken (replays)
+    >>> unlimited().spend(cost=1000)
+    0.0
+    """
+    return CounterDecayLimiter(maximum=math.inf, decay=1.0)
+
+
+# Limiters are shared by all clients using the same key, since kraken counts per key.
+_key_limiters: typing.Dict[typing.Optional[str], CounterDecayLimiter] = dict()
+
+
+def private_limiter(key: typing.Optional[str], tier: KTier = KTier.starter) -> CounterDecayLimiter:
+    try:
+        limiter = _key_limiters[key]
+    except KeyError:
+        _key_limiters[key] = CounterDecayLimiter.from_tier(tier)
+        return _key_limiters[key]
+    if (limiter.maximum, limiter.decay) != (tier.maximum, tier.decay):
+        # kraken has one tier per key : the latest one given is the reference
+        LOGGER.warning(f"Rate limiter shared with another tier, switching it to {tier.name}")
+        limiter.set_tier(tier)
+    return limiter
+
+
+_public_limiter: typing.Optional[CounterDecayLimiter] = None
+
+
+def public_limiter() -> CounterDecayLimiter:
+    # Public endpoints are limited per IP, around one call per second.
+    # There is no documented burst, so we keep the counter at one call.
+    global _public_limiter
+    if _public_limiter is None:
+        _public_limiter = CounterDecayLimiter(maximum=1, decay=1.0)
+    return _public_limiter
+
+
+def ratelimit(limiter: str, cost: float = 1):
+    """ Decorator for client coroutine methods, acquiring the limiter attribute of the instance before calling. """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            await getattr(self, limiter).acquire(cost=cost)
+            return await fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
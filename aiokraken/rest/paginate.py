@@ -0,0 +1,105 @@
+""" Concurrent retrieval of paginated private results (trades, ledgers, closed orders).
+
+Kraken returns at most 50 results per request, along with the total count.
+Once the count is known from the first page, all remaining offsets can be requested at once.
+The client scheduler still spends the rate budget one request at a time, but no request waits for the previous response anymore,
+and pages are passed on to the caller as soon as they arrive.
+
+Concurrency is opt-in : each private request is signed with a nonce when it is built, and concurrent requests
+go through different connections, so kraken may receive them out of order and answer "EAPI:Invalid nonce".
+Only request pages concurrently when a nonce window is configured on the API key (in kraken account settings).
+By default, pages are requested one after the other.
+"""
+import asyncio
+import typing
+from dataclasses import dataclass
+
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+Page = typing.Dict[str, typing.Any]
+
+# kraken's page size. A page may hold less (the first one, for instance), offsets still go by this.
+PAGE_SIZE = 50
+
+
+@dataclass
+class PaginationStats:
+    pages: int = 0
+    concurrent: int = 0  # pages requested without waiting for the previous one
+    refills: int = 0  # pages requested again because results shifted while we were paging
+
+
+async def paginate(page: typing.Callable[[int], typing.Awaitable[typing.Tuple[Page, int]]],
+                   concurrency: int = 1,
+                   stats: typing.Optional[PaginationStats] = None) -> typing.AsyncIterator[Page]:
+    """ Yields pages as they arrive. page(offset) must return (results, count), like client.trades() for instance.
+    :param concurrency: pages requested at once. Above 1 only with a nonce window on the key.
+
+    >>> records = {str(i): i for i in range(120)}
+    >>> async def page(offset):
+    ...     return {k: records[k] for k in list(records)[offset: offset + 50]}, len(records)
+    >>> async def retrieve():
+    ...     results = dict()
+    ...     async for p in paginate(page):
+    ...         results.update(p)
+    ...     return results
+    >>> asyncio.run(retrieve()) == records
+    True
+    """
+    stats = stats if stats is not None else PaginationStats()
+    semaphore = asyncio.Semaphore(concurrency)  # to not flood the scheduler queue for very long histories
+
+    first, count = await page(0)
+    stats.pages += 1
+    yield first
+
+    retrieved = set(first)
+    if not first:
+        return
+    # offset ranges already retrieved, to find the gaps left by short pages
+    covered = [(0, len(first))]
+
+    def missing() -> int:
+        """ the first offset not retrieved yet """
+        offset = 0
+        for start, end in sorted(covered):
+            if start > offset:
+                break
+            offset = max(offset, end)
+        return offset
+
+    async def bounded(offset):
+        async with semaphore:
+            return offset, await page(offset)
+
+    tasks = [asyncio.ensure_future(bounded(offset)) for offset in range(PAGE_SIZE, count, PAGE_SIZE)]
+    if concurrency > 1:
+        stats.concurrent += len(tasks)
+    try:
+        for next_page in asyncio.as_completed(tasks):
+            offset, (results, count) = await next_page
+            stats.pages += 1
+            covered.append((offset, offset + len(results)))
+            retrieved.update(results)
+            yield results
+    finally:
+        for t in tasks:  # if the caller stops iterating early
+            t.cancel()
+
+    # short pages leave gaps, and new results may have shifted offsets while we were paging :
+    # completing sequentially, like before.
+    while len(retrieved) < count:
+        offset = missing()
+        if offset >= count:  # everything covered, but results shifted
+            offset = len(retrieved)
+        LOGGER.info(f"Retrieved {len(retrieved)} out of {count} results, requesting more from offset {offset}")
+        results, count = await page(offset)
+        stats.pages += 1
+        stats.refills += 1
+        if not set(results) - retrieved:
+            break  # nothing new, we would loop forever
+        covered.append((offset, offset + len(results)))
+        retrieved.update(results)
+        yield results
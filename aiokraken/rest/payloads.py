@@ -11,6 +11,7 @@ from .schemas.ticker import TickerSchema
 
 
 class PayloadBaseSchema(BaseSchema):
+    compiled = True
 
     error = ErrorsField()
     # TODO : handle error parsing from payload
@@ -0,0 +1,213 @@
+""" Replay transport : a RestClient answered by recorded responses, instead of kraken.
+
+Responses come from vcr cassettes (the YAML files under tests/cassettes), or from a JSONL log,
+one interaction per line :
+{"method": "GET", "uri": "https://api.kraken.com/0/public/Time", "body": null,
+ "status": 200, "response": {"error": [], "result": {...}}, "latency": 0.12}
+(response can also be the body as a string, and latency is optional).
+
+Requests are matched on method, path and parameters (except the nonce).
+A request recorded several times gets the recorded responses in order, then the last one again.
+The limiters are the server's business : a replaying client does not wait for them,
+and runs strategies or builds frames from real payloads at full CPU speed.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import typing
+import urllib.parse
+from dataclasses import dataclass, field
+
+import yaml
+
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+# parameters changing with every request
+_volatile = frozenset({'nonce', 'otp'})
+
+
+def _params(data: typing.Union[None, str, bytes, typing.Mapping]) -> typing.Tuple[typing.Tuple[str, str], ...]:
+    """ parameters of a request, whatever their form, ready to compare.
+
+    >>> _params('nonce=1581513879417&ofs=5') == _params({'ofs': 5, 'nonce': 42})
+    True
+    >>> _params(None)
+    ()
+    """
+    if data is None:
+        return ()
+    if isinstance(data, bytes):
+        data = data.decode()
+    items = urllib.parse.parse_qsl(data) if isinstance(data, str) else data.items()
+    return tuple(sorted((str(k), str(v)) for k, v in items if k not in _volatile))
+
+
+@dataclass
+class Interaction:
+    """ a recorded request, and its response """
+    method: str
+    path: str
+    params: typing.Tuple[typing.Tuple[str, str], ...]
+    body: bytes
+    status: int = 200
+    headers: typing.Dict[str, str] = field(default_factory=dict)
+    latency: float = 0.0  # seconds, if recorded
+
+    @classmethod
+    def from_request(cls, method: str, uri: str, data, **response) -> 'Interaction':
+        """ from the request as recorded (data is the body, for POST), and the response fields """
+        url = urllib.parse.urlsplit(uri)
+        params = _params(url.query) if method == 'GET' else _params(data)
+        return cls(method=method, path=url.path, params=params, **response)
+
+    @property
+    def key(self):
+        return self.method, self.path, self.params
+
+
+class ReplayMiss(KeyError):
+    """ no recorded response for this request """
+
+
+class ReplayContent:
+    """ the body, like aiohttp.StreamReader gives it """
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def iter_chunked(self, n: int):
+        for i in range(0, len(self.body), n):
+            yield self.body[i: i + n]
+
+
+class ReplayResponse:
+    """ the recorded response, like aiohttp.ClientResponse gives it """
+
+    def __init__(self, interaction: Interaction):
+        self.status = interaction.status
+        self.headers = interaction.headers
+        self.content = ReplayContent(interaction.body)
+
+    async def read(self) -> bytes:
+        return self.content.body
+
+    async def text(self, encoding: str = 'utf-8') -> str:
+        return self.content.body.decode(encoding)
+
+    async def json(self, encoding: str = 'utf-8', content_type=None, loads=json.loads):
+        return loads(self.content.body.decode(encoding))
+
+
+class ReplaySession:
+    """ Answers get and post like an aiohttp.ClientSession, from recorded interactions.
+
+    >>> session = ReplaySession([Interaction.from_request('GET', 'https://api.kraken.com/0/public/Time', None,
+    ...                                                   body=b'{"error": [], "result": {"unixtime": 1573134567}}')])
+    >>> async def time():
+    ...     async with session.get(url='https://api.kraken.com/0/public/Time') as response:
+    ...         return await response.json()
+    >>> asyncio.run(time())
+    {'error': [], 'result': {'unixtime': 1573134567}}
+    >>> session.served
+    1
+    """
+
+    def __init__(self, interactions: typing.Iterable[Interaction], latency: typing.Union[bool, float] = False,
+                 strict: bool = False, sleeper: typing.Callable[[float], typing.Awaitable] = asyncio.sleep):
+        """
+        :param interactions: the recorded requests and responses
+        :param latency: True to wait for the recorded latency before answering, a number to always wait that long.
+        :param strict: if False, a request recorded with other parameters gets the responses recorded for its path.
+        """
+        self.latency = latency
+        self.strict = strict
+        self.sleeper = sleeper
+        self.served = 0
+
+        self._recorded: typing.Dict[typing.Tuple, typing.List[Interaction]] = dict()
+        self._by_path: typing.Dict[typing.Tuple, typing.List[Interaction]] = dict()
+        for i in interactions:
+            self._recorded.setdefault(i.key, list()).append(i)
+            self._by_path.setdefault(i.key[:2], list()).append(i)
+        self._cursor: typing.Dict[typing.Tuple, int] = dict()
+
+    @classmethod
+    def from_cassettes(cls, *paths: str, **kwargs) -> 'ReplaySession':
+        """ from vcr cassettes. A directory means all cassettes in it. """
+        return cls(_cassette_interactions(_files(paths, '.yaml')), **kwargs)
+
+    @classmethod
+    def from_jsonl(cls, *paths: str, **kwargs) -> 'ReplaySession':
+        """ from JSONL logs, one interaction per line """
+        return cls(_jsonl_interactions(_files(paths, '.jsonl')), **kwargs)
+
+    def _next(self, key: typing.Tuple, recorded: typing.List[Interaction]) -> Interaction:
+        n = self._cursor.get(key, 0)
+        self._cursor[key] = n + 1
+        return recorded[min(n, len(recorded) - 1)]
+
+    def match(self, method: str, url: str, params) -> Interaction:
+        key = (method, urllib.parse.urlsplit(url).path, _params(params))
+        if key in self._recorded:
+            return self._next(key, self._recorded[key])
+        if not self.strict and key[:2] in self._by_path:
+            LOGGER.debug(f"Replaying {key[1]} recorded with other parameters than {dict(key[2])}")
+            return self._next(key[:2], self._by_path[key[:2]])
+        raise ReplayMiss(f"No recorded response for {method} {key[1]} {dict(key[2])}")
+
+    @contextlib.asynccontextmanager
+    async def _request(self, method: str, url: str, params):
+        interaction = self.match(method, url, params)
+        delay = interaction.latency if self.latency is True else float(self.latency)
+        if delay > 0:
+            await self.sleeper(delay)
+        self.served += 1
+        yield ReplayResponse(interaction)
+
+    def get(self, url: str, headers=None, params=None):
+        return self._request('GET', url, params)
+
+    def post(self, url: str, headers=None, data=None):
+        return self._request('POST', url, data)
+
+
+def _files(paths: typing.Iterable[str], suffix: str) -> typing.List[str]:
+    files = list()
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(sorted(os.path.join(d, f) for d, _, fs in os.walk(p) for f in fs if f.endswith(suffix)))
+        else:
+            files.append(p)
+    return files
+
+
+def _cassette_interactions(files: typing.Iterable[str]) -> typing.Iterator[Interaction]:
+    for f in files:
+        with open(f) as cassette:
+            for i in yaml.safe_load(cassette)['interactions']:
+                body = i['response']['body']['string']
+                yield Interaction.from_request(
+                    i['request']['method'], i['request']['uri'], i['request']['body'],
+                    body=body.encode() if isinstance(body, str) else body,
+                    status=i['response']['status']['code'],
+                    headers={k: ', '.join(v) if isinstance(v, list) else v for k, v in i['response']['headers'].items()})
+
+
+def _jsonl_interactions(files: typing.Iterable[str]) -> typing.Iterator[Interaction]:
+    for f in files:
+        with open(f) as log:
+            for line in log:
+                if not line.strip():
+                    continue
+                i = json.loads(line)
+                response = i['response']
+                yield Interaction.from_request(
+                    i.get('method', 'GET'), i['uri'], i.get('body'),
+                    body=(response if isinstance(response, str) else json.dumps(response)).encode(),
+                    status=i.get('status', 200), latency=i.get('latency', 0.0))
@@ -3,8 +3,8 @@ import hmac
 import urllib
 import base64
 from dataclasses import dataclass, asdict, field
-from ..utils import get_nonce
 from .response import Response
+from .decoders import loads
 import typing
 
 import logging
@@ -20,6 +20,7 @@ def _sign_message(data, url_path, secret):
         Kraken message signature for private user endpoints
         https://www.kraken.com/features/api#general-usage
         url_path starts from the root (like "/<version>/private/endpoint")
+        Reference implementation : requests are signed by a .signer.Signer, doing the same, faster.
     """
     post_data = urllib.parse.urlencode(data)
 
@@ -52,27 +53,28 @@ class Request:
         rest_log.info(f"{self.urlpath}: {self.data}")
         rest_log.debug(f"{self.headers}")
 
-    async def __call__(self, response):
+    async def __call__(self, response, fast=False, stream=False):
         """
         Locally modelling the request.
         returning possible responses, and how to deal with them
+        :param fast: use the fast decoder of the expected response, if there is one.
+        :param stream: parse the body as it arrives, into columns, if the expected response can be streamed.
         :return:
         """
+        if stream and self.expected.stream is not None:
+            assert response.status == self.expected.status
+            return await self.expected.stream(response.content)
+        if fast and self.expected.decoder is not None:
+            res = loads(await response.read())
+            # no need to copy the request (with asdict), it is only used for display.
+            return self.expected(status=response.status, data=res, request_data=self, fast=True)
         res = await response.json(encoding='utf-8', content_type=None)
         #rest_log.debug(f"{(res[:75] + '...') if len(res) > 75 else res}")  # TODO : better way to log ? structured viewer ? events ?
         parsed_res = self.expected(status=response.status, data=res, request_data=asdict(self))  # validating response data
         return parsed_res
 
-    def sign(self, key, secret):
-
-        self.data['nonce'] = get_nonce()
-        # If key OR secret are none, we do not sign...
-        # Maybe dangerous ? But we need something similar to be able to test private URL without signing (when we work with cassettes)
-        if key is not None:
-            self.headers['API-Key'] = key
-        if secret is not None:
-            self.headers['API-Sign'] = _sign_message(self.data, self.urlpath, secret)
-
-        return self
+    def sign(self, signer):
+        """ signing with a .signer.Signer, bound to the server """
+        return signer(self)
 
 
@@ -1,5 +1,7 @@
 
 import logging
+
+from .exceptions import AIOKrakenServerError
 rest_log = logging.getLogger("aiokraken_rest")
 rest_log.setLevel(logging.DEBUG)
 
@@ -15,17 +17,29 @@ class Response:
     Response: structure validating response against expected schema
     """
 
-    def __init__(self, status, schema):
+    def __init__(self, status, schema, decoder=None, stream=None):
         """
         :param status: status possible for this response
         :param schema: schema to validate against
+        :param decoder: optional fast decoder, building the same result as the schema, without marshmallow
+        :param stream: optional streaming parser (a .stream.StreamedResult), building columns from the body as it arrives
         """
         self.status = status
         rest_log.debug(f"Expecting {schema} ...")
         self.schema = schema
+        self.decoder = decoder
+        self.stream = stream
 
-    def __call__(self, status, data, request_data):   # request data as dict (for now) # Goal : display on error)
+    def __call__(self, status, data, request_data, fast=False):   # request data as dict (for now) # Goal : display on error)
         assert status == self.status
         # TODO : manage errors here
+        if fast and self.decoder is not None:
+            try:
+                return self.decoder(data)
+            except AIOKrakenServerError:
+                raise
+            except Exception as exc:
+                # the schema knows better what is wrong
+                rest_log.debug(f"Fast decoding failed ({exc}), validating with {self.schema}")
         rest_log.debug(data)  # TODO : better way to log string...
         return self.schema.load(data)
@@ -0,0 +1,147 @@
+""" Priority scheduling of private requests on the (per key) rate limiter.
+
+All private requests share the same kraken counter.
+Without scheduling, a long history retrieval fills the counter, and an order has to wait behind it.
+Here, requests wait in a priority queue, and the budget always goes to the most urgent request first.
+Since bulk retrievals are done one page (one request) at a time, they are naturally preempted between pages.
+"""
+import asyncio
+import functools
+import heapq
+import itertools
+import time
+import typing
+from dataclasses import dataclass
+
+from aiokraken.rest.limiter import CounterDecayLimiter
+from aiokraken.rest.throttle import EndpointClass
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+
+# lower is more urgent. Order latency is what costs money.
+PRIORITY = {
+    EndpointClass.trading: 0,
+    EndpointClass.private: 1,
+    EndpointClass.history: 2,
+}
+
+
+@dataclass
+class QueueStats:
+    """ How long requests waited in the queue, for one endpoint class """
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+    last: float = 0.0
+
+    def record(self, wait: float):
+        self.count += 1
+        self.total += wait
+        self.maximum = max(self.maximum, wait)
+        self.last = wait
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class PriorityScheduler:
+    """
+    Grants the limiter budget to waiting requests, most urgent first.
+
+    >>> clock = [0.0]
+    >>> sched = PriorityScheduler(CounterDecayLimiter(maximum=1, decay=1, timer=lambda: clock[0]), timer=lambda: clock[0])
+    >>> asyncio.run(sched.acquire(cost=1, eclass=EndpointClass.trading))
+    0.0
+    >>> sched.stats[EndpointClass.trading].count
+    1
+    """
+
+    def __init__(self, limiter: CounterDecayLimiter, timer: typing.Callable[[], float] = time.monotonic):
+        self.limiter = limiter
+        self.timer = timer
+
+        self._queue: typing.List[typing.Tuple[int, int, float]] = list()
+        self._counter = itertools.count()
+        self._changed: typing.Optional[asyncio.Event] = None
+
+        self.stats: typing.Dict[EndpointClass, QueueStats] = {e: QueueStats() for e in PRIORITY}
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def _pulse(self):
+        """ wake up every waiting request, to let them check if they are now at the head of the queue """
+        if self._changed is not None:
+            self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def acquire(self, cost: float = 1, eclass: EndpointClass = EndpointClass.private) -> float:
+        """ wait for our turn and for enough budget. returns the time waited in the queue. """
+        if not self._queue:
+            # creating the event in the running loop
+            self._changed = asyncio.Event()
+
+        entry = (PRIORITY[eclass], next(self._counter), cost)
+        heapq.heappush(self._queue, entry)
+        if self._queue[0] is entry:
+            # we might preempt another request, currently waiting for budget
+            self._pulse()
+
+        start = self.timer()
+        try:
+            while True:
+                changed = self._changed
+                if self._queue[0] is entry:
+                    wait = self.limiter.wait_time(cost=cost)
+                    if wait <= 0:
+                        break
+                    try:  # waiting for budget, unless something more urgent comes along
+                        await asyncio.wait_for(changed.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await changed.wait()
+        except asyncio.CancelledError:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            self._pulse()
+            raise
+
+        heapq.heappop(self._queue)
+        self.limiter.spend(cost=cost)
+        self._pulse()
+
+        waited = self.timer() - start
+        self.stats[eclass].record(waited)
+        LOGGER.debug(f"{eclass.value} request waited {waited:.3f}s in queue")
+        return waited
+
+    def __repr__(self):
+        return f"<PriorityScheduler {self.waiting} waiting on {self.limiter}>"
+
+
+# one scheduler for each limiter, ie. for each key
+_limiter_schedulers: typing.Dict[CounterDecayLimiter, PriorityScheduler] = dict()
+
+
+def limiter_scheduler(limiter: CounterDecayLimiter) -> PriorityScheduler:
+    try:
+        return _limiter_schedulers[limiter]
+    except KeyError:
+        _limiter_schedulers[limiter] = PriorityScheduler(limiter)
+        return _limiter_schedulers[limiter]
+
+
+def scheduled(eclass: EndpointClass, cost: float = 1):
+    """ Decorator for client coroutine methods, waiting for their turn in the scheduler attribute of the instance. """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            await self.scheduler.acquire(cost=cost, eclass=eclass)
+            return await fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
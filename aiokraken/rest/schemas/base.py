@@ -4,6 +4,7 @@ import marshmallow.types
 import typing
 
 from ..exceptions import AIOKrakenSchemaValidationException
+from .compiled import Fallback, compiled_loader
 
 
 class BaseSchema(marshmallow.Schema):
@@ -16,6 +17,9 @@ class BaseSchema(marshmallow.Schema):
 
         ordered=True  # to enforce order of dumped keys as defined in the schema
 
+    # load with a generated loader, instead of the marshmallow interpreter (cf. compiled.py)
+    compiled: bool = False
+
     # def loads(self, *args, **kwargs):
     #     try:
     #         return super().loads(*args, **kwargs)
@@ -31,6 +35,13 @@ class BaseSchema(marshmallow.Schema):
         many: bool = None,
         partial: typing.Union[bool, marshmallow.types.StrSequenceOrSet] = None,
         unknown: str = None):
+        if self.compiled and not many and not partial and unknown is None:
+            loader = compiled_loader(self)
+            if loader is not None:
+                try:
+                    return loader(data)
+                except (Fallback, marshmallow.exceptions.ValidationError, AIOKrakenSchemaValidationException):
+                    pass  # the interpreter will report validation errors, as usual
         try:
             return super(BaseSchema, self).load(data=data, many=many, partial=partial, unknown=unknown)
         except marshmallow.exceptions.ValidationError as ve:
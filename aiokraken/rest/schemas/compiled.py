@@ -0,0 +1,259 @@
+""" Compiled loaders for marshmallow schemas.
+
+Marshmallow interprets a schema on every load: it iterates over the fields, dispatches each value to its field,
+stores errors, looks up the hooks... For schemas loaded very often (history records, orders), we generate once,
+per schema class, a python function that does the same work in straight-line code:
+ - pre_load hooks are called directly,
+ - unknown keys are checked with one set operation,
+ - common values (str for String, int for Integer, str for Decimal, dict for Nested...) are converted inline,
+ - any other value is handed to the marshmallow field itself (missing values, None, custom fields...),
+ - post_load hooks are called directly.
+
+Whenever the compiled loader raises Fallback (or a validation error from a marshmallow field),
+BaseSchema falls back to the marshmallow interpreter, on the same data.
+Validation errors are therefore exactly the ones marshmallow reports. Any other exception is raised as is.
+Note pre_load hooks may then run twice on the same data : they must be idempotent (ours are).
+"""
+import contextlib
+import decimal
+import typing
+from collections.abc import Mapping
+
+import marshmallow
+from marshmallow import fields
+from marshmallow.decorators import POST_LOAD, PRE_LOAD, VALIDATES, VALIDATES_SCHEMA
+from marshmallow.utils import missing
+
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+
+class NotCompilable(Exception):
+    """ This schema uses features the compiler does not support. The interpreter will be used. """
+
+
+class Fallback(Exception):
+    """ The compiled loader cannot handle this data. The interpreter must be used. """
+
+
+def _fail(value):
+    raise Fallback(value)
+
+
+def _decimal(value: str) -> decimal.Decimal:
+    # like fields.Decimal(allow_nan=False), for strings
+    try:
+        num = decimal.Decimal(value)
+    except decimal.InvalidOperation:
+        _fail(value)
+    return num if num.is_finite() else _fail(num)
+
+
+def _converter(field: fields.Field) -> typing.Callable[[typing.Any], typing.Any]:
+    """ a one-argument converter for values inside containers (Dict values, List items) """
+    deserialize = field.deserialize
+    if field.validators:
+        return lambda v: deserialize(v, partial=False)
+    if type(field) in (fields.String, fields.Str):
+        return lambda v: v if v.__class__ is str else deserialize(v, partial=False)
+    if type(field) in (fields.Integer, fields.Int) and not field.strict:
+        return lambda v: v if v.__class__ is int else deserialize(v, partial=False)
+    if type(field) is fields.Decimal and field.places is None and not field.allow_nan:
+        return lambda v: _decimal(v) if v.__class__ is str else deserialize(v, partial=False)
+    if type(field) is fields.Nested:
+        loader = _nested_loader(field)
+        if loader is not None:
+            return lambda v: loader(v) if v.__class__ is dict else deserialize(v, partial=False)
+    return lambda v: deserialize(v, partial=False)
+
+
+def _nested_loader(field: fields.Nested) -> typing.Optional[typing.Callable]:
+    if field.many or field.unknown is not None or field.only is not None or field.exclude:
+        return None
+    try:
+        schema = field.schema
+    except Exception:  # nested schema given by name, not resolvable yet...
+        return None
+    return compiled_loader(schema)
+
+
+def _field_code(i: int, key: str, attr: str, field: fields.Field, namespace: dict) -> typing.List[str]:
+    """ python lines converting one field, fast path first, marshmallow field otherwise """
+    fast = None
+    if not field.validators:
+        if type(field) in (fields.String, fields.Str):
+            fast = ("v.__class__ is str", "v")
+        elif type(field) in (fields.Integer, fields.Int) and not field.strict:
+            fast = ("v.__class__ is int", "v")
+        elif type(field) is fields.Decimal and field.places is None and not field.allow_nan:
+            fast = ("v.__class__ is str", "_decimal(v)")
+        elif type(field) is fields.Nested:
+            loader = _nested_loader(field)
+            if loader is not None:
+                namespace[f"n{i}"] = loader
+                fast = ("v.__class__ is dict", f"n{i}(v)")
+        elif type(field) is fields.Dict and (field.key_field is None or type(field.key_field) in (fields.String, fields.Str)
+                                             and not field.key_field.validators):
+            if field.value_field is not None:
+                namespace[f"c{i}"] = _converter(field.value_field)
+                fast = ("v.__class__ is dict", f"{{k if k.__class__ is str else _fail(k): c{i}(x) for k, x in v.items()}}"
+                        if field.key_field is not None else f"{{k: c{i}(x) for k, x in v.items()}}")
+        elif type(field) is fields.List:
+            namespace[f"c{i}"] = _converter(field.inner)
+            fast = ("v.__class__ is list", f"[c{i}(x) for x in v]")
+
+    lines = [f"    v = data.get({key!r}, _missing)"]
+    if fast is not None:
+        lines += [f"    if {fast[0]}:",
+                  f"        out[{attr!r}] = {fast[1]}",
+                  f"    else:"]
+    indent = "        " if fast is not None else "    "
+    lines += [f"{indent}v = d{i}(v, {key!r}, data, partial=False)",
+              f"{indent}if v is not _missing:",
+              f"{indent}    out[{attr!r}] = v"]
+    return lines
+
+
+def _hooks(schema: marshmallow.Schema, tag: str) -> typing.List[str]:
+    """ hooks names in the order marshmallow calls them on load """
+    names = list()
+    for pass_many in (True, False):
+        for name in schema._hooks[(tag, pass_many)]:
+            if getattr(schema, name).__marshmallow_hook__[(tag, pass_many)].get("pass_original", False):
+                raise NotCompilable(f"{type(schema).__name__}.{name} needs the original data")
+            names.append(name)
+    return names
+
+
+def compile_source(schema: marshmallow.Schema) -> typing.Tuple[str, dict]:
+    """ python source of a factory building the loader for a schema instance, and its global namespace
+
+    >>> from aiokraken.rest.schemas.time import TimeSchema
+    >>> print(compile_source(TimeSchema())[0])
+    def make(schema):
+        _dict = schema.dict_class
+        fields = schema.load_fields
+        d0 = fields['unixtime'].deserialize
+        post0 = schema.make_time
+        def load(data):
+            if data.__class__ is not dict and not isinstance(data, _Mapping):
+                _fail(data)
+            out = _dict()
+            v = data.get('unixtime', _missing)
+            if v.__class__ is int:
+                out['unixtime'] = v
+            else:
+                v = d0(v, 'unixtime', data, partial=False)
+                if v is not _missing:
+                    out['unixtime'] = v
+            out = post0(out, many=False, partial=False)
+            return out
+        return load
+    """
+    if schema._hooks[(VALIDATES, False)] or schema._hooks[(VALIDATES_SCHEMA, False)] \
+            or schema._hooks[(VALIDATES_SCHEMA, True)]:
+        raise NotCompilable(f"{type(schema).__name__} has validators")
+    unknown = schema.unknown
+    if unknown not in (marshmallow.RAISE, marshmallow.EXCLUDE):
+        raise NotCompilable(f"{type(schema).__name__} includes unknown fields")
+
+    namespace = {'_missing': missing, '_Mapping': Mapping, '_fail': _fail, '_decimal': _decimal}
+    known = set()
+    body = list()
+    # fields first : nested loaders are set in the namespace, the factory only gets the bound deserialize methods.
+    for i, (name, field) in enumerate(schema.load_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attr = field.attribute or name
+        if '.' in attr:
+            raise NotCompilable(f"{type(schema).__name__}.{name} is set in a nested dict")
+        known.add(key)
+        body += _field_code(i, key, attr, field, namespace)
+    namespace['_known'] = frozenset(known)
+
+    pre, post = _hooks(schema, PRE_LOAD), _hooks(schema, POST_LOAD)
+    lines = ["def make(schema):",
+             "    _dict = schema.dict_class",
+             "    fields = schema.load_fields"]
+    lines += [f"    d{i} = fields[{name!r}].deserialize" for i, name in enumerate(schema.load_fields)]
+    lines += [f"    pre{i} = schema.{name}" for i, name in enumerate(pre)]
+    lines += [f"    post{i} = schema.{name}" for i, name in enumerate(post)]
+    lines += ["    def load(data):"]
+    lines += [f"        data = pre{i}(data, many=False, partial=False)" for i in range(len(pre))]
+    lines += ["        if data.__class__ is not dict and not isinstance(data, _Mapping):",
+              "            _fail(data)"]
+    if unknown == marshmallow.RAISE:
+        lines += ["        if not _known.issuperset(data):",
+                  "            _fail(data)"]
+    lines += ["        out = _dict()"]
+    lines += ["    " + line for line in body]
+    lines += [f"        out = post{i}(out, many=False, partial=False)" for i in range(len(post))]
+    lines += ["        return out",
+              "    return load"]
+    return "\n".join(lines), namespace
+
+
+# switched off by interpreted()
+_enabled = True
+
+
+@contextlib.contextmanager
+def interpreted():
+    """ loading all schemas with the marshmallow interpreter, temporarily (to compare, to debug...) """
+    global _enabled
+    previous, _enabled = _enabled, False
+    try:
+        yield
+    finally:
+        _enabled = previous
+
+
+# compiled factory for each schema class
+_factories: typing.Dict[type, typing.Optional[typing.Callable]] = dict()
+
+
+def _factory(schema: marshmallow.Schema) -> typing.Optional[typing.Callable]:
+    cls = type(schema)
+    try:
+        return _factories[cls]
+    except KeyError:
+        try:
+            source, namespace = compile_source(schema)
+        except NotCompilable as nc:
+            LOGGER.debug(f"Schema not compiled: {nc}")
+            _factories[cls] = None
+        else:
+            # the nested loaders in the namespace are bound to this instance's nested schemas.
+            # they are stateless and equivalent for all instances of the class.
+            exec(compile(source, f"<compiled {cls.__name__}>", "exec"), namespace)
+            _factories[cls] = namespace['make']
+        return _factories[cls]
+
+
+def compiled_loader(schema: marshmallow.Schema) -> typing.Optional[typing.Callable[[typing.Any], typing.Any]]:
+    """ the compiled loader for this schema instance (loading one object), or None if it cannot be compiled.
+    The loader raises on any data it cannot handle, the schema should then be used.
+
+    >>> from aiokraken.rest.schemas.kasset import AssetSchema
+    >>> load = compiled_loader(AssetSchema())
+    >>> load({'altname': 'XBT', 'aclass': 'currency', 'decimals': 10, 'display_decimals': 5})
+    Asset(altname='XBT', aclass='currency', decimals=10, display_decimals=5, restname=None)
+    >>> load({'altname': 'XBT', 'unknown': 42})
+    Traceback (most recent call last):
+    ...
+    aiokraken.rest.schemas.compiled.Fallback: {'altname': 'XBT', 'unknown': 42}
+    """
+    if not _enabled:
+        return None
+    try:
+        return schema.__dict__['_compiled_loader']
+    except KeyError:
+        loader = None
+        # instance options changing the fields or the load behavior are not compiled
+        if not (schema.many or schema.partial or schema.only is not None or schema.exclude
+                or schema.load_only or schema.dump_only):
+            factory = _factory(schema)
+            if factory is not None:
+                loader = factory(schema)
+        schema.__dict__['_compiled_loader'] = loader
+        return loader
@@ -25,6 +25,8 @@ class AssetSchema(BaseSchema):
     ... })
     KAsset(altname='ALTNAME', aclass='ACLASS', decimals=42, display_decimals=7)
     """
+    compiled = True
+
     # name = fields.String()
     altname = fields.String()
     aclass = fields.String()
@@ -43,6 +43,8 @@ class VolumeFeeField(fields.Field):
         :param dict kwargs: Field-specific keyword arguments.
         :return: The serialized value
         """
+        if isinstance(value, dict):  # late naming (AssetPair.__call__) turns fees into dicts
+            return [value['volume'], value['fee']]
         return [value.volume, value.fee]
 
 
@@ -69,6 +71,8 @@ class KAssetPairSchema(BaseSchema):
     ...    "margin_stop": "str"  # stop-out/liquidation margin level
     ... })
     """
+    compiled = True
+
     # name = fields.String()
     altname = fields.String()  # alternate pair name
     wsname= fields.String()  # WebSocket pair name (if available)
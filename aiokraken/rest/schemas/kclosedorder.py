@@ -177,6 +177,8 @@ def ClosedOrderDictStrategy(draw,
 
 
 class ClosedOrdersResponseSchema(BaseSchema):
+    compiled = True
+
     closed = fields.Dict(keys=fields.Str(), values=fields.Nested(KClosedOrderSchema()))
     count = fields.Integer()  # amount of available order info matching criteria
 
@@ -56,6 +56,8 @@ def KLedgerInfoStrategy(draw,
 
 
 class KLedgerInfoSchema(BaseSchema):
+    compiled = True
+
 
     refid= fields.Str()  # reference id
     time= fields.Integer(allow_none=True)  # unix timestamp of ledger
@@ -107,6 +109,8 @@ def KLedgerInfoDictStrategy(draw,
 
 
 class KLedgersResponseSchema(BaseSchema):
+    compiled = True
+
     ledger = fields.Dict(keys=fields.Str(), values=fields.Nested(KLedgerInfoSchema()))
     count = fields.Integer(allow_none=False)  # we need the count to know the max offset
     # maybe not ?
@@ -115,6 +115,8 @@ def OpenOrderStrategy(draw,
 
 
 class KOpenOrderSchema(BaseSchema):
+    compiled = True
+
     refid = fields.Integer(allow_none=True)
     userref = fields.Integer(allow_none=True)
     status = fields.Str()
@@ -212,6 +214,8 @@ def OpenOrderDictStrategy(draw,
 
 
 class OpenOrdersResponseSchema(BaseSchema):
+    compiled = True
+
     open = fields.Dict(keys=fields.Str(), values=fields.Nested(KOpenOrderSchema()))
 
     @post_load
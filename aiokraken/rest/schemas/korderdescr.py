@@ -447,6 +447,8 @@ def KOrderDescrFinalizeStrategy(
 
 
 class KOrderDescrCloseSchema(BaseSchema):
+    compiled = True
+
     # TODO : extra fields ? redundant or implicit ??
     ordertype = KOrderTypeField()
     price = fields.Decimal(required=False, as_string=True)
@@ -463,6 +465,8 @@ class KOrderDescrCloseSchema(BaseSchema):
 
 
 class KOrderDescrSchema(BaseSchema):
+    compiled = True
+
     pair = fields.String()  # PairField(required=True)
     abtype = KABTypeField(required=True)  # need rename to not confuse python on this...
     ordertype = KOrderTypeField(required=True)
@@ -12,8 +12,10 @@ from marshmallow import fields, post_load, pre_load
 from .base import BaseSchema
 from .kabtype import KABTypeModel, KABTypeField, KABTypeStrategy
 from .kordertype import KOrderTypeModel, KOrderTypeField, KOrderTypeStrategy
+from ...utils.record import slotted
 
 
+@slotted
 @dataclass(frozen=True)
 class KTradeModel:
     ordertxid: str  # order responsible for execution of trade
@@ -89,6 +91,7 @@ def KTradeStrategy(draw,
 
 
 class KTradeSchema(BaseSchema):
+    compiled = True
 
     ordertxid= fields.Str() # order responsible for execution of trade
     pair = fields.Str()  # asset pair
@@ -167,6 +170,8 @@ def TradeDictStrategy(draw,
 
 
 class TradeResponseSchema(BaseSchema):
+    compiled = True
+
     trades = fields.Dict(keys=fields.Str(), values=fields.Nested(KTradeSchema()))
     count = fields.Integer(allow_none=False)
 
@@ -42,13 +42,11 @@ class OHLCField(fields.Field):
         :return: The deserialized value.
 
         """
-        # TODO : maybe more checks here on value type / content, maybe conversion, etc.
-        # pm = sf.Frame.from_records(records=value,
-        pm = pd.DataFrame(data=value,
-                          columns=["time", "open", "high", "low", "close", "vwap", "volume", "count"]
-                          # dtypes= # TODO !
-        )
-        return pm
+        try:
+            # typed columns, straight from the records
+            return ohlc_frame(value)
+        except (TypeError, ValueError) as exc:
+            raise marshmallow.ValidationError(f"Invalid OHLC records: {exc}")
 
     def _serialize(self, value: typing.Any, attr: str, obj: typing.Any, **kwargs):
         """Serializes ``value`` to a basic Python datatype. Noop by default.
@@ -108,7 +106,7 @@ class OHLCField(fields.Field):
 _pair_ohlc_schemas = {}
 
 
-from ...model.ohlc import OHLC
+from ...model.ohlc import OHLC, ohlc_frame
 
 
 # TODO : Change that into a class (functor) to have both a call to build instance and a item accessor for the schema/class itself...
@@ -119,7 +117,7 @@ def PairOHLCSchema(pair):
 
     def build_model(self, data, **kwargs):
         assert len(data.get('error', [])) == 0  # Errors should have raised exception previously !
-        return OHLC(data=data.get('pair'), last=data.get('last'))
+        return OHLC.from_frame(data.get('pair'), last=data.get('last'))
 
 
     try:
@@ -0,0 +1,132 @@
+import copy
+import unittest
+
+import marshmallow
+from hypothesis import given, settings, HealthCheck, strategies as st
+
+from aiokraken.rest.exceptions import AIOKrakenSchemaValidationException, AIOKrakenServerError
+from aiokraken.rest.schemas.compiled import compiled_loader, interpreted
+from aiokraken.rest.schemas.kasset import AssetSchema, KDictStrategy as AssetDictStrategy
+from aiokraken.rest.schemas.kclosedorder import ClosedOrderDictStrategy, ClosedOrdersResponseSchema, KClosedOrderSchema
+from aiokraken.rest.schemas.kledger import KLedgerInfoDictStrategy, KLedgerInfoSchema, KLedgersResponseSchema
+from aiokraken.rest.schemas.kopenorder import KOpenOrderSchema, OpenOrderDictStrategy
+from aiokraken.rest.schemas.ktrade import KTradeSchema, TradeDictStrategy, TradeResponseSchema
+from aiokraken.rest.payloads import TickerPayloadSchema
+
+"""
+Parity tests : compiled loaders must build exactly what the marshmallow interpreter builds,
+and raise the same errors.
+"""
+
+
+def assert_parity(schema, data):
+    with interpreted():
+        expected = schema.load(copy.deepcopy(data))
+    loaded = compiled_loader(schema)(copy.deepcopy(data))
+    # comparing representations : some models (Leverage) have no equality
+    assert repr(loaded) == repr(expected)
+    # also through the usual load
+    assert repr(schema.load(copy.deepcopy(data))) == repr(expected)
+
+
+class TestCompiledParity(unittest.TestCase):
+
+    @given(AssetDictStrategy())
+    def test_asset(self, data):
+        assert_parity(AssetSchema(), data)
+
+    @given(TradeDictStrategy())
+    def test_trade(self, data):
+        assert_parity(KTradeSchema(), data)
+
+    @settings(max_examples=50)
+    @given(st.dictionaries(keys=st.text(min_size=1, max_size=20), values=TradeDictStrategy(), max_size=5),
+           st.integers(min_value=0))
+    def test_trades_response(self, trades, count):
+        assert_parity(TradeResponseSchema(), {'trades': trades, 'count': count})
+
+    @given(KLedgerInfoDictStrategy())
+    def test_ledger(self, data):
+        assert_parity(KLedgerInfoSchema(), data)
+
+    @settings(max_examples=50)
+    @given(st.dictionaries(keys=st.text(min_size=1, max_size=20), values=KLedgerInfoDictStrategy(), max_size=5),
+           st.integers(min_value=0))
+    def test_ledgers_response(self, ledgers, count):
+        assert_parity(KLedgersResponseSchema(), {'ledger': ledgers, 'count': count})
+
+    @settings(suppress_health_check=[HealthCheck.too_slow], max_examples=50)
+    @given(OpenOrderDictStrategy())
+    def test_open_order(self, data):
+        assert_parity(KOpenOrderSchema(), data)
+
+    @settings(suppress_health_check=[HealthCheck.too_slow], max_examples=50)
+    @given(ClosedOrderDictStrategy())
+    def test_closed_order(self, data):
+        assert_parity(KClosedOrderSchema(), data)
+
+    def test_closed_orders_response(self):
+        # as received from kraken
+        order = {"refid": None, "userref": 0, "status": "closed", "opentm": 1571150298.798, "starttm": 0,
+                 "expiretm": 1571150313, "closetm": 1571150313.2,
+                 "descr": {"pair": "XBTEUR", "type": "sell", "ordertype": "limit", "price": "11330.1", "price2": "0",
+                           "leverage": "none", "order": "sell 0.01000000 XBTEUR @ limit 11330.1", "close": ""},
+                 "vol": "0.01000000", "vol_exec": "0.01000000", "cost": "113.30100", "fee": "0.18128",
+                 "price": "11330.1", "stopprice": "0.00000", "limitprice": "0.00000", "misc": "", "oflags": "fciq",
+                 "reason": None}
+        assert_parity(ClosedOrdersResponseSchema(), {'closed': {"O1": order}, 'count': 1})
+
+    def test_same_errors(self):
+        schema = KTradeSchema()
+        invalid = [
+            {'ordertxid': 42},  # wrong type, and missing fields
+            {'price': 'NaN'},  # special decimal
+            {'price': 'abc'},  # not a decimal
+            {'time': None, 'unknown': 'field'},  # unknown field
+            ["not", "a", "dict"],
+        ]
+        for data in invalid:
+            with interpreted(), self.assertRaises(AIOKrakenSchemaValidationException) as expected:
+                schema.load(copy.deepcopy(data))
+            with self.assertRaises(Exception):
+                compiled_loader(schema)(copy.deepcopy(data))
+            with self.assertRaises(AIOKrakenSchemaValidationException) as compiled:
+                schema.load(copy.deepcopy(data))
+            assert compiled.exception.args[0].messages == expected.exception.args[0].messages
+
+    def test_other_errors_raised(self):
+        # only validation errors go to the interpreter : anything else is not hidden, nor run twice
+        calls = list()
+
+        class FailingSchema(AssetSchema):
+            compiled = True
+
+            @marshmallow.post_load
+            def fail(self, data, **kwargs):
+                calls.append(data)
+                raise RuntimeError("bug")
+
+        with self.assertRaises(RuntimeError):
+            FailingSchema().load({'altname': 'XBT', 'aclass': 'currency', 'decimals': 10, 'display_decimals': 5})
+        assert len(calls) == 1
+
+    def test_not_compiled(self):
+        # instance options change the fields : the interpreter is used
+        assert compiled_loader(KTradeSchema(only=['pair'])) is None
+        assert compiled_loader(KTradeSchema(many=True)) is None
+        with interpreted():
+            assert compiled_loader(KTradeSchema()) is None
+
+    def test_ticker_payload(self):
+        # as received from kraken
+        data = {"error": [], "result": {"XXBTZEUR": {
+            "a": ["8590.40000", "1", "1.000"], "b": ["8588.90000", "1", "1.000"], "c": ["8590.40000", "0.00236095"],
+            "v": ["1765.10656064", "3478.62373601"], "p": ["8584.19929", "8570.73592"], "t": [6949, 12928],
+            "l": ["8494.00000", "8481.00000"], "h": ["8648.40000", "8648.40000"], "o": "8532.70000"}}}
+        assert_parity(TickerPayloadSchema(), data)
+        with self.assertRaises(AIOKrakenServerError):
+            TickerPayloadSchema().load({"error": ["EGeneral:Invalid arguments"], "result": {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -178,6 +178,8 @@ class DailyValueField(fields.Field):
 
 
 class TickerSchema(BaseSchema):
+    compiled = True
+
     # <pair_name> = pair name
     # TODO : namedtuples with nested schema ?
     ask = MinOrderField(data_key='a', as_string=True)  # ask array(<price>, <whole lot volume>, <lot volume>),
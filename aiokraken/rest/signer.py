@@ -0,0 +1,93 @@
+import base64
+import hashlib
+import re
+import typing
+import urllib.parse
+
+from ..utils import get_nonce
+
+"""
+Signing requests for private user endpoints.
+https://www.kraken.com/features/api#general-usage
+"""
+
+# characters urllib.parse.quote_plus leaves as they are
+_safe = re.compile(r"[A-Za-z0-9_.~-]*").fullmatch
+# most keys are the same from one request to the next
+_quoted_keys: typing.Dict[str, str] = dict()
+
+
+def _urlencode(data: typing.Dict) -> str:
+    """ Same as urllib.parse.urlencode(data), skipping quoting when there is nothing to quote.
+
+    >>> _urlencode({'pair': 'XXBTZEUR', 'volume': '0.01', 'nonce': 42, 'oflags': 'fcib,post', 'validate': True})
+    'pair=XXBTZEUR&volume=0.01&nonce=42&oflags=fcib%2Cpost&validate=True'
+    """
+    parts = list()
+    for k, v in data.items():
+        try:
+            key = _quoted_keys[k]
+        except KeyError:
+            key = _quoted_keys[k] = urllib.parse.quote_plus(k if isinstance(k, bytes) else str(k))
+        if v.__class__ is int:
+            value = str(v)
+        elif v.__class__ is str and _safe(v):
+            value = v
+        else:
+            value = urllib.parse.quote_plus(v if isinstance(v, bytes) else str(v))
+        parts.append(key + '=' + value)
+    return '&'.join(parts)
+
+
+def _pad(key: bytes, byte: int) -> bytes:
+    return bytes(b ^ byte for b in key.ljust(hashlib.sha512().block_size, b'\0'))
+
+
+class Signer:
+    """ Signs requests with one key.
+    The secret is decoded, and the HMAC keyed, only once : each signature starts from copies of the primed
+    inner and outer hashes of the HMAC (RFC 2104), cheaper than copying an hmac.HMAC.
+
+    >>> signer = Signer(key='mykey', secret=base64.b64encode(b'mysecret').decode(), nonce=lambda: 42)
+    >>> signer.signature('/0/private/Balance', {'nonce': 42})
+    'i+lqu232crhCsind7gbn7xFHtaPIRjrcQcr+cIFkRGloH9bOJJvXG8CZCKsEkUS0/RKD1k7QvsbSfBxR+onhtg=='
+    """
+
+    def __init__(self, key: typing.Optional[str] = None, secret: typing.Optional[str] = None,
+                 nonce: typing.Optional[typing.Callable[[], int]] = None):
+        self.key = key
+        # By default, the process-wide nonce source, shared by all signers
+        self.nonce = nonce or get_nonce
+        if secret is not None:
+            secret = base64.b64decode(secret)
+            if len(secret) > hashlib.sha512().block_size:
+                secret = hashlib.sha512(secret).digest()
+            self._inner = hashlib.sha512(_pad(secret, 0x36))
+            self._outer = hashlib.sha512(_pad(secret, 0x5c))
+        else:
+            self._inner = self._outer = None
+        self._paths: typing.Dict[str, bytes] = dict()
+
+    def signature(self, urlpath: str, data: typing.Dict) -> str:
+        """ url_path starts from the root (like "/<version>/private/endpoint") """
+        try:
+            path = self._paths[urlpath]
+        except KeyError:
+            path = self._paths[urlpath] = urlpath.encode()
+        encoded = (str(data['nonce']) + _urlencode(data)).encode()
+        inner = self._inner.copy()
+        inner.update(path + hashlib.sha256(encoded).digest())
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return base64.b64encode(outer.digest()).decode()
+
+    def __call__(self, request):
+        """ Sets a fresh nonce, and the authentication headers, on the request """
+        request.data['nonce'] = self.nonce()
+        # If key OR secret are none, we do not sign...
+        # Maybe dangerous ? But we need something similar to be able to test private URL without signing (when we work with cassettes)
+        if self.key is not None:
+            request.headers['API-Key'] = self.key
+        if self._inner is not None:
+            request.headers['API-Sign'] = self.signature(request.urlpath, request.data)
+        return request
@@ -0,0 +1,280 @@
+""" Streaming parse of long private history responses (Ledgers, TradesHistory, ClosedOrders).
+
+Parsing a whole response builds the JSON document, then a dict of models, then (in frames) a dict per record...
+For long histories, peak memory is several times the payload.
+Here the body is parsed as it arrives : the records of the result object are decoded one at a time,
+and their values are appended to columns, ready for a DataFrame.
+Only the small members around them (error, count) are kept as they are.
+"""
+from __future__ import annotations
+
+import codecs
+import dataclasses
+import json
+import typing
+
+import pandas as pd
+
+from aiokraken.rest.exceptions import AIOKrakenServerError
+
+# the parser needs more data to go on
+_MORE = object()
+
+_whitespace = ' \t\n\r'
+
+# maximum size of the chunks read from the response body
+CHUNK = 2 ** 16
+
+# a field missing in a record, like DataFrame.from_records fills it
+_missing = float('nan')
+
+
+class MemberStream:
+    """ Incremental parser, yielding the members of the object at path in a JSON document, one at a time,
+    as soon as they are complete. The other members met on the way are stored in others, by path.
+
+    >>> stream = MemberStream(path=('result', 'ledger'))
+    >>> stream.feed(b'{"error":[],"result":{"ledger":{"L1":{"amount":"1.5"},"L2":{"am')
+    >>> list(stream)
+    [('L1', {'amount': '1.5'})]
+    >>> stream.feed(b'ount":"-0.5"}},"count":2}}')
+    >>> list(stream)
+    [('L2', {'amount': '-0.5'})]
+    >>> stream.close()
+    >>> stream.others
+    {('error',): [], ('result', 'count'): 2}
+    """
+
+    def __init__(self, path: typing.Tuple[str, ...]):
+        self.path = tuple(path)
+        self.others: typing.Dict[typing.Tuple[str, ...], typing.Any] = dict()
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._scan = json.JSONDecoder().raw_decode
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self._done = False
+        self._parser = self._document()
+
+    def feed(self, data: bytes):
+        # dropping what was parsed already
+        self._buf = self._buf[self._pos:] + self._decoder.decode(data)
+        self._pos = 0
+
+    def close(self):
+        """ no more data. The document must be complete. """
+        self._buf = self._buf[self._pos:] + self._decoder.decode(b'', final=True)
+        self._pos = 0
+        self._eof = True
+        for _ in self:  # the remaining members should have been consumed already
+            pass
+        if not self._done:
+            raise ValueError("Truncated JSON document")
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        """ the members available so far """
+        while not self._done:
+            try:
+                item = next(self._parser)
+            except StopIteration:
+                self._done = True
+                return
+            if item is _MORE:
+                if self._eof:
+                    raise ValueError("Truncated JSON document")
+                return
+            yield item
+
+    def _peek(self):
+        """ the next significant character """
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _whitespace:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            yield _MORE
+
+    def _expect(self, chars: str):
+        c = yield from self._peek()
+        if c not in chars:
+            raise ValueError(f"Expecting one of {chars!r} at {self._buf[self._pos:self._pos + 20]!r}")
+        self._pos += 1
+        return c
+
+    def _value(self):
+        """ a complete JSON value """
+        yield from self._peek()
+        while True:
+            try:
+                value, end = self._scan(self._buf, self._pos)
+                # a number at the end of the buffer may not be complete
+                if end < len(self._buf) or self._eof or type(value) not in (int, float):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            yield _MORE
+
+    def _members(self, depth: int):
+        """ the members of the object here, on the path at depth """
+        yield from self._expect('{')
+        if (yield from self._peek()) == '}':
+            self._pos += 1
+            return
+        while True:
+            key = yield from self._value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expecting a key, got {key!r}")
+            yield from self._expect(':')
+            if depth < len(self.path) and key == self.path[depth]:
+                if depth + 1 == len(self.path):
+                    # the records : one at a time
+                    yield from self._records()
+                elif (yield from self._peek()) == '{':
+                    yield from self._members(depth + 1)
+                else:
+                    self.others[self.path[:depth] + (key,)] = yield from self._value()
+            else:
+                self.others[self.path[:depth] + (key,)] = yield from self._value()
+            if (yield from self._expect(',}')) == '}':
+                return
+
+    def _records(self):
+        if (yield from self._peek()) != '{':
+            self.others[self.path] = yield from self._value()
+            return
+        self._pos += 1
+        if (yield from self._peek()) == '}':
+            self._pos += 1
+            return
+        while True:
+            key = yield from self._value()
+            yield from self._expect(':')
+            yield key, (yield from self._value())
+            if (yield from self._expect(',}')) == '}':
+                return
+
+    def _document(self):
+        yield from self._members(0)
+
+
+def flatten(record) -> typing.Dict[str, typing.Any]:
+    """ values of a record, with nested records (and dicts) flattened as parent_child,
+    like dataclasses.asdict with model.orderframe.flatten_orderdict.
+
+    >>> @dataclasses.dataclass
+    ... class Order:
+    ...     descr: typing.Any
+    ...     vol: int
+    >>> @dataclasses.dataclass
+    ... class Descr:
+    ...     pair: str
+    ...     price: int
+    >>> flatten(Order(descr=Descr(pair='XBTEUR', price=8000), vol=1))
+    {'descr_pair': 'XBTEUR', 'descr_price': 8000, 'vol': 1}
+    """
+    row = dict()
+    for f in dataclasses.fields(record):
+        value = getattr(record, f.name)
+        if dataclasses.is_dataclass(value):
+            row.update({f.name + '_' + k: v for k, v in flatten(value).items()})
+        elif isinstance(value, dict):
+            row.update({f.name + '_' + k: v for k, v in value.items()})
+        else:
+            row[f.name] = value
+    return row
+
+
+class Columns:
+    """ Columnar builder : the values of each record are appended to one list per field.
+    Records are identified by their id (the key in kraken results) : a record appended again replaces the previous one.
+    Iterating gives the ids, like the dict of records does. Missing fields are NaN, like in DataFrame.from_records.
+
+    >>> columns = Columns(fields=['refid', 'amount'])
+    >>> columns.append('L1', {'refid': 'R1', 'amount': 1})
+    >>> columns.append('L2', {'refid': 'R2', 'amount': 2, 'fee': 0})
+    >>> columns.append('L1', {'refid': 'R1', 'amount': 3})
+    >>> list(columns), len(columns)
+    (['L1', 'L2'], 2)
+    >>> columns.frame()
+      refid  amount  fee
+    0    R1       3  NaN
+    1    R2       2  0.0
+    """
+
+    def __init__(self, fields: typing.Iterable[str] = ()):
+        self.columns: typing.Dict[str, typing.List] = {f: list() for f in fields}
+        self._index: typing.Dict[str, int] = dict()
+
+    def append(self, key: str, row: typing.Mapping[str, typing.Any]):
+        position = self._index.get(key)
+        if position is None:
+            position = self._index[key] = len(self._index)
+            for name, column in self.columns.items():
+                column.append(row.get(name, _missing))
+        else:
+            for name, column in self.columns.items():
+                column[position] = row.get(name, _missing)
+        for name in row:
+            if name not in self.columns:  # a new field : missing in the previous records
+                column = self.columns[name] = [_missing] * len(self._index)
+                column[position] = row[name]
+
+    def extend(self, other: Columns):
+        names = list(other.columns)
+        for key, position in other._index.items():
+            self.append(key, {n: other.columns[n][position] for n in names})
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns)
+
+
+class StreamedResult:
+    """ How to stream one kind of history response : where the records are, how to load them, how to store them. """
+
+    def __init__(self, member: str, schema, id_field: typing.Optional[str] = None,
+                 row: typing.Callable[[typing.Any], typing.Mapping] = flatten):
+        """
+        :param member: the member of the result containing the records, by id
+        :param schema: to load one record
+        :param id_field: the field of the record set to its id, if any (like the response schema pre_load does)
+        :param row: values of a loaded record, by column
+        """
+        self.path = ('result', member)
+        self.schema = schema
+        self.id_field = id_field
+        self.row = row
+
+    async def __call__(self, content) -> typing.Tuple[Columns, int]:
+        """ parsing the body (an aiohttp.StreamReader), returning the columns and the total count, like the response schema """
+        stream = MemberStream(path=self.path)
+        columns = Columns()
+        async for chunk in content.iter_chunked(CHUNK):  # read(n) returns whatever has arrived, up to n
+            stream.feed(chunk)
+            for key, data in stream:
+                self._append(columns, key, data)
+            # errors come before the result : failing early
+            self._raise(stream)
+        stream.close()
+        self._raise(stream)
+        count = stream.others.get(('result', 'count'))
+        if self.path in stream.others or not isinstance(count, int):
+            raise ValueError(f"Unexpected {self.path[-1]} response: {stream.others}")
+        return columns, count
+
+    def _append(self, columns: Columns, key: str, data: typing.Any):
+        if self.id_field is not None and isinstance(data, dict):
+            data.setdefault(self.id_field, key)
+        columns.append(key, self.row(self.schema.load(data)))
+
+    @staticmethod
+    def _raise(stream: MemberStream):
+        for e in stream.others.get(('error',), ()):
+            raise AIOKrakenServerError(e)
@@ -0,0 +1,168 @@
+""" Registry of asset and pair names, shared by the rest and websockets layers.
+
+Kraken names each asset and pair in several ways (restname, altname, and wsname for pairs),
+and messages use one or the other. Every name variant is interned here, into one index,
+mapping it to a small integer id, stable for the process : the model layer can use ids instead of strings.
+
+The registry can persist to disk : on the next start, pairs and assets are known before any request to kraken.
+The process-wide registry does, when AIOKRAKEN_STATE names a file.
+"""
+import decimal
+import os
+import typing
+
+from tinydb import TinyDB
+
+from aiokraken.config import KRAKEN_STATE_FILE
+from aiokraken.model.asset import Asset
+from aiokraken.model.assetpair import AssetPair
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+
+def _jsonable(value):
+    # fees are decimals : stored as numbers, like kraken sends them
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    raise TypeError(f"{value!r} is not JSON serializable")
+
+
+def _record(dumped: dict) -> dict:
+    # missing optional fields are absent in kraken records, not null
+    return {k: v for k, v in dumped.items() if v is not None}
+
+
+class SymbolRegistry:
+    """ Every name of assets and pairs, in one index, to small integer ids.
+
+    >>> registry = SymbolRegistry(persist=None)
+    >>> registry.intern_asset(Asset(altname='XBT', aclass='currency', decimals=10, display_decimals=5, restname='XXBT'))
+    0
+    >>> registry.asset_id('XBT'), registry.asset_id('XXBT')
+    (0, 0)
+    >>> registry.asset(0).restname
+    'XXBT'
+    >>> registry.pair_id('XBT/EUR')
+    Traceback (most recent call last):
+      ...
+    KeyError: 'XBT/EUR'
+    """
+
+    def __init__(self, persist: typing.Optional[str] = None):
+        """
+        :param persist: the file to store names in, for the next start. None to not persist.
+        """
+        self.persist = persist
+        self.assets: typing.List[Asset] = list()  # by id
+        self.pairs: typing.List[AssetPair] = list()  # by id
+        self._asset_ids: typing.Dict[str, int] = dict()  # every name -> id
+        self._pair_ids: typing.Dict[str, int] = dict()  # every name -> id
+        # loading lazily : importing should not read files
+        self._loaded = persist is None
+
+    @staticmethod
+    def _intern(entries: typing.List, ids: typing.Dict[str, int], entry, *othernames: typing.Optional[str]) -> int:
+        i = ids.get(entry.restname)
+        if i is None:
+            i = len(entries)
+            entries.append(entry)
+        else:  # newer data, same id
+            entries[i] = entry
+        ids[entry.restname] = i  # restnames take precedence over other names
+        for n in othernames:
+            if n is not None:
+                ids.setdefault(n, i)
+        return i
+
+    def intern_asset(self, asset: Asset) -> int:
+        self._warm()
+        return self._intern(self.assets, self._asset_ids, asset, asset.altname)
+
+    def intern_pair(self, pair: AssetPair) -> int:
+        self._warm()
+        return self._intern(self.pairs, self._pair_ids, pair, pair.altname, pair.wsname)
+
+    def asset_id(self, name: str) -> int:
+        try:
+            return self._asset_ids[name]
+        except KeyError:
+            if self._warm():
+                return self._asset_ids[name]
+            raise
+
+    def pair_id(self, name: str) -> int:
+        try:
+            return self._pair_ids[name]
+        except KeyError:
+            if self._warm():
+                return self._pair_ids[name]
+            raise
+
+    def asset(self, key: typing.Union[str, int]) -> Asset:
+        """ the asset, by any of its names, or by id """
+        return self.assets[key if isinstance(key, int) else self.asset_id(key)]
+
+    def pair(self, key: typing.Union[str, int]) -> AssetPair:
+        """ the pair, by any of its names, or by id """
+        return self.pairs[key if isinstance(key, int) else self.pair_id(key)]
+
+    def pair_assets(self, key: typing.Union[str, int]) -> typing.Tuple[int, int]:
+        """ ids of the base and quote assets of a pair """
+        pair = self.pair(key)
+        return self.asset_id(pair.base), self.asset_id(pair.quote)
+
+    def update(self, assets: typing.Iterable[Asset] = (), pairs: typing.Iterable[AssetPair] = ()):
+        """ interning freshly retrieved assets and pairs, and storing them for the next start """
+        for a in assets:
+            self.intern_asset(a)
+        for p in pairs:
+            self.intern_pair(p)
+        self.save()
+
+    def _warm(self) -> bool:
+        """ loads persisted names, once. returns whether it did """
+        if self._loaded:
+            return False
+        self._loaded = True
+        self.load()
+        return True
+
+    def load(self):
+        if self.persist is None or not os.path.exists(self.persist):
+            return
+        # late import : schemas are not needed otherwise
+        from aiokraken.rest.schemas.kasset import AssetSchema
+        from aiokraken.rest.schemas.kassetpair import KAssetPairSchema
+        try:
+            with TinyDB(self.persist) as db:
+                assets = [AssetSchema().load(d['record'])(d['restname']) for d in db.table('assets').all()]
+                pairs = [KAssetPairSchema().load(d['record'])(d['restname']) for d in db.table('assetpairs').all()]
+        except Exception as exc:  # we can always retrieve them again
+            LOGGER.warning(f"Could not load symbols from {self.persist}: {exc}")
+            return
+        for a in assets:
+            self._intern(self.assets, self._asset_ids, a, a.altname)
+        for p in pairs:
+            self._intern(self.pairs, self._pair_ids, p, p.altname, p.wsname)
+
+    def save(self):
+        if self.persist is None:
+            return
+        from aiokraken.rest.schemas.kasset import AssetSchema
+        from aiokraken.rest.schemas.kassetpair import KAssetPairSchema
+        try:
+            os.makedirs(os.path.dirname(self.persist), exist_ok=True)
+            with TinyDB(self.persist, default=_jsonable) as db:
+                # in id order, so that ids are the same on the next start
+                for table, schema, entries in [('assets', AssetSchema(), self.assets),
+                                               ('assetpairs', KAssetPairSchema(), self.pairs)]:
+                    db.drop_table(table)
+                    db.table(table).insert_multiple({'restname': e.restname, 'record': _record(schema.dump(e))}
+                                                    for e in entries)
+        except Exception as exc:
+            LOGGER.warning(f"Could not save symbols to {self.persist}: {exc}")
+
+
+# The process-wide registry
+symbols = SymbolRegistry(persist=KRAKEN_STATE_FILE)
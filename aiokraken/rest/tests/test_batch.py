@@ -0,0 +1,55 @@
+import asyncio
+import unittest
+
+from aiokraken.rest.batch import MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.requests = list()
+
+    async def fake_ticker(self, pairs):
+        self.requests.append(pairs)
+        return {p: len(self.requests) for p in pairs}
+
+    def test_window(self):
+        batcher = MicroBatcher(self.fake_ticker, window=0.01)
+
+        async def run():
+            first = await asyncio.gather(*(batcher([p]) for p in ["XBTEUR", "ETHEUR", "XBTEUR"]))
+            # after the window, a new batch starts
+            second = await batcher(["XTZEUR"])
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert self.requests == [["XBTEUR", "ETHEUR"], ["XTZEUR"]]
+        assert all(r == {"XBTEUR": 1, "ETHEUR": 1} for r in first)
+        assert second == {"XTZEUR": 2}
+        assert batcher.stats.calls == 4
+        assert batcher.stats.batches == 2
+
+    def test_max_keys(self):
+        batcher = MicroBatcher(self.fake_ticker, window=10, max_keys=2)
+
+        async def run():
+            return await asyncio.gather(batcher(["XBTEUR"]), batcher(["ETHEUR"]))
+
+        # no need to wait for the (long) window
+        asyncio.run(asyncio.wait_for(run(), timeout=1))
+        assert self.requests == [["XBTEUR", "ETHEUR"]]
+
+    def test_error_for_everyone(self):
+        async def failing(pairs):
+            raise RuntimeError("EService:Unavailable")
+
+        batcher = MicroBatcher(failing, window=0.01)
+
+        async def run():
+            return await asyncio.gather(batcher(["XBTEUR"]), batcher(["ETHEUR"]), return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+
+
+if __name__ == '__main__':
+    unittest.main()
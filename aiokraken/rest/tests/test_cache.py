@@ -0,0 +1,164 @@
+import asyncio
+import unittest
+
+from aiokraken.model.timeframe import KTimeFrameModel
+from aiokraken.rest.cache import ResponseCache, cached
+from aiokraken.rest.client import RestClient
+from aiokraken.rest.limiter import unlimited
+from aiokraken.rest.symbols import SymbolRegistry
+from aiokraken.rest.throttle import AdaptiveThrottle
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    """ minimal client, counting requests actually sent """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.sent = 0
+
+    @cached
+    async def time(self):
+        self.sent += 1
+        await asyncio.sleep(0)
+        return self.sent
+
+    @cached
+    async def ohlc(self, pair, interval=KTimeFrameModel.one_minute):
+        self.sent += 1
+        return {'error': "EService:Unavailable"} if pair == "BROKEN" else (pair, self.sent)
+
+    @cached
+    async def balance(self):
+        self.sent += 1
+        return self.sent
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(ttl={'time': 10}, stale=0.5, maxsize=2, timer=self.clock)
+
+    def test_fresh_stale_expired(self):
+        client = FakeClient(cache=self.cache)
+
+        async def run():
+            assert await client.time() == 1
+            self.clock.now = 5
+            assert await client.time() == 1  # fresh
+            self.clock.now = 12
+            assert await client.time() == 1  # stale, refreshing in background
+            await asyncio.sleep(0.01)
+            assert await client.time() == 2  # refreshed
+            self.clock.now = 40
+            assert await client.time() == 3  # expired
+
+        asyncio.run(run())
+        assert self.cache.stats.hits == 2
+        assert self.cache.stats.stale == 1
+        assert self.cache.stats.misses == 2
+
+    def test_ohlc_ttl_follows_interval(self):
+        assert self.cache.ttl_for('ohlc', {'interval': KTimeFrameModel.one_minute}) == 60
+        assert self.cache.ttl_for('ohlc', {'interval': KTimeFrameModel.one_hour}) == 3600
+
+        client = FakeClient(cache=self.cache)
+
+        async def run():
+            await client.ohlc("XBTEUR")
+            await client.ohlc("XBTEUR", interval=KTimeFrameModel.one_hour)
+            self.clock.now = 61
+            assert await client.ohlc("XBTEUR", KTimeFrameModel.one_hour) == ("XBTEUR", 2)  # still fresh
+            await client.ohlc(pair="XBTEUR")  # stale
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+        assert client.sent == 3
+
+    def test_errors_not_cached(self):
+        client = FakeClient(cache=self.cache)
+
+        async def run():
+            await client.ohlc("BROKEN")
+            await client.ohlc("BROKEN")
+
+        asyncio.run(run())
+        assert client.sent == 2
+        assert len(self.cache) == 0
+
+    def test_lru_eviction(self):
+        client = FakeClient(cache=self.cache)
+
+        async def run():
+            await client.ohlc("XBTEUR")
+            await client.ohlc("ETHEUR")
+            await client.ohlc("XBTEUR")  # most recently used
+            await client.ohlc("LTCEUR")
+            await client.ohlc("XBTEUR")
+
+        asyncio.run(run())
+        assert self.cache.stats.evictions == 1
+        assert client.sent == 3
+
+    def test_uncached_methods(self):
+        for client in (FakeClient(), FakeClient(cache=self.cache)):
+            asyncio.run(client.balance())
+            asyncio.run(client.balance())
+            assert client.sent == 2
+
+
+class TestClientCache(unittest.TestCase):
+
+    def client(self, cache):
+        client = RestClient(cache=cache)
+        client.public_limiter = unlimited()
+        client.throttle = AdaptiveThrottle(persist=None)
+        client.symbols = SymbolRegistry(persist=None)
+        client.sent = 0
+
+        async def get(request):
+            client.sent += 1
+            return {}
+
+        client._get = get
+        return client
+
+    def test_assets_once_without_ttl(self):
+        # no ttl for assets : retrieved once, like without a cache
+        for cache in (None, ResponseCache(ttl={'retrieve_assets': None, 'retrieve_assetpairs': None})):
+            client = self.client(cache)
+
+            async def run():
+                for _ in range(3):
+                    await client.retrieve_assets()
+                    await client.retrieve_assetpairs()
+
+            asyncio.run(run())
+            assert client.sent == 2
+
+    def test_assets_refetched_on_expiry(self):
+        clock = FakeClock()
+        client = self.client(ResponseCache(timer=clock))
+
+        async def run():
+            await client.retrieve_assets()
+            await client.retrieve_assets()
+            assert client.sent == 1  # cached
+            clock.now = 10 ** 5
+            await client.retrieve_assets()
+            assert client.sent == 2  # expired
+
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+
+from aiokraken.rest.coalesce import coalesced
+
+
+class FakeClient:
+    """ minimal client, counting requests actually sent """
+
+    def __init__(self, coalesce=()):
+        self.coalesce = set(coalesce)
+        self.coalesce_stats = dict()
+        self._inflight = dict()
+        self.sent = 0
+
+    @coalesced
+    async def ticker(self, pairs=None):
+        self.sent += 1
+        await asyncio.sleep(0.01)
+        return {p: object() for p in pairs}
+
+
+class TestCoalesced(unittest.TestCase):
+
+    def test_identical_calls_share_one_request(self):
+        client = FakeClient(coalesce={'ticker'})
+
+        async def run():
+            return await asyncio.gather(client.ticker(["XBTEUR"]),
+                                        client.ticker(pairs=["XBTEUR"]),  # same call, different syntax
+                                        client.ticker(["ETHEUR"]))
+
+        r1, r2, r3 = asyncio.run(run())
+        assert client.sent == 2
+        assert r1 is r2
+        assert r3 is not r1
+        assert client.coalesce_stats['ticker'].calls == 3
+        assert client.coalesce_stats['ticker'].deduplicated == 1
+        assert not client._inflight
+
+    def test_opt_in(self):
+        client = FakeClient()
+
+        async def run():
+            return await asyncio.gather(client.ticker(["XBTEUR"]), client.ticker(["XBTEUR"]))
+
+        r1, r2 = asyncio.run(run())
+        assert client.sent == 2
+        assert r1 is not r2
+
+    def test_cancelled_caller(self):
+        client = FakeClient(coalesce={'ticker'})
+
+        async def run():
+            first = asyncio.ensure_future(client.ticker(["XBTEUR"]))
+            second = asyncio.ensure_future(client.ticker(["XBTEUR"]))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert "XBTEUR" in asyncio.run(run())
+        assert client.sent == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import unittest
+
+import hypothesis.strategies as st
+from hypothesis import given, settings
+
+from aiokraken.rest.decoders import UnexpectedPayload, decode_ticker, decode_trades, loads, ohlc_decoder
+from aiokraken.rest.exceptions import AIOKrakenServerError
+from aiokraken.rest.payloads import TickerPayloadSchema
+from aiokraken.rest.response import Response
+from aiokraken.rest.schemas.ktrade import TradeDictStrategy, TradeResponseSchema
+from aiokraken.rest.schemas.ohlc import PairOHLCSchema
+from aiokraken.rest.schemas.payload import PayloadSchema
+
+"""
+Parity tests : fast decoders must build exactly what the marshmallow schemas build.
+"""
+
+decimal_str = st.decimals(allow_nan=False, allow_infinity=False).map(str)
+
+
+@st.composite
+def TickerDictStrategy(draw):
+    return {
+        'a': draw(st.lists(decimal_str, min_size=3, max_size=3)),
+        'b': draw(st.lists(decimal_str, min_size=3, max_size=3)),
+        'c': draw(st.lists(decimal_str, min_size=2, max_size=2)),
+        'v': draw(st.lists(decimal_str, min_size=2, max_size=2)),
+        'p': draw(st.lists(decimal_str, min_size=2, max_size=2)),
+        # orjson decodes bigger integers as floats
+        't': draw(st.lists(st.integers(min_value=0, max_value=2 ** 63 - 1), min_size=2, max_size=2)),
+        'l': draw(st.lists(decimal_str, min_size=2, max_size=2)),
+        'h': draw(st.lists(decimal_str, min_size=2, max_size=2)),
+        'o': draw(decimal_str),
+    }
+
+
+def payload(result):
+    # going through json, like a response from the network
+    return loads(json.dumps({'error': [], 'result': result}))
+
+
+class TestDecodersParity(unittest.TestCase):
+
+    @given(tickers=st.dictionaries(keys=st.sampled_from(["XXBTZEUR", "XETHZEUR", "XTZEUR"]), values=TickerDictStrategy()))
+    def test_ticker(self, tickers):
+        data = payload(tickers)
+        expected = TickerPayloadSchema().load(data)
+        decoded = decode_ticker(data)
+        assert decoded == expected
+        assert repr(decoded) == repr(expected)
+
+    @settings(max_examples=50)
+    @given(trades=st.dictionaries(keys=st.text(min_size=1, max_size=20), values=TradeDictStrategy(), max_size=5),
+           count=st.integers(min_value=0, max_value=2 ** 63 - 1))  # orjson decodes bigger integers as floats
+    def test_trades(self, trades, count):
+        data = payload({'trades': trades, 'count': count})
+        expected = PayloadSchema(result_schema=TradeResponseSchema()).load(loads(json.dumps(data)))
+        decoded = decode_trades(data)
+        assert decoded == expected
+        assert repr(decoded) == repr(expected)
+
+    def test_trades_float_time(self):
+        # kraken sends times with decimals
+        data = payload({'trades': {"TXID": {"ordertxid": "OTXID", "pair": "XXBTZEUR", "time": 1571150298.4497,
+                                            "type": "buy", "ordertype": "limit", "price": "7575.20000",
+                                            "cost": "15.15040", "fee": "0.03939", "vol": "0.00200000",
+                                            "margin": "0.00000", "misc": ""}},
+                        'count': 1})
+        expected = PayloadSchema(result_schema=TradeResponseSchema()).load(loads(json.dumps(data)))
+        assert decode_trades(data) == expected
+
+    def test_ohlc(self):
+        data = payload({"XXBTZEUR": [[1567039620, "8746.4", "8751.5", "8745.7", "8745.7", "8749.3", "0.09663298", 8],
+                                     [1567039680, "8745.7", "8747.3", "8745.7", "8747.3", "8747.3", "0.00929540", 1]],
+                        "last": 1567041780})
+        expected = PayloadSchema(result_schema=PairOHLCSchema(pair="XXBTZEUR")).load(loads(json.dumps(data)))
+        decoded = ohlc_decoder(pair="XXBTZEUR")(data)
+        assert decoded == expected
+        assert decoded.last == expected.last
+        assert (decoded.dataframe.dtypes == expected.dataframe.dtypes).all()
+
+    def test_errors(self):
+        data = {'error': ["EGeneral:Invalid arguments"], 'result': {}}
+        with self.assertRaises(AIOKrakenServerError):
+            TickerPayloadSchema().load(data)
+        with self.assertRaises(AIOKrakenServerError):
+            decode_ticker(data)
+
+    def test_fallback_to_schema(self):
+        # unexpected content : the schema must report it, as usual
+        response = Response(status=200, schema=TickerPayloadSchema(), decoder=decode_ticker)
+        data = {'error': [], 'result': {"XXBTZEUR": {"a": ["1", "1", "1"], "unknown": 42}}}
+        with self.assertRaises(Exception) as fast:
+            response(status=200, data=data, request_data=None, fast=True)
+        with self.assertRaises(Exception) as slow:
+            response(status=200, data=data, request_data=None)
+        assert type(fast.exception) == type(slow.exception)
+
+    @given(ticker=TickerDictStrategy(), field=st.sampled_from(['a', 'b', 'c', 'v', 'p', 'l', 'h']),
+           special=st.sampled_from(["NaN", "nan", "Infinity", "-inf"]))
+    def test_ticker_special_values(self, ticker, field, special):
+        # special values are left to the schema, on every field
+        ticker[field][0] = special
+        data = payload({"XXBTZEUR": ticker})
+        with self.assertRaises(UnexpectedPayload):
+            decode_ticker(data)
+        response = Response(status=200, schema=TickerPayloadSchema(), decoder=decode_ticker)
+        fast = response(status=200, data=data, request_data=None, fast=True)
+        slow = response(status=200, data=data, request_data=None)
+        assert repr(fast) == repr(slow)  # NaN != NaN
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import asyncio
+import unittest
+
+import aiohttp
+
+from aiokraken.rest.client import RestClient
+from aiokraken.rest.hedge import Hedging
+from aiokraken.rest.limiter import CounterDecayLimiter, public_limiter
+
+
+class FakeServer:
+    """ answers each request after the given delays, in order. Raises the ones that are exceptions. """
+
+    def __init__(self, *delays, default=0.05):
+        self.delays = list(delays)
+        self.default = default
+        self.sent = 0
+        self.cancelled = 0
+
+    async def send(self):
+        n = self.sent
+        self.sent += 1
+        try:
+            delay = self.delays[n] if n < len(self.delays) else self.default
+            if isinstance(delay, Exception):
+                raise delay
+            await asyncio.sleep(delay)
+            return n
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+class TestHedging(unittest.TestCase):
+
+    def test_fast_response(self):
+        hedging = Hedging(delay=0.1)
+        server = FakeServer(0.01)
+        assert asyncio.run(hedging('Ticker', server.send)) == 0
+        assert server.sent == 1
+        assert hedging.stats['Ticker'].hedged == 0
+
+    def test_hedge_wins(self):
+        hedging = Hedging(delay=0.05, budget=1)
+        server = FakeServer(1.0, 0.01)
+        assert asyncio.run(hedging('Ticker', server.send)) == 1
+        assert server.sent == 2
+        assert server.cancelled == 1  # the slow one
+        assert hedging.stats['Ticker'].hedged == hedging.stats['Ticker'].won == 1
+
+    def test_primary_wins(self):
+        hedging = Hedging(delay=0.02, budget=1)
+        server = FakeServer(0.05, 1.0)
+        assert asyncio.run(hedging('Ticker', server.send)) == 0
+        assert server.cancelled == 1
+        assert hedging.stats['Ticker'].hedged == 1 and hedging.stats['Ticker'].won == 0
+
+    def test_failed_hedge(self):
+        hedging = Hedging(delay=0.02, budget=1)
+        server = FakeServer(0.05, aiohttp.ClientOSError())
+        # the other one answers
+        assert asyncio.run(hedging('Ticker', server.send)) == 0
+
+    def test_both_failed(self):
+        hedging = Hedging(delay=0.02, budget=1)
+        server = FakeServer(ValueError("primary"))
+        with self.assertRaises(ValueError):  # before hedging
+            asyncio.run(hedging('Ticker', server.send))
+
+        sent = list()
+
+        async def send():
+            sent.append(None)
+            if len(sent) == 1:
+                await asyncio.sleep(0.05)
+                raise ValueError("primary")
+            raise aiohttp.ClientOSError()
+
+        with self.assertRaises(aiohttp.ClientOSError):  # the first error (from the hedge)
+            asyncio.run(hedging('Ticker', send))
+
+    def test_not_idempotent(self):
+        hedging = Hedging(delay=0.01, budget=1)
+        server = FakeServer(0.05)
+        assert asyncio.run(hedging('AddOrder', server.send)) == 0
+        assert server.sent == 1
+        assert 'AddOrder' not in hedging.stats
+
+    def test_rate_budget(self):
+        limiter = CounterDecayLimiter(maximum=1, decay=1.0)
+        hedging = Hedging(delay=0.01, budget=1)
+        server = FakeServer(0.05, 0.01)
+
+        limiter.spend(cost=2)  # the call, and a recent hedge : no headroom for another one
+        assert asyncio.run(hedging('Ticker', server.send, limiter=limiter)) == 0
+        assert server.sent == 1
+        assert hedging.stats['Ticker'].skipped == 1
+
+    def test_public_limiter(self):
+        hedging = Hedging(delay=0.01, budget=1)
+        server = FakeServer(1.0, 0.01)
+
+        async def run():
+            limiter = public_limiter()
+            await limiter.acquire()  # like the client, for the primary call
+            result = await hedging('Ticker', server.send, limiter=limiter)
+            return result, limiter.wait_time()
+
+        result, wait = asyncio.run(run())
+        assert result == 1  # the hedge was sent, and won
+        assert hedging.stats['Ticker'].hedged == 1
+        assert wait > 0  # the next call waits for it
+
+    def test_hedged_fraction(self):
+        hedging = Hedging(delay=0.01, budget=0.5)
+        server = FakeServer()
+
+        async def run():
+            return [await hedging('Ticker', server.send) for _ in range(4)]
+
+        asyncio.run(run())
+        stats = hedging.stats['Ticker']
+        assert stats.calls == 4
+        assert stats.hedged == 2 and stats.skipped == 2
+
+    def test_percentile_delay(self):
+        hedging = Hedging(percentile=0.5, warmup=3, delay=10.0)
+        server = FakeServer(0.01, 0.01, 0.01, 0.2, 0.01)
+
+        async def run():
+            return [await hedging('Ticker', server.send) for _ in range(4)]
+
+        # the fourth request is hedged after a median latency, not after the default delay
+        assert asyncio.run(run()) == [0, 1, 2, 4]
+        assert hedging.stats['Ticker'].won == 1
+
+
+class TestRetry(unittest.TestCase):
+
+    def test_get_retries_same_request(self):
+        client = RestClient()
+        client.public_limiter = CounterDecayLimiter(maximum=1, decay=1.0, sleeper=lambda _: asyncio.sleep(0))
+        requests = list()
+
+        async def get_once(request):
+            requests.append(request)
+            if len(requests) == 1:
+                raise aiohttp.ClientOSError(104, "Connection reset by peer")
+            return "response"
+
+        client._get_once = get_once
+        request = client.server.ticker(pairs=['XXBTZEUR'])
+        assert asyncio.run(client._get(request)) == "response"
+        assert requests == [request, request]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+
+from hypothesis import given, strategies as st
+
+from aiokraken.rest.limiter import CounterDecayLimiter, KTier, private_limiter
+
+
+class FakeClock:
+    """ A clock that only moves when something sleeps on it """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, secs):
+        self.now += secs
+
+
+class TestCounterDecayLimiter(unittest.TestCase):
+
+    def test_burst_until_maximum(self):
+        clock = FakeClock()
+        lim = CounterDecayLimiter.from_tier(KTier.starter, timer=clock, sleeper=clock.sleep)
+
+        async def burst():
+            return [await lim.acquire(cost=1) for _ in range(KTier.starter.maximum)]
+
+        waits = asyncio.run(burst())
+        # the whole budget is usable without waiting
+        assert all(w == 0 for w in waits)
+        assert lim.counter == KTier.starter.maximum
+
+        # the next one has to wait for the decay
+        assert lim.wait_time(cost=2) == 2 / KTier.starter.decay
+
+    @given(costs=st.lists(st.integers(min_value=0, max_value=2), min_size=1, max_size=50))
+    def test_never_over_maximum(self, costs):
+        clock = FakeClock()
+        lim = CounterDecayLimiter.from_tier(KTier.intermediate, timer=clock, sleeper=clock.sleep)
+
+        async def calls():
+            for c in costs:
+                await lim.acquire(cost=c)
+                # when the call is actually made, kraken counter is under the maximum
+                assert lim.counter <= KTier.intermediate.maximum + 1e-9
+
+        asyncio.run(calls())
+
+    def test_saturate(self):
+        clock = FakeClock()
+        lim = CounterDecayLimiter(maximum=10, decay=1, timer=clock, sleeper=clock.sleep)
+        lim.saturate()
+        assert lim.counter == 10
+        assert lim.state().wait(cost=1) == 1
+
+    def test_shared_per_key(self):
+        assert private_limiter(key="somekey") is private_limiter(key="somekey")
+        assert private_limiter(key="somekey") is not private_limiter(key="otherkey")
+
+    def test_shared_tier_mismatch(self):
+        lim = private_limiter(key="tierkey", tier=KTier.starter)
+        lim.spend(cost=10)
+        with self.assertLogs('aiokraken.rest.limiter', level='WARNING'):
+            assert private_limiter(key="tierkey", tier=KTier.pro) is lim
+        assert (lim.maximum, lim.decay) == (KTier.pro.maximum, KTier.pro.decay)
+        assert 9 < lim.counter <= 10  # same counter
+
+
+if __name__ == '__main__':
+    unittest.main()
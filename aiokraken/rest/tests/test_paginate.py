@@ -0,0 +1,129 @@
+import asyncio
+import unittest
+
+from aiokraken.rest.paginate import PaginationStats, paginate
+
+
+class FakeHistory:
+    """ paginated history, newest first, like kraken """
+
+    def __init__(self, count, size=50):
+        self.records = {f"T{i:04}": i for i in reversed(range(count))}
+        self.size = size
+        self.offsets = list()
+        self.inflight = 0
+        self.max_inflight = 0
+
+    async def __call__(self, offset):
+        self.offsets.append(offset)
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        await asyncio.sleep(0.001)
+        self.inflight -= 1
+        keys = list(self.records)[offset: offset + self.size]
+        return {k: self.records[k] for k in keys}, len(self.records)
+
+
+async def collect(page, **kwargs):
+    results = dict()
+    async for p in paginate(page, **kwargs):
+        results.update(p)
+    return results
+
+
+class TestPaginate(unittest.TestCase):
+
+    def test_concurrent_pages(self):
+        history = FakeHistory(count=420)
+        stats = PaginationStats()
+        results = asyncio.run(collect(history, concurrency=4, stats=stats))
+
+        assert results == history.records
+        assert sorted(history.offsets) == list(range(0, 420, 50))
+        assert history.max_inflight == 4
+        assert stats.pages == 9
+        assert stats.concurrent == 8
+
+    def test_sequential_by_default(self):
+        # private requests are signed with nonces : without a nonce window, they must reach kraken in order
+        history = FakeHistory(count=420)
+        stats = PaginationStats()
+        results = asyncio.run(collect(history, stats=stats))
+
+        assert results == history.records
+        assert history.offsets == list(range(0, 420, 50))
+        assert history.max_inflight == 1
+        assert stats.concurrent == 0
+        assert stats.refills == 0
+
+    def test_single_page(self):
+        history = FakeHistory(count=12)
+        assert asyncio.run(collect(history)) == history.records
+        assert history.offsets == [0]
+
+    def test_empty(self):
+        history = FakeHistory(count=0)
+        assert asyncio.run(collect(history)) == {}
+
+    def test_short_first_page(self):
+        history = FakeHistory(count=14)
+        first = dict(list(history.records.items())[:6])
+
+        async def page(offset):
+            if offset == 0:  # like the trades cassette : 6 results out of 14
+                return first, len(history.records)
+            return await history(offset)
+
+        stats = PaginationStats()
+        assert asyncio.run(collect(page, stats=stats)) == history.records
+        # no extra page at offsets computed from the short page
+        assert history.offsets == [6]
+        assert stats.concurrent == 0 and stats.refills == 1
+
+    def test_short_pages_gaps(self):
+        history = FakeHistory(count=130)
+
+        async def page(offset):
+            results, count = await history(offset)
+            if offset in (0, 50):  # kraken may return less than a full page
+                results = dict(list(results.items())[:20])
+            return results, count
+
+        assert asyncio.run(collect(page)) == history.records
+        assert sorted(history.offsets[:3]) == [0, 50, 100]
+        assert history.offsets[3:] == [20, 70]  # refilling the gaps
+
+    def test_shifted_results(self):
+        history = FakeHistory(count=120)
+        original = dict(history.records)
+        stats = PaginationStats()
+
+        async def page(offset):
+            results = await history(offset)
+            if offset == 0:  # a new trade arrived just after the first page
+                history.records = {"T9999": 9999, **history.records}
+            return results
+
+        results = asyncio.run(collect(page, stats=stats))
+        # nothing older is missed, even if the count changed during pagination
+        assert set(original) <= set(results)
+        assert stats.refills == 1
+
+    def test_early_stop(self):
+        history = FakeHistory(count=500)
+
+        async def first_pages():
+            pages = 0
+            async for _ in paginate(history, concurrency=2):
+                pages += 1
+                if pages == 2:
+                    break
+            await asyncio.sleep(0.01)
+            return pages
+
+        assert asyncio.run(first_pages()) == 2
+        assert len(history.offsets) < 10
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from aiokraken.model.time import Time
+from aiokraken.rest.client import RestClient
+from aiokraken.rest.exceptions import AIOKrakenServerError
+from aiokraken.rest.replay import ReplayMiss, ReplaySession
+from aiokraken.utils.clock import server_clock
+
+"""
+Test module for the replay transport, serving recorded responses to a RestClient.
+"""
+
+TIME = {'method': 'GET', 'uri': 'https://api.kraken.com/0/public/Time', 'status': 200,
+        'response': {'error': [], 'result': {'unixtime': 1577873240, 'rfc1123': 'Wed,  1 Jan 20 10:07:20 +0000'}},
+        'latency': 0.25}
+
+
+def ohlc(since, last):
+    return {'method': 'GET', 'uri': f'https://api.kraken.com/0/public/OHLC?pair=XXBTZEUR&interval=1&since={since}',
+            'response': json.dumps({'error': [], 'result': {'XXBTZEUR': [], 'last': last}})}
+
+
+class TestReplaySession(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmpdir.name, 'requests.jsonl')
+        with open(self.log, 'w') as f:
+            for i in [TIME, ohlc(1, 2), ohlc(2, 3), dict(TIME, response={'error': ['EService:Unavailable']})]:
+                f.write(json.dumps(i) + '\n')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def get(self, session, url, params=None):
+        async def get():
+            async with session.get(url=url, params=params) as response:
+                return await response.json()
+        return asyncio.run(get())
+
+    def test_order_then_repeat(self):
+        session = ReplaySession.from_jsonl(self.log)
+        url = 'https://api.kraken.com/0/public/Time'
+        assert self.get(session, url)['result']['unixtime'] == 1577873240
+        # recorded twice : in order, then the last one again
+        assert self.get(session, url)['error'] == ['EService:Unavailable']
+        assert self.get(session, url)['error'] == ['EService:Unavailable']
+        assert session.served == 3
+
+    def test_params(self):
+        url = 'https://api.kraken.com/0/public/OHLC'
+        session = ReplaySession.from_jsonl(self.log)
+        assert self.get(session, url, {'since': 2, 'pair': 'XXBTZEUR', 'interval': 1})['result']['last'] == 3
+        # not recorded with these parameters : the responses for the path
+        assert self.get(session, url, {'since': 5, 'pair': 'XXBTZEUR', 'interval': 1})['result']['last'] == 2
+
+        strict = ReplaySession.from_jsonl(self.log, strict=True)
+        with self.assertRaises(ReplayMiss):
+            self.get(strict, url, {'since': 5, 'pair': 'XXBTZEUR', 'interval': 1})
+        with self.assertRaises(ReplayMiss):
+            self.get(strict, 'https://api.kraken.com/0/public/Ticker')
+
+    def test_latency(self):
+        waited = list()
+
+        async def sleeper(delay):
+            waited.append(delay)
+
+        url = 'https://api.kraken.com/0/public/Time'
+        self.get(ReplaySession.from_jsonl(self.log, sleeper=sleeper), url)
+        self.get(ReplaySession.from_jsonl(self.log, latency=True, sleeper=sleeper), url)
+        self.get(ReplaySession.from_jsonl(self.log, latency=0.1, sleeper=sleeper), url)
+        assert waited == [0.25, 0.1]
+
+    def test_client(self):
+        client = RestClient(replay=ReplaySession.from_jsonl(self.log))
+
+        async def times(n):
+            return [await client.time() for _ in range(n)]
+
+        time, = asyncio.run(times(1))
+        assert isinstance(time, Time) and time.unixtime == 1577873240
+        # the recorded error, again and again, without waiting for the limiters
+        for _ in range(3):
+            with self.assertRaises(AIOKrakenServerError):
+                asyncio.run(times(5))
+        assert client.public_limiter.wait_time(cost=10) == 0
+        # recorded times are not the process clock samples
+        assert client.clock is not server_clock
+
+
+if __name__ == '__main__':
+    unittest.main()
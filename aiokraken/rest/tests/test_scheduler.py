@@ -0,0 +1,53 @@
+import asyncio
+import unittest
+
+from aiokraken.rest.limiter import CounterDecayLimiter
+from aiokraken.rest.scheduler import PriorityScheduler
+from aiokraken.rest.throttle import EndpointClass
+
+
+class TestPriorityScheduler(unittest.TestCase):
+
+    def test_trading_before_history(self):
+        # one call every 20 ms
+        sched = PriorityScheduler(CounterDecayLimiter(maximum=1, decay=50))
+        order = list()
+
+        async def call(name, eclass):
+            await sched.acquire(cost=1, eclass=eclass)
+            order.append(name)
+
+        async def run():
+            sched.limiter.saturate()
+            history = [asyncio.create_task(call(f"history{i}", EndpointClass.history)) for i in range(3)]
+            await asyncio.sleep(0)  # history calls are now waiting in the queue
+            trading = asyncio.create_task(call("trading", EndpointClass.trading))
+            await asyncio.gather(*history, trading)
+
+        asyncio.run(run())
+
+        assert order == ["trading", "history0", "history1", "history2"]
+        assert sched.stats[EndpointClass.history].count == 3
+        assert sched.stats[EndpointClass.history].maximum >= sched.stats[EndpointClass.trading].maximum
+        assert sched.waiting == 0
+
+    def test_cancel_waiting(self):
+        sched = PriorityScheduler(CounterDecayLimiter(maximum=1, decay=50))
+
+        async def run():
+            sched.limiter.saturate()
+            first = asyncio.create_task(sched.acquire(cost=1, eclass=EndpointClass.trading))
+            second = asyncio.create_task(sched.acquire(cost=1, eclass=EndpointClass.history))
+            await asyncio.sleep(0)
+            first.cancel()
+            # the next in line gets the budget
+            await second
+
+        asyncio.run(run())
+        assert sched.waiting == 0
+        assert sched.stats[EndpointClass.trading].count == 0
+        assert sched.stats[EndpointClass.history].count == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
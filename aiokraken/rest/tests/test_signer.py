@@ -0,0 +1,125 @@
+import base64
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+import hypothesis.strategies as st
+from hypothesis import given
+
+from aiokraken.rest.api import Server
+from aiokraken.rest.request import Request, _sign_message
+from aiokraken.rest.signer import Signer
+from aiokraken.utils import NonceSource
+
+"""
+Signer and nonce tests : signatures must match the reference implementation,
+nonces must always increase, whoever asks for them.
+"""
+
+SECRET = base64.b64encode(b'not a real secret, but long enough to look like one').decode()
+
+
+def _nonces(path, count, queue):
+    source = NonceSource(path=path)
+    queue.put([source() for _ in range(count)])
+
+
+class TestSigner(unittest.TestCase):
+
+    @given(st.dictionaries(keys=st.text(min_size=1), values=st.one_of(st.text(), st.integers(), st.booleans(), st.decimals())),
+           st.integers(min_value=0),
+           st.sampled_from(['/0/private/Balance', '/0/private/AddOrder', '/0/private/TradesHistory']))
+    def test_reference_signature(self, data, nonce, urlpath):
+        data['nonce'] = nonce
+        signer = Signer(key='key', secret=SECRET)
+        # twice : the primed HMAC must not be modified by a signature
+        assert signer.signature(urlpath, data) == _sign_message(data, urlpath, SECRET)
+        assert signer.signature(urlpath, data) == _sign_message(data, urlpath, SECRET)
+
+    def test_long_secret(self):
+        # longer than a sha512 block : hashed first, like hmac does
+        secret = base64.b64encode(bytes(range(200))).decode()
+        assert Signer(secret=secret).signature('/0/private/Balance', {'nonce': 42}) == \
+            _sign_message({'nonce': 42}, '/0/private/Balance', secret)
+
+    def test_sign_request(self):
+        signer = Signer(key='key', secret=SECRET, nonce=iter(range(42, 50)).__next__)
+        r = Request(urlpath='/0/private/Balance').sign(signer)
+        assert r.data['nonce'] == 42
+        assert r.headers['API-Key'] == 'key'
+        assert r.headers['API-Sign'] == _sign_message({'nonce': 42}, '/0/private/Balance', SECRET)
+
+        r = Request(urlpath='/0/private/Balance').sign(Signer(nonce=signer.nonce))
+        assert r.data['nonce'] == 43
+        assert 'API-Key' not in r.headers and 'API-Sign' not in r.headers
+
+    def test_server_signer(self):
+        server = Server(key='key', secret=SECRET)
+        r = server.private.request('Balance')
+        assert r.headers['API-Sign'] == _sign_message(r.data, r.urlpath, SECRET)
+        assert Server().signer is None
+
+
+class TestNonceSource(unittest.TestCase):
+
+    def test_same_millisecond(self):
+        nonce = NonceSource(clock=lambda: 1571150298.1234)
+        assert [nonce() for _ in range(3)] == [1571150298123, 1571150298124, 1571150298125]
+
+    def test_clock_going_back(self):
+        clock = iter([1571150298.5, 1571150297.0, 1571150299.0])
+        nonce = NonceSource(clock=clock.__next__)
+        assert [nonce() for _ in range(3)] == [1571150298500, 1571150298501, 1571150299000]
+
+    def test_threads(self):
+        nonce = NonceSource(clock=lambda: 1571150298.0)
+        results = [list() for _ in range(4)]
+        threads = [threading.Thread(target=lambda r: r.extend(nonce() for _ in range(1000)), args=(r,))
+                   for r in results]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for r in results:
+            assert r == sorted(r)
+        merged = sorted(n for r in results for n in r)
+        assert merged == list(range(1571150298000, 1571150298000 + 4000))
+
+    def test_shared_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'nonce')
+            # one source ahead of the clock of the other
+            ahead = NonceSource(path=path, clock=lambda: 1571150299.0)
+            behind = NonceSource(path=path, clock=lambda: 1571150298.0)
+            assert [ahead(), behind(), ahead(), behind()] == [1571150299000, 1571150299001, 1571150299002, 1571150299003]
+            ahead.close()
+            behind.close()
+
+    def test_shared_file_without_fcntl(self):
+        with unittest.mock.patch('aiokraken.utils.nonce.fcntl', None):
+            with self.assertRaises(OSError):
+                NonceSource(path=os.path.join(tempfile.gettempdir(), 'nonce'))
+            # without a path, nonces are still generated
+            assert NonceSource(clock=lambda: 1571150298.0)() == 1571150298000
+
+    def test_processes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'nonce')
+            queue = multiprocessing.Queue()
+            procs = [multiprocessing.Process(target=_nonces, args=(path, 500, queue)) for _ in range(3)]
+            for p in procs:
+                p.start()
+            results = [queue.get(timeout=60) for _ in procs]
+            for p in procs:
+                p.join()
+            for r in results:
+                assert r == sorted(r)
+            merged = [n for r in results for n in r]
+            assert len(set(merged)) == len(merged)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import asyncio
+import dataclasses
+import json
+import unittest
+from datetime import datetime
+
+import hypothesis.strategies as st
+import pandas as pd
+from hypothesis import given, settings
+
+from aiokraken.model.orderframe import flatten_orderdict
+from aiokraken.rest.exceptions import AIOKrakenServerError
+from aiokraken.rest.schemas.kclosedorder import ClosedOrderDictStrategy, ClosedOrdersResponseSchema, KClosedOrderSchema
+from aiokraken.rest.schemas.kledger import KLedgerInfoDictStrategy, KLedgerInfoSchema, KLedgersResponseSchema
+from aiokraken.rest.schemas.ktrade import KTradeSchema, TradeDictStrategy, TradeResponseSchema
+from aiokraken.rest.schemas.payload import PayloadSchema
+from aiokraken.rest.stream import Columns, MemberStream, StreamedResult
+
+"""
+Parity tests : streamed columns must hold what the marshmallow schemas build, however the body is chunked.
+"""
+
+
+class FakeContent:
+    """ like aiohttp.StreamReader, yielding the body in chunks of the given size """
+
+    def __init__(self, body: bytes, size: int):
+        self.body = body
+        self.size = size
+
+    async def iter_chunked(self, n):
+        for i in range(0, len(self.body), self.size):
+            await asyncio.sleep(0)
+            yield self.body[i: i + self.size]
+
+
+# timestamps the schemas can dump
+times = st.datetimes(min_value=datetime(2000, 1, 1), max_value=datetime(2100, 1, 1))
+
+
+def body(result, error=()):
+    # non ascii characters are not escaped : multibyte characters get split between chunks
+    return json.dumps({'error': list(error), 'result': result}, ensure_ascii=False).encode('utf-8')
+
+
+def schema_records(response_schema, data: bytes):
+    records, count = PayloadSchema(result_schema=response_schema).load(json.loads(data))
+    return records, count
+
+
+class TestMemberStream(unittest.TestCase):
+
+    @given(size=st.integers(min_value=1, max_value=16))
+    def test_chunks(self, size):
+        data = '{"error": [], "result": {"count": 3, "ledger": {"L1": {"a": "é€"}, "L2": {"a": 12.5e1}, "L3": [1, {}]}}}'.encode()
+        stream = MemberStream(path=('result', 'ledger'))
+        members = list()
+        for i in range(0, len(data), size):
+            stream.feed(data[i: i + size])
+            members.extend(stream)
+        stream.close()
+        assert members == [('L1', {'a': 'é€'}), ('L2', {'a': 125.0}), ('L3', [1, {}])]
+        assert stream.others == {('error',): [], ('result', 'count'): 3}
+
+    def test_number_at_chunk_end(self):
+        stream = MemberStream(path=('result', 'ledger'))
+        stream.feed(b'{"result": {"count": 12')
+        assert list(stream) == []
+        stream.feed(b'34, "ledger": {}}}')
+        stream.close()
+        assert stream.others == {('result', 'count'): 1234}
+
+    def test_missing_path(self):
+        stream = MemberStream(path=('result', 'ledger'))
+        stream.feed(b'{"error": ["EGeneral:Invalid arguments"]}')
+        stream.close()
+        assert list(stream) == []
+        assert stream.others == {('error',): ["EGeneral:Invalid arguments"]}
+
+    def test_truncated(self):
+        stream = MemberStream(path=('result', 'ledger'))
+        stream.feed(b'{"error": [], "result": {"ledger": {"L1": {"a": 1}')
+        assert list(stream) == [('L1', {'a': 1})]
+        with self.assertRaises(ValueError):
+            stream.close()
+
+
+class TestColumns(unittest.TestCase):
+
+    def test_extend_overwrites(self):
+        first, second = Columns(), Columns()
+        first.append('A', {'x': 1, 'y': 'a'})
+        first.append('B', {'x': 2, 'y': 'b'})
+        second.append('B', {'x': 3, 'y': 'b'})
+        second.append('C', {'x': 4, 'y': 'c', 'z': True})
+        first.extend(second)
+        assert list(first) == ['A', 'B', 'C']
+        frame = first.frame()
+        assert frame['x'].tolist() == [1, 3, 4] and frame['y'].tolist() == ['a', 'b', 'c']
+        assert frame['z'].isna().tolist() == [True, True, False]  # missing in the first records
+
+
+class TestStreamedResult(unittest.TestCase):
+
+    def stream(self, streamed, data, size):
+        return asyncio.run(streamed(FakeContent(data, size)))
+
+    @settings(max_examples=25, deadline=None)
+    @given(ledgers=st.dictionaries(keys=st.text(min_size=1, max_size=20), values=KLedgerInfoDictStrategy(), max_size=5),
+           count=st.integers(min_value=0), size=st.integers(min_value=1, max_value=64))
+    def test_ledgers(self, ledgers, count, size):
+        data = body({'ledger': ledgers, 'count': count})
+        expected, expected_count = schema_records(KLedgersResponseSchema(), data)
+
+        columns, streamed_count = self.stream(StreamedResult('ledger', schema=KLedgerInfoSchema(), id_field='ledger_id'), data, size)
+        assert streamed_count == expected_count
+        assert list(columns) == list(expected)
+        if expected:
+            pd.testing.assert_frame_equal(columns.frame(),
+                                          pd.DataFrame.from_records([dataclasses.asdict(v) for v in expected.values()]))
+
+    @settings(max_examples=25, deadline=None)
+    @given(trades=st.dictionaries(keys=st.text(min_size=1, max_size=20), values=TradeDictStrategy(), max_size=5),
+           count=st.integers(min_value=0), size=st.integers(min_value=1, max_value=64))
+    def test_trades(self, trades, count, size):
+        data = body({'trades': trades, 'count': count})
+        expected, expected_count = schema_records(TradeResponseSchema(), data)
+
+        columns, streamed_count = self.stream(StreamedResult('trades', schema=KTradeSchema(), id_field='trade_id'), data, size)
+        assert streamed_count == expected_count
+        assert list(columns) == list(expected)
+        if expected:
+            pd.testing.assert_frame_equal(columns.frame(),
+                                          pd.DataFrame.from_records([dataclasses.asdict(v) for v in expected.values()]))
+
+    @settings(max_examples=25, deadline=None)
+    @given(orders=st.dictionaries(keys=st.text(min_size=1, max_size=20), max_size=5,
+                                  values=ClosedOrderDictStrategy(starttm=times, opentm=times, expiretm=times, closetm=times)),
+           count=st.integers(min_value=0), size=st.integers(min_value=1, max_value=64))
+    def test_closedorders(self, orders, count, size):
+        data = body({'closed': orders, 'count': count})
+        expected, expected_count = schema_records(ClosedOrdersResponseSchema(), data)
+
+        columns, streamed_count = self.stream(StreamedResult('closed', schema=KClosedOrderSchema()), data, size)
+        assert streamed_count == expected_count
+        assert list(columns) == list(expected)
+        if expected:
+            records = [dataclasses.asdict(v, dict_factory=flatten_orderdict) for v in expected.values()]
+            frame, expected_frame = columns.frame(), pd.DataFrame.from_records(records)
+            # asdict copies leverages, which do not compare equal
+            assert (frame.dtypes == expected_frame.dtypes).all()
+            pd.testing.assert_frame_equal(frame.astype(str), expected_frame.astype(str))
+
+    def test_errors(self):
+        streamed = StreamedResult('ledger', schema=KLedgerInfoSchema(), id_field='ledger_id')
+        with self.assertRaises(AIOKrakenServerError):
+            self.stream(streamed, body({}, error=["EAPI:Invalid nonce"]), 8)
+        with self.assertRaises(ValueError):  # no count
+            self.stream(streamed, body({'ledger': {}}), 8)
+        with self.assertRaises(ValueError):
+            self.stream(streamed, body({'ledger': {}, 'count': 0})[:-3], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
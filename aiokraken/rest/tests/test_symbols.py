@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+from aiokraken.model.asset import Asset
+from aiokraken.rest.assetpairs import AssetPairs
+from aiokraken.rest.assets import Assets
+from aiokraken.rest.schemas.kassetpair import KAssetPairSchema
+from aiokraken.rest.symbols import SymbolRegistry
+
+"""
+Test module for the symbol registry, interning names of assets and pairs to integer ids.
+"""
+
+
+def asset(restname, altname):
+    return Asset(altname=altname, aclass='currency', decimals=10, display_decimals=5, restname=restname)
+
+
+def pair(restname, altname, wsname, base='XXBT', quote='ZEUR'):
+    # as loaded from kraken, with fees
+    return KAssetPairSchema().load({
+        'altname': altname, 'wsname': wsname, 'aclass_base': 'currency', 'base': base,
+        'aclass_quote': 'currency', 'quote': quote, 'lot': 'unit', 'pair_decimals': 1, 'lot_decimals': 8,
+        'lot_multiplier': 1, 'leverage_buy': [2, 3], 'leverage_sell': [2, 3],
+        'fees': [[0, 0.26], [50000, 0.24]], 'fees_maker': [[0, 0.16], [50000, 0.14]],
+        'fee_volume_currency': 'ZUSD', 'margin_call': 80, 'margin_stop': 40,
+    })(restname)
+
+
+class TestSymbolRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = SymbolRegistry(persist=None)
+        self.registry.update(assets=[asset('XXBT', 'XBT'), asset('ZEUR', 'EUR'), asset('XETH', 'ETH')],
+                             pairs=[pair('XXBTZEUR', 'XBTEUR', 'XBT/EUR'),
+                                    pair('XETHZEUR', 'ETHEUR', 'ETH/EUR', base='XETH')])
+
+    def test_names(self):
+        for name in ['XXBTZEUR', 'XBTEUR', 'XBT/EUR']:
+            assert self.registry.pair_id(name) == 0
+            assert self.registry.pair(name).restname == 'XXBTZEUR'
+        assert self.registry.pair(1).wsname == 'ETH/EUR'
+        assert self.registry.pair_assets('ETH/EUR') == (2, 1)
+        with self.assertRaises(KeyError):
+            self.registry.pair('XBT/USD')
+
+    def test_stable_ids(self):
+        updated = pair('XETHZEUR', 'ETHEUR', 'ETH/EUR', base='XETH')
+        self.registry.update(pairs=[pair('XXBTZUSD', 'XBTUSD', 'XBT/USD', quote='ZUSD'), updated])
+        assert self.registry.pair_id('ETH/EUR') == 1  # same id, newer data
+        assert self.registry.pair(1) is updated
+        assert self.registry.pair_id('XBT/USD') == 2
+
+    def test_persist(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            persist = os.path.join(tmpdir, 'aiokraken.json')
+            registry = SymbolRegistry(persist=persist)
+            registry.update(assets=self.registry.assets, pairs=self.registry.pairs)
+            assert os.path.exists(persist)
+
+            # next start : loaded on the first lookup, with the same ids
+            warm = SymbolRegistry(persist=persist)
+            assert not warm.pairs
+            assert warm.pair_id('ETH/EUR') == 1
+            assert warm.pairs == self.registry.pairs
+            assert warm.assets == self.registry.assets
+
+            # retrieved later : known names keep their ids
+            warm.update(pairs=[pair('XXBTZUSD', 'XBTUSD', 'XBT/USD', quote='ZUSD')])
+            assert warm.pair_id('XBT/USD') == 2
+
+    def test_broken_persist(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            persist = os.path.join(tmpdir, 'aiokraken.json')
+            with open(persist, 'w') as f:
+                f.write('{"assetpairs": {"1": {"restname": "XXBTZEUR", "rec')  # interrupted write
+            registry = SymbolRegistry(persist=persist)
+            with self.assertRaises(KeyError):  # we can still retrieve them
+                registry.pair('XXBTZEUR')
+
+
+class TestMappings(unittest.TestCase):
+
+    def test_assetpairs(self):
+        p = pair('XXBTZEUR', 'XBTEUR', 'XBT/EUR')
+        pairs = AssetPairs({'XBT/EUR': p})
+        for name in ['XXBTZEUR', 'XBTEUR', 'XBT/EUR']:
+            assert name in pairs
+            assert pairs[name] is p
+        assert 'XBT/USD' not in pairs
+        assert None not in pairs
+        with self.assertRaises(KeyError):
+            pairs['XBT/USD']
+
+    def test_assets(self):
+        a = asset('XXBT', 'XBT')
+        assets = Assets({'XXBT': a})
+        assert 'XBT' in assets and assets['XBT'] is a
+        assert 'EUR' not in assets
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import math
+import os
+import tempfile
+import unittest
+
+from aiokraken.rest.exceptions import AIOKrakenServerError
+from aiokraken.rest.limiter import CounterDecayLimiter
+from aiokraken.rest.throttle import AdaptiveThrottle, EndpointClass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, secs):
+        self.now += secs
+
+
+class TestAdaptiveThrottle(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.persist = os.path.join(self.tmpdir.name, "kraken.json")
+        self.clock = FakeClock()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def throttle(self, key="somekey"):
+        return AdaptiveThrottle(key=key, persist=self.persist, maximum=2.0, increase=0.5, decrease=0.5,
+                                timer=self.clock, sleeper=self.clock.sleep)
+
+    def test_backoff_on_rate_limit(self):
+        thr = self.throttle()
+        lim = CounterDecayLimiter(maximum=10, decay=1, timer=self.clock, sleeper=self.clock.sleep)
+
+        async def failing_call():
+            async with thr('/0/private/Ledgers', limiter=lim):
+                raise AIOKrakenServerError("EAPI:Rate limit exceeded")
+
+        with self.assertRaises(AIOKrakenServerError):
+            asyncio.run(failing_call())
+
+        assert thr.rates[EndpointClass.history].rate == 1.0
+        # other classes are not impacted
+        assert EndpointClass.trading not in thr.rates
+        # limiter is now saturated
+        assert lim.counter == 10
+
+    def test_other_errors_ignored(self):
+        thr = self.throttle()
+
+        async def failing_call():
+            await thr.wait(EndpointClass.history)
+            async with thr('/0/private/Ledgers'):
+                raise AIOKrakenServerError("EGeneral:Invalid arguments")
+
+        with self.assertRaises(AIOKrakenServerError):
+            asyncio.run(failing_call())
+
+        assert thr.rates[EndpointClass.history].rate == math.inf
+
+    def test_increase_on_success(self):
+        thr = self.throttle()
+        thr.backoff(EndpointClass.public)
+        thr.backoff(EndpointClass.public)
+        assert thr.rates[EndpointClass.public].rate == 0.5
+
+        async def calls():
+            for _ in range(2):
+                await thr.wait(EndpointClass.public)
+                async with thr('/0/public/Time'):
+                    pass
+
+        asyncio.run(calls())
+        assert thr.rates[EndpointClass.public].rate == 1.5
+
+    def test_unthrottled_until_backoff(self):
+        thr = self.throttle()
+
+        async def calls():
+            waits = list()
+            for _ in range(2):  # like a cancel and replace
+                waits.append(await thr.wait(EndpointClass.trading))
+                async with thr('/0/private/AddOrder'):
+                    pass
+            return waits
+
+        assert asyncio.run(calls()) == [0.0, 0.0]
+        assert thr.rates[EndpointClass.trading].rate == math.inf
+
+    def test_spacing(self):
+        thr = self.throttle()
+        thr.backoff(EndpointClass.trading)  # 1 call / s
+
+        async def calls():
+            return [await thr.wait(EndpointClass.trading) for _ in range(3)]
+
+        waits = asyncio.run(calls())
+        assert waits == [1.0, 1.0, 1.0]
+
+    def test_persist(self):
+        thr = self.throttle()
+        thr.backoff(EndpointClass.history)
+        # no file io while throttling, only when saving
+        assert not os.path.exists(self.persist)
+        thr.save()
+
+        # learned rate is restored on restart, for the same key only
+        assert self.throttle().rates[EndpointClass.history].rate == 1.0
+        assert EndpointClass.history not in self.throttle(key="otherkey").rates
+
+        # key is never stored as is
+        with open(self.persist) as f:
+            assert "somekey" not in f.read()
+
+    def test_no_persist_by_default(self):
+        thr = AdaptiveThrottle(key="somekey")
+        thr.backoff(EndpointClass.history)
+        thr.save()
+        assert thr.persist is None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+
+from aiokraken.model.asset import AssetClass
+from aiokraken.model.assetpair import AssetPair
+from aiokraken.rest.assetpairs import AssetPairs
+from aiokraken.rest.symbols import SymbolRegistry
+from aiokraken.rest.warmup import warmup
+
+
+def assetpair(restname, wsname):
+    return AssetPair(altname=restname[1:4] + restname[5:], wsname=wsname, aclass_base=AssetClass.currency,
+                     base=restname[:4], aclass_quote=AssetClass.currency, quote=restname[4:], lot='unit',
+                     pair_decimals=1, lot_decimals=8, lot_multiplier=1, leverage_buy=[], leverage_sell=[],
+                     fees=[], fees_maker=[], fee_volume_currency='ZUSD', margin_call=80, margin_stop=40,
+                     restname=restname)
+
+
+XBTEUR = assetpair('XXBTZEUR', 'XBT/EUR')
+ETHEUR = assetpair('XETHZEUR', 'ETH/EUR')
+
+
+class FakeServer:
+    signer = None
+
+
+class FakeClient:
+    """ answers each request after a delay, recording the calls """
+
+    def __init__(self, delay=0.05, private=False):
+        self.delay = delay
+        self.server = FakeServer()
+        if private:
+            self.server.signer = object()
+        self.symbols = SymbolRegistry(persist=None)
+        self.calls = list()
+
+    async def answer(self, name, result, delay=None):
+        self.calls.append(name)
+        await asyncio.sleep(self.delay if delay is None else delay)
+        return result
+
+    def prewarm(self, connections):
+        return self.answer('prewarm', connections)
+
+    def time(self):
+        return self.answer('time', 'time')
+
+    def retrieve_assets(self):
+        return self.answer('assets', {'error': ['EService:Unavailable']})
+
+    def retrieve_assetpairs(self):
+        return self.answer('assetpairs', AssetPairs({p.restname: p for p in [XBTEUR, ETHEUR]}))
+
+    def websockets_token(self):
+        return self.answer('token', 'token')
+
+    def ohlc(self, pair, interval):
+        return self.answer(f'ohlc {pair.restname}', pair.restname)
+
+    def ticker(self, pairs):
+        return self.answer('ticker', {p.restname: 'ticker' for p in pairs})
+
+
+class TestWarmup(unittest.TestCase):
+
+    def test_concurrent(self):
+        client = FakeClient(delay=0.1)
+        report = asyncio.run(warmup(client, pairs=['XBT/EUR', ETHEUR]))
+        # the market data waits for the pairs only
+        assert report.total < 0.3
+        assert set(report.timings) == {'connections', 'time', 'assets', 'assetpairs', 'ticker',
+                                       'ohlc XBT/EUR', 'ohlc ETH/EUR'}
+        assert report.results['ohlc XBT/EUR'] == 'XXBTZEUR'
+        assert report.results['ticker'] == {'XXBTZEUR': 'ticker', 'XETHZEUR': 'ticker'}
+        assert 'token' not in client.calls  # no private access
+
+    def test_errors(self):
+        client = FakeClient(private=True)
+        report = asyncio.run(warmup(client, pairs=['XBT/USD'], ticker=False))
+        assert report.errors['assets'] == ['EService:Unavailable']
+        assert isinstance(report.errors['pairs'], KeyError)
+        assert report.results['websockets_token'] == 'token'
+        assert 'FAILED' in str(report)
+
+    def test_known_pairs(self):
+        client = FakeClient(delay=0.1)
+        client.symbols.update(pairs=[XBTEUR])
+        report = asyncio.run(warmup(client, pairs=['XBT/EUR'], ticker=False))
+        # not waiting for the pairs : requested together
+        assert report.timings['ohlc XBT/EUR'] < 0.15
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,242 @@
+""" Adaptive throttling, learning the actual rate from kraken error responses.
+
+The counter limiter is our model of kraken rules. But kraken can change its limits (volatile periods, maintenance...).
+This throttle is an AIMD controller on the rate of calls, for each key and class of endpoints :
+- additive increase while calls succeed,
+- multiplicative decrease when kraken tells us we are going too fast, or that the service is unavailable.
+Learned rates can be persisted (on exit of the client), so a restart does not start from scratch.
+"""
+import asyncio
+import contextlib
+import functools
+import hashlib
+import math
+import os
+import time
+import typing
+from dataclasses import dataclass
+from enum import Enum
+
+from tinydb import Query, TinyDB
+
+from aiokraken.config import KRAKEN_STATE_FILE
+from aiokraken.rest.exceptions import AIOKrakenServerError
+from aiokraken.rest.limiter import CounterDecayLimiter
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+
+class EndpointClass(Enum):
+    public = "public"
+    private = "private"  # private account queries (balance, token, etc.)
+    trading = "trading"  # order management
+    history = "history"  # bulk history retrieval
+
+    @classmethod
+    def from_urlpath(cls, urlpath: str):
+        """
+        >>> EndpointClass.from_urlpath('/0/public/Ticker')
+        <EndpointClass.public: 'public'>
+        >>> EndpointClass.from_urlpath('/0/private/Ledgers')
+        <EndpointClass.history: 'history'>
+        >>> EndpointClass.from_urlpath('/0/private/CancelOrder')
+        <EndpointClass.trading: 'trading'>
+        """
+        if '/public/' in urlpath:
+            return cls.public
+        return _private_endpoint_class.get(urlpath.rsplit('/', 1)[-1], cls.private)
+
+
+_private_endpoint_class = {
+    'AddOrder': EndpointClass.trading,
+    'CancelOrder': EndpointClass.trading,
+    'OpenOrders': EndpointClass.trading,
+    'QueryOrders': EndpointClass.trading,
+    'ClosedOrders': EndpointClass.history,
+    'TradesHistory': EndpointClass.history,
+    'QueryTrades': EndpointClass.history,
+    'Ledgers': EndpointClass.history,
+    'QueryLedgers': EndpointClass.history,
+}
+
+
+# kraken errors meaning we should slow down.
+# Ref : https://support.kraken.com/hc/en-us/articles/360001491786-API-error-messages
+THROTTLING_ERRORS = (
+    "EAPI:Rate limit exceeded",
+    "EOrder:Rate limit exceeded",
+    "EGeneral:Temporary lockout",
+    "EService:Unavailable",
+    "EService:Busy",
+)
+
+
+def is_throttling_error(err: Exception) -> bool:
+    """
+    >>> is_throttling_error(AIOKrakenServerError("EAPI:Rate limit exceeded"))
+    True
+    >>> is_throttling_error(AIOKrakenServerError("EGeneral:Invalid arguments"))
+    False
+    """
+    return isinstance(err, AIOKrakenServerError) and any(str(err).startswith(e) for e in THROTTLING_ERRORS)
+
+
+@dataclass
+class AIMDRate:
+    """
+    Rate of calls per second, controlled by Additive Increase / Multiplicative Decrease.
+    An infinite rate does not space calls at all : the first backoff starts from maximum,
+    and recovering up to maximum lifts the spacing again.
+
+    >>> r = AIMDRate(rate=math.inf, minimum=0.1, maximum=1.0, increase=0.1, decrease=0.5)
+    >>> r.backoff()
+    0.5
+    >>> round(r.success(), 2)
+    0.6
+    >>> for _ in range(5):
+    ...     _ = r.success()
+    >>> r.rate
+    inf
+    """
+    rate: float
+    minimum: float
+    maximum: float
+    increase: float
+    decrease: float
+
+    def success(self) -> float:
+        if self.rate + self.increase >= self.maximum:
+            self.rate = math.inf  # recovered : the limiters are enough again
+        else:
+            self.rate += self.increase
+        return self.rate
+
+    def backoff(self) -> float:
+        self.rate = max(self.minimum, min(self.rate, self.maximum) * self.decrease)
+        return self.rate
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.rate
+
+
+class AdaptiveThrottle:
+    """ Spacing calls for one key, with one learned rate for each endpoint class """
+
+    def __init__(self, key: typing.Optional[str] = None,
+                 persist: typing.Optional[str] = None,
+                 minimum: float = 0.05, maximum: float = 5.0,
+                 increase: float = 0.05, decrease: float = 0.5,
+                 timer: typing.Callable[[], float] = time.monotonic,
+                 sleeper: typing.Callable[[float], typing.Awaitable] = asyncio.sleep):
+        # never store the key itself, only something to recognise it
+        self.keyid = hashlib.sha256(key.encode()).hexdigest()[:16] if key else "public"
+        self.persist = persist
+        self.timer = timer
+        self.sleeper = sleeper
+
+        self._params = dict(minimum=minimum, maximum=maximum, increase=increase, decrease=decrease)
+        self.rates: typing.Dict[EndpointClass, AIMDRate] = dict()
+        self._next: typing.Dict[EndpointClass, float] = dict()
+
+        self.load()
+
+    def _rate(self, eclass: EndpointClass) -> AIMDRate:
+        try:
+            return self.rates[eclass]
+        except KeyError:
+            # start without interfering with the limiters, until we learn otherwise
+            self.rates[eclass] = AIMDRate(rate=math.inf, **self._params)
+            return self.rates[eclass]
+
+    def load(self):
+        if self.persist is None or not os.path.exists(self.persist):
+            return
+        try:
+            with TinyDB(self.persist) as db:
+                for doc in db.table('throttle').search(Query().key == self.keyid):
+                    self._rate(EndpointClass(doc['endpoint'])).rate = doc['rate']
+        except Exception as exc:  # persisted state is only a hint, we can start without it
+            LOGGER.warning(f"Could not load throttle state from {self.persist}: {exc}")
+
+    def save(self):
+        if self.persist is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.persist), exist_ok=True)
+            with TinyDB(self.persist) as db:
+                table = db.table('throttle')
+                for eclass, rate in self.rates.items():
+                    if math.isinf(rate.rate):
+                        table.remove((Query().key == self.keyid) & (Query().endpoint == eclass.value))
+                        continue
+                    table.upsert({'key': self.keyid, 'endpoint': eclass.value, 'rate': rate.rate},
+                                 (Query().key == self.keyid) & (Query().endpoint == eclass.value))
+        except Exception as exc:
+            LOGGER.warning(f"Could not save throttle state to {self.persist}: {exc}")
+
+    def wait_time(self, eclass: EndpointClass) -> float:
+        return max(0.0, self._next.get(eclass, 0.0) - self.timer())
+
+    async def wait(self, eclass: EndpointClass) -> float:
+        """ wait until a call on this class of endpoint is allowed. returns the time waited. """
+        now = self.timer()
+        start = max(now, self._next.get(eclass, now))
+        # reserving our slot before sleeping, to keep concurrent callers in order
+        self._next[eclass] = start + self._rate(eclass).interval
+        if start > now:
+            await self.sleeper(start - now)
+        return start - now
+
+    def success(self, eclass: EndpointClass):
+        self._rate(eclass).success()
+
+    def backoff(self, eclass: EndpointClass):
+        rate = self._rate(eclass).backoff()
+        LOGGER.warning(f"Throttling {eclass.value} calls down to {rate:.3f}/s")
+        # pushing back the next calls
+        self._next[eclass] = self.timer() + self._rate(eclass).interval
+
+    @contextlib.asynccontextmanager
+    async def __call__(self, urlpath: str, limiter: typing.Optional[CounterDecayLimiter] = None):
+        """ wrapping a request to learn from its outcome.
+        Waiting is done before, in throttled(), since private requests must be signed after waiting."""
+        eclass = EndpointClass.from_urlpath(urlpath)
+        try:
+            yield eclass
+        except AIOKrakenServerError as err:
+            if is_throttling_error(err):
+                self.backoff(eclass)
+                if limiter is not None:
+                    # our counter model was wrong, kraken is the reference
+                    limiter.saturate()
+            raise
+        else:
+            self.success(eclass)
+
+    def __repr__(self):
+        return f"<AdaptiveThrottle {self.keyid} { {e.value: round(r.rate, 3) for e, r in self.rates.items()} }>"
+
+
+def throttled(eclass: EndpointClass):
+    """ Decorator for client coroutine methods, waiting on the throttle attribute of the instance before calling. """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            await self.throttle.wait(eclass)
+            return await fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Throttles are shared by all clients using the same key, just like limiters.
+_key_throttles: typing.Dict[typing.Optional[str], AdaptiveThrottle] = dict()
+
+
+def adaptive_throttle(key: typing.Optional[str], persist: typing.Optional[str] = KRAKEN_STATE_FILE) -> AdaptiveThrottle:
+    try:
+        return _key_throttles[key]
+    except KeyError:
+        _key_throttles[key] = AdaptiveThrottle(key=key, persist=persist)
+        return _key_throttles[key]
@@ -0,0 +1,109 @@
+""" Concurrent bootstrap of a client : everything needed before trading, requested at once.
+
+Done one after the other, assets, asset pairs, the server time, the websockets token,
+and the initial market data of each pair add up to a long cold start.
+Here they are all launched together : the rate limiters and the throttle still pace them within the budget,
+and only the market data waits for the pairs (not even that, when their names are in the persisted symbols).
+"""
+import asyncio
+import time
+import typing
+from dataclasses import dataclass, field
+
+from aiokraken.model.assetpair import AssetPair
+from aiokraken.model.timeframe import KTimeFrameModel
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+
+@dataclass
+class WarmupReport:
+    """ How long each step of the warmup took, in seconds, from the start of the warmup.
+
+    >>> report = WarmupReport(timings={'assets': 0.35, 'time': 0.12}, total=0.35)
+    >>> print(report)
+    time                   0.120s
+    assets                 0.350s
+    total                  0.350s
+    """
+    timings: typing.Dict[str, float] = field(default_factory=dict)
+    results: typing.Dict[str, typing.Any] = field(default_factory=dict)
+    errors: typing.Dict[str, typing.Any] = field(default_factory=dict)
+    total: float = 0.0
+
+    def __str__(self):
+        lines = [f"{name:<20}{elapsed:>8.3f}s" + (f"  FAILED: {self.errors[name]}" if name in self.errors else "")
+                 for name, elapsed in sorted(self.timings.items(), key=lambda t: t[1])]
+        return "\n".join(lines + [f"{'total':<20}{self.total:>8.3f}s"])
+
+
+async def warmup(client, pairs: typing.Iterable[typing.Union[AssetPair, str]] = (),
+                 interval: typing.Optional[KTimeFrameModel] = KTimeFrameModel.one_minute,
+                 ticker: bool = True, connections: int = 2) -> WarmupReport:
+    """ Bootstraps the client, returning a report of the time each step took, and their results.
+    Failed steps are logged and reported, they do not stop the others.
+
+    :param client: the RestClient to warm up
+    :param pairs: the pairs to get initial market data for
+    :param interval: of the initial OHLC of each pair. None to skip them.
+    :param ticker: whether to get the initial ticker of the pairs
+    :param connections: number of connections to open in advance
+    """
+    pairs = list(pairs)
+    report = WarmupReport()
+    start = time.perf_counter()
+
+    async def timed(name: str, awaitable: typing.Awaitable):
+        try:
+            result = await awaitable
+        except Exception as exc:
+            result = {'error': exc}
+        report.timings[name] = time.perf_counter() - start
+        if isinstance(result, dict) and 'error' in result:  # the client returns errors
+            LOGGER.warning(f"Warmup {name} failed: {result['error']}")
+            report.errors[name] = result['error']
+        else:
+            report.results[name] = result
+        return result
+
+    assetpairs = asyncio.ensure_future(timed('assetpairs', client.retrieve_assetpairs()))
+
+    async def resolve(pair):
+        if isinstance(pair, AssetPair):
+            return pair
+        try:  # known from a previous run
+            return client.symbols.pair(pair)
+        except KeyError:
+            return (await asyncio.shield(assetpairs))[pair]
+
+    async def market(pair):
+        pair = await resolve(pair)
+        return await timed(f"ohlc {pair.wsname or pair.restname}", client.ohlc(pair=pair, interval=interval))
+
+    async def tickers():
+        resolved = await asyncio.gather(*(resolve(p) for p in pairs))
+        return await timed('ticker', client.ticker(pairs=resolved))
+
+    steps = [
+        timed('connections', client.prewarm(connections=connections)),
+        timed('time', client.time()),
+        timed('assets', client.retrieve_assets()),
+        assetpairs,
+    ]
+    if client.server.signer is not None:  # private access
+        steps.append(timed('websockets_token', client.websockets_token()))
+    if pairs and ticker:
+        steps.append(tickers())
+    if interval is not None:
+        steps.extend(market(p) for p in pairs)
+
+    # the failed pair resolutions only : the other failures are in the report already
+    for outcome in await asyncio.gather(*steps, return_exceptions=True):
+        if isinstance(outcome, Exception):
+            LOGGER.warning(f"Warmup failed: {outcome!r}")
+            report.errors.setdefault('pairs', outcome)
+
+    report.total = time.perf_counter() - start
+    LOGGER.info(f"Warmup done:\n{report}")
+    return report
@@ -0,0 +1,185 @@
+""" Persistent local store for the user's private history (trades, ledgers, closed orders).
+
+Past records do not change, so once retrieved, they only need to be stored.
+Each store remembers the time range it has fully retrieved from kraken (its coverage).
+When more is requested, only the missing time windows are retrieved, typically from the high-water mark until now.
+"""
+import bisect
+import hashlib
+import os
+import time
+import typing
+from datetime import datetime, timezone
+
+from tinydb import Query, TinyDB
+from tinydb.middlewares import CachingMiddleware
+from tinydb.storages import JSONStorage
+
+from aiokraken.config import KRAKEN_ACCOUNT_PERSIST_FILE
+from aiokraken.rest.schemas.kclosedorder import KClosedOrderModel, KClosedOrderSchema
+from aiokraken.rest.schemas.kledger import KLedgerInfo, KLedgerInfoSchema
+from aiokraken.rest.schemas.ktrade import KTradeModel, KTradeSchema
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+Record = typing.Union[KTradeModel, KLedgerInfo, KClosedOrderModel]
+
+
+def _closetime(order: KClosedOrderModel) -> float:
+    return (order.closetm or order.opentm).timestamp()
+
+
+# schema and time accessor for each kind of record
+KINDS = {
+    'trades': (KTradeSchema, lambda trade: float(trade.time)),
+    'ledgers': (KLedgerInfoSchema, lambda ledger: float(ledger.time)),
+    'closedorders': (KClosedOrderSchema, _closetime),
+}
+
+# seconds already covered that we retrieve again, in case records were not yet visible at the time of the request
+OVERLAP = 60
+
+
+def timestamp(dt: typing.Optional[datetime], default: float) -> float:
+    return default if dt is None else dt.timestamp()
+
+
+class HistoryStore:
+    """
+    Records of one kind for one account, keyed by id, indexed by time.
+
+    >>> store = HistoryStore('ledgers', persist=None)
+    >>> store.missing(1000, 2000)
+    [(1000, 2000)]
+    >>> store.update({'L1': KLedgerInfo(refid='R1', time=1500, type='deposit', aclass='currency', asset='ZEUR',
+    ...                                 amount=1, fee=0, balance=1, ledger_id='L1')}, 1000, 2000)
+    1
+    >>> store.missing(500, 3000)
+    [(500, 1000), (1940, 3000)]
+    >>> list(store.between(1000, 2000))
+    ['L1']
+    """
+
+    def __init__(self, kind: str, key: typing.Optional[str] = None,
+                 persist: typing.Optional[str] = KRAKEN_ACCOUNT_PERSIST_FILE):
+        self.kind = kind
+        self.schema = KINDS[kind][0]()
+        self.timeof = KINDS[kind][1]
+        # never store the key itself, only something to recognise it
+        self.keyid = hashlib.sha256(key.encode()).hexdigest()[:16] if key else "default"
+        self.persist = persist
+
+        self.records: typing.Dict[str, Record] = dict()
+        self._index: typing.List[typing.Tuple[float, str]] = list()  # sorted by time
+        # time range (timestamps) fully retrieved from kraken
+        self.coverage: typing.Optional[typing.Tuple[float, float]] = None
+
+        self.load()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, item: str):
+        return item in self.records
+
+    @property
+    def high_water_mark(self) -> typing.Optional[datetime]:
+        """ up to when we have everything """
+        if self.coverage is None:
+            return None
+        return datetime.fromtimestamp(self.coverage[1], tz=timezone.utc)
+
+    def _add(self, records: typing.Mapping[str, Record]) -> typing.Dict[str, Record]:
+        new = {i: r for i, r in records.items() if i not in self.records}
+        self.records.update(new)
+        for i, r in new.items():
+            bisect.insort(self._index, (self.timeof(r), i))
+        return new
+
+    def between(self, start: float, end: float) -> typing.Dict[str, Record]:
+        """ stored records between two timestamps (included) """
+        lo = bisect.bisect_left(self._index, (start, ""))
+        hi = bisect.bisect_right(self._index, (end, chr(0x10ffff)))
+        return {i: self.records[i] for _, i in self._index[lo:hi]}
+
+    def missing(self, start: float, end: float) -> typing.List[typing.Tuple[float, float]]:
+        """ time windows to retrieve, so that coverage includes [start, end] and remains one range """
+        if self.coverage is None:
+            return [(start, end)]
+        begin, last = self.coverage
+        windows = list()
+        if start < begin:
+            windows.append((start, begin))
+        if end > last:
+            windows.append((max(begin, last - OVERLAP), end))
+        return windows
+
+    def _extend(self, records: typing.Mapping[str, Record], start: float, end: float) -> typing.Dict[str, Record]:
+        new = self._add(records)
+        if self.coverage is None:
+            self.coverage = (start, end)
+        else:
+            self.coverage = (min(start, self.coverage[0]), max(end, self.coverage[1]))
+        return new
+
+    def update(self, records: typing.Mapping[str, Record], start: float, end: float) -> int:
+        """ add records retrieved for the [start, end] window. returns the number of new records """
+        new = self._extend(records, start, end)
+        self.save(new)
+        return len(new)
+
+    async def sync(self, fetch: typing.Callable[[datetime, datetime], typing.Awaitable[typing.Mapping[str, Record]]],
+                   start: typing.Optional[datetime] = None, end: typing.Optional[datetime] = None) -> typing.Dict[str, Record]:
+        """ retrieves only what is missing with fetch(start, end), then returns all records between start and end """
+        start, end = timestamp(start, 0), timestamp(end, time.time())
+        windows = self.missing(start, end)
+        new = dict()
+        for wstart, wend in windows:
+            records = await fetch(datetime.fromtimestamp(wstart, tz=timezone.utc),
+                                  datetime.fromtimestamp(wend, tz=timezone.utc))
+            added = self._extend(records, wstart, wend)
+            new.update(added)
+            LOGGER.info(f"Retrieved {len(records)} {self.kind}, {len(added)} new, between {wstart} and {wend}")
+        if windows:  # the file is written once per sync, not once per window
+            self.save(new)
+        return self.between(start, end)
+
+    def _dump(self, record: Record) -> dict:
+        # missing optional fields, rather than None, so that schemas can load them back
+        return {k: v for k, v in self.schema.dump(record).items() if v is not None}
+
+    def _db(self) -> TinyDB:
+        # the file is read once when opening, and written once when closing, whatever we do in between
+        return TinyDB(self.persist, storage=CachingMiddleware(JSONStorage))
+
+    def load(self):
+        if self.persist is None or not os.path.exists(self.persist):
+            return
+        try:
+            with self._db() as db:
+                docs = db.table(self.kind).search(Query().key == self.keyid)
+                self._add({d['id']: self.schema.load(d['record']) for d in docs})
+                sync = db.table('sync').get((Query().key == self.keyid) & (Query().kind == self.kind))
+                if sync is not None:
+                    self.coverage = (sync['begin'], sync['end'])
+        except Exception as exc:  # we can always retrieve everything again
+            LOGGER.warning(f"Could not load {self.kind} from {self.persist}: {exc}")
+            self.records, self._index, self.coverage = dict(), list(), None
+
+    def save(self, new: typing.Mapping[str, Record]):
+        if self.persist is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.persist), exist_ok=True)
+            with self._db() as db:
+                # past records dont change, we only need to insert new ones
+                db.table(self.kind).insert_multiple(
+                    {'key': self.keyid, 'id': i, 'time': self.timeof(r), 'record': self._dump(r)}
+                    for i, r in new.items()
+                )
+                db.table('sync').upsert({'key': self.keyid, 'kind': self.kind,
+                                         'begin': self.coverage[0], 'end': self.coverage[1]},
+                                        (Query().key == self.keyid) & (Query().kind == self.kind))
+        except Exception as exc:
+            LOGGER.warning(f"Could not save {self.kind} to {self.persist}: {exc}")
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import unittest.mock
+from datetime import datetime, timezone
+
+from hypothesis import given, settings, HealthCheck, strategies as st
+from tinydb.storages import JSONStorage
+
+from aiokraken.rest.schemas.kclosedorder import ClosedOrderDictStrategy, KClosedOrderSchema
+from aiokraken.rest.schemas.kledger import KLedgerInfo
+from aiokraken.rest.schemas.ktrade import KTradeStrategy
+from aiokraken.store import HistoryStore
+
+
+def ledger(i, time):
+    return KLedgerInfo(refid=f"R{i}", time=time, type='trade', aclass='currency', asset='ZEUR',
+                       amount=1, fee=0, balance=i, ledger_id=f"L{i}")
+
+
+class FakeLedgers:
+    """ server side history, recording requested windows """
+
+    def __init__(self, times):
+        self.ledgers = {f"L{i}": ledger(i, t) for i, t in enumerate(times)}
+        self.requested = list()
+
+    async def __call__(self, start: datetime, end: datetime):
+        self.requested.append((start.timestamp(), end.timestamp()))
+        return {i: l for i, l in self.ledgers.items() if start.timestamp() <= l.time <= end.timestamp()}
+
+
+class TestHistoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.persist = os.path.join(self.tmpdir.name, 'account.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_incremental_sync(self):
+        server = FakeLedgers(times=[1000, 2000, 3000])
+        store = HistoryStore('ledgers', key="somekey", persist=self.persist)
+
+        def at(ts):
+            return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+        records = asyncio.run(store.sync(server, start=at(0), end=at(2500)))
+        assert list(records) == ["L0", "L1"]
+        assert store.high_water_mark == at(2500)
+
+        server.ledgers["L3"] = ledger(3, 4000)
+        # restarting
+        store = HistoryStore('ledgers', key="somekey", persist=self.persist)
+        assert len(store) == 2
+        records = asyncio.run(store.sync(server, start=at(0), end=at(5000)))
+        assert list(records) == ["L0", "L1", "L2", "L3"]
+        # only the new window was requested, not the whole history again
+        assert server.requested[-1][0] >= 2500 - 60
+
+        # another account does not share history
+        assert len(HistoryStore('ledgers', key="otherkey", persist=self.persist)) == 0
+
+    def test_sync_writes_once(self):
+        server = FakeLedgers(times=[1000, 2000, 3000])
+        store = HistoryStore('ledgers', persist=self.persist)
+        store.update({"L1": server.ledgers["L1"]}, 1500, 2500)
+
+        def at(ts):
+            return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+        with unittest.mock.patch.object(JSONStorage, 'write', autospec=True, side_effect=JSONStorage.write) as write:
+            records = asyncio.run(store.sync(server, start=at(0), end=at(5000)))
+        # two windows retrieved, before and after the coverage, one write
+        assert len(server.requested) == 2
+        assert list(records) == ["L0", "L1", "L2"]
+        assert write.call_count == 1
+        assert HistoryStore('ledgers', persist=self.persist).records == store.records
+
+    def test_missing_windows(self):
+        store = HistoryStore('ledgers', persist=None)
+        store.update({}, 1000, 2000)
+        assert store.missing(1200, 1800) == []
+        assert store.missing(100, 1800) == [(100, 1000)]
+
+    @settings(suppress_health_check=[HealthCheck.function_scoped_fixture, HealthCheck.too_slow], max_examples=20)
+    @given(trades=st.lists(KTradeStrategy(), max_size=5))
+    def test_trades_persisted(self, trades):
+        trades = {f"T{i}": t for i, t in enumerate(trades)}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            persist = os.path.join(tmpdir, "trades.json")
+            HistoryStore('trades', persist=persist).update(trades, 0, 1)
+            assert HistoryStore('trades', persist=persist).records == trades
+
+    def test_closedorders_persisted(self):
+        persist = os.path.join(self.tmpdir.name, "orders.json")
+        # as received from kraken
+        order = KClosedOrderSchema().loads(
+            '{"refid": null, "userref": 0, "status": "closed", "opentm": 1571150298.798, "starttm": 0, '
+            '"expiretm": 1571150313, "closetm": 1571150313.2, "descr": {"pair": "XBTEUR", "type": "sell", '
+            '"ordertype": "limit", "price": "11330.1", "price2": "0", "leverage": "none", '
+            '"order": "sell 0.01000000 XBTEUR @ limit 11330.1", "close": ""}, "vol": "0.01000000", '
+            '"vol_exec": "0.01000000", "cost": "113.30100", "fee": "0.18128", "price": "11330.1", '
+            '"stopprice": "0.00000", "limitprice": "0.00000", "misc": "", "oflags": "fciq", "reason": null}')
+        HistoryStore('closedorders', persist=persist).update({"O1": order}, 0, 1)
+        stored = HistoryStore('closedorders', persist=persist)
+        assert stored.records == {"O1": order}
+        assert list(stored.between(1571150313, 1571150314)) == ["O1"]
+
+if __name__ == '__main__':
+    unittest.main()
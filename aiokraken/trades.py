@@ -15,6 +15,28 @@ from aiokraken.assetpairs import AssetPairs
 from aiokraken.model.tradeframe import TradeFrame, tradeframe
 
 from aiokraken.rest import RestClient, Server
+from aiokraken.rest.paginate import paginate
+from aiokraken.rest.stream import Columns
+from aiokraken.store import HistoryStore
+
+
+async def _retrieve(rest: RestClient, start: datetime = None, end: datetime = None, store: HistoryStore = None):
+
+    async def fetch(start, end):
+        # retrieving *everything*, page after page (concurrent pages need a nonce window on the key)
+        trades = dict()
+        async for page in paginate(lambda offset: rest.trades(start=start, end=end, offset=offset)):
+            trades.update(page)
+        return trades
+
+    if store is None:
+        # streaming pages straight into columns, for the frame
+        tradecolumns = Columns()
+        async for page in paginate(lambda offset: rest.trades(start=start, end=end, offset=offset, columns=True)):
+            tradecolumns.extend(page)
+        return tradecolumns
+    # past data doesnt change : only retrieving what is not stored locally yet
+    return await store.sync(fetch, start=start, end=end)
 
 
 class Trades:
@@ -23,21 +45,16 @@ class Trades:
     This is also where all analysis function about past trading performance should be available...
     """
     @classmethod
-    async def retrieve(cls, rest: RestClient = None, start: datetime =None, end: datetime = None, loop=None):
+    async def retrieve(cls, rest: RestClient = None, start: datetime =None, end: datetime = None, loop=None,
+                       store: typing.Optional[HistoryStore] = None):
+        """ Retrieving all trades for a time period. With a store, only trades not already stored are requested. """
         rest = RestClient() if rest is None else rest
 
-        trades, count = await rest.trades(start=start, end=end)
-
-        # loop until we get *everything*
-        # Note : if this is too much, leverage local storage (TODO ! - in relation with time... assume past data doesnt change)
-        while len(trades) < count:
-            # Note : here we recurse only one time. we need to recurse to respect ratelimit...
-            more_trades, count = await rest.trades(start=start, end=end, offset=len(trades))
-            trades.update(more_trades)
+        trades = await _retrieve(rest, start=start, end=end, store=store)
 
         model = tradeframe(tradehistory_as_dict=trades).value
 
-        return cls(trades=model, rest=rest, loop=loop)
+        return cls(trades=model, rest=rest, loop=loop, store=store)
 
     model: TradeFrame
 
@@ -49,9 +66,10 @@ class Trades:
     def end(self):
         return self.model.end
 
-    def __init__(self, trades: TradeFrame, rest: RestClient, loop = None):
+    def __init__(self, trades: TradeFrame, rest: RestClient, loop = None, store: typing.Optional[HistoryStore] = None):
 
         self.rest = rest if rest is not None else RestClient()
+        self.store = store
 
         self.loop = loop if loop is not None else asyncio.get_event_loop()   # TODO : use restclient loop ??
 
@@ -62,14 +80,7 @@ class Trades:
 
         if self.rest is not None and (self.model is None or start < self.model.begin or end > self.model.end):
             # we retrieve all matching ledgerinfos... lazy on times !
-            trades, count= await rest.trades(start=start, end=end)
-
-            # loop until we get *everything*
-            # Note : if this is too much, leverage local storage (TODO ! - in relation with time... assume past data doesnt change)
-            while len(trades) < count:
-                # Note : here we recurse only one time. we need to recurse to respect ratelimit...
-                more_trades, count = await rest.trades(start=start, end=end, offset=len(trades))
-                trades.update(more_trades)
+            trades = await _retrieve(self.rest, start=start, end=end, store=self.store)
 
             model = tradeframe(tradehistory_as_dict=trades)
             if model:
@@ -99,7 +110,7 @@ class Trades:
                     ))
                     self.loop.run_until_complete(update_task)  # run the task in background and sync block.
 
-                return Trades(trades=self.model[item.start:item.stop], rest=self.rest, loop=self.loop)
+                return Trades(trades=self.model[item.start:item.stop], rest=self.rest, loop=self.loop, store=self.store)
 
         else:  # anything else : rely on the model
             # TODO : also access per asset or asset list - container-style
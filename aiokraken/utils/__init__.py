@@ -1,15 +1,20 @@
 """Utility functions"""
-import time
 import logging
 
-__all__ = ['get_kraken_logger', 'get_nonce']
+from .clock import Clock, server_clock
+from .nonce import NonceSource
+
+__all__ = ['get_kraken_logger', 'get_nonce', 'NonceSource', 'Clock', 'server_clock']
+
+# shared by all requests of this process, following the server clock
+_nonce = NonceSource(clock=server_clock.time)
 
 
 def get_nonce():
     """ Nonce counter.
     :returns: an always-increasing unsigned integer (up to 64 bits wide)
     """
-    return int(1000 * time.time())
+    return _nonce()
 
 
 def get_kraken_logger(name):
@@ -0,0 +1,132 @@
+""" Local estimate of the kraken server clock.
+
+Each round trip to the Time endpoint bounds the offset (server time - local time):
+the server read its clock somewhere between our send and our receipt, and truncated it to the second.
+Each timestamped websocket message (trades, ohlc updates) bounds it from below : it was sent before we received it.
+
+Like NTP, we trust the samples with the smallest round trip most. But since kraken time has a one second resolution,
+a single sample is not precise : we intersect the bounds of recent samples, widened by the possible drift of
+the local clock since they were taken. The intersection narrows down as samples with different phases accumulate.
+"""
+import asyncio
+import collections
+import time
+import typing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+# maximum drift of the local clock we account for (seconds per second)
+MAX_DRIFT = 1e-4
+
+
+@dataclass(frozen=True)
+class ClockSample:
+    local: float  # local time at which the sample was taken
+    low: float  # lower bound of the offset
+    high: float  # upper bound of the offset
+    rtt: float  # round trip time (infinite for one-way samples)
+
+    def bounds(self, local: float, drift: float = MAX_DRIFT) -> typing.Tuple[float, float]:
+        """ bounds of the offset at another local time """
+        spread = abs(local - self.local) * drift
+        return self.low - spread, self.high + spread
+
+
+class Clock:
+    """ The server clock, as seen from here.
+
+    >>> clock = Clock(local=lambda: 1000.5)
+    >>> clock.time()  # no sample yet : our own time
+    1000.5
+    >>> clock.observe(sent=1000.0, received=1000.2, server=1010)  # server clock was 1010.x in between
+    >>> round(clock.offset, 2), round(clock.error, 2)
+    (10.4, 0.6)
+    >>> clock.observe(sent=1000.3, received=1000.4, server=1011)  # server clock was 1011.x in between
+    >>> round(clock.offset, 2), round(clock.error, 2)
+    (10.8, 0.2)
+    >>> round(clock.time(), 2)
+    1011.3
+    """
+
+    def __init__(self, window: int = 32, local: typing.Callable[[], float] = time.time,
+                 resolution: float = 1.0, drift: float = MAX_DRIFT):
+        """
+        :param window: the number of samples kept, for each kind (round trip and one-way)
+        :param local: the local clock
+        :param resolution: the resolution of the server time from the Time endpoint
+        :param drift: the maximum drift of the local clock, per second
+        """
+        self.local = local
+        self.resolution = resolution
+        self.drift = drift
+        self.roundtrips: typing.Deque[ClockSample] = collections.deque(maxlen=window)
+        self.oneways: typing.Deque[ClockSample] = collections.deque(maxlen=window)
+        self.offset = 0.0
+        self.error = float('inf')
+
+    def observe(self, sent: float, received: float, server: float):
+        """ a round trip : request sent, and response received, at these local times, with this server time. """
+        self.roundtrips.append(ClockSample(local=(sent + received) / 2, low=server - received,
+                                           high=server + self.resolution - sent, rtt=received - sent))
+        self._estimate()
+
+    def observe_floor(self, server: float, received: typing.Optional[float] = None):
+        """ a timestamped message from the server, received now (or at this local time). """
+        received = self.local() if received is None else received
+        sample = ClockSample(local=received, low=server - received, high=float('inf'), rtt=float('inf'))
+        # one-way samples only matter if they raise the lower bound
+        if sample.low > self.offset - self.error:
+            self.oneways.append(sample)
+            self._estimate()
+
+    def _estimate(self):
+        if not self.roundtrips:  # nothing else than a lower bound, better than nothing
+            self.offset = max(s.low for s in self.oneways)
+            self.error = float('inf')
+            return
+        now = self.roundtrips[-1].local
+        low, high = float('-inf'), float('inf')
+        # the most precise (smallest round trip) first
+        for s in sorted(self.roundtrips, key=lambda s: s.rtt):
+            l, h = s.bounds(now, self.drift)
+            if l > high or h < low:  # inconsistent with better samples : the local clock was stepped ?
+                # starting again from the most recent sample, the only one we know was taken after the step.
+                latest = self.roundtrips[-1]
+                self.roundtrips.clear()
+                self.oneways.clear()
+                self.roundtrips.append(latest)
+                return self._estimate()
+            low, high = max(low, l), min(high, h)
+        for s in self.oneways:
+            low = min(max(low, s.bounds(now, self.drift)[0]), high)
+        self.offset = (low + high) / 2
+        self.error = (high - low) / 2
+
+    def time(self) -> float:
+        """ current server time, in seconds since epoch """
+        return self.local() + self.offset
+
+    def now(self) -> datetime:
+        """ current server time, as an aware datetime """
+        return datetime.fromtimestamp(self.time(), tz=timezone.utc)
+
+    async def synchronize(self, timer: typing.Callable[[], typing.Awaitable], period: float = 60.0,
+                          burst: int = 4, spacing: float = 1.3):
+        """ Background synchronization : a burst of samples first, then one every period.
+        The samples in a burst are spread, to read the server clock at different phases of its second.
+        The timer must feed this clock, like RestClient.time does.
+
+        RestClient(clock_sync=period) runs it while entered (async with).
+        Otherwise, use as a task : asyncio.create_task(clock.synchronize(rest.time))
+        """
+        while True:
+            for i in range(burst):
+                if i:
+                    await asyncio.sleep(spacing)
+                await timer()
+            burst = 1
+            await asyncio.sleep(period)
+
+
+# The process-wide server clock
+server_clock = Clock()
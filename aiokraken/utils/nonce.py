@@ -0,0 +1,70 @@
+""" Nonces for private requests.
+
+Kraken rejects any nonce that is not strictly greater than the previous one used with the same key.
+A timestamp alone collides when two requests are signed in the same millisecond, and goes back when the clock is adjusted.
+"""
+import os
+import threading
+import time
+import typing
+
+try:
+    import fcntl
+except ImportError:  # not on POSIX
+    fcntl = None
+
+
+class NonceSource:
+    """ Strictly increasing nonces, in milliseconds since epoch (like kraken examples).
+    When called more than once in a millisecond, or if the clock goes back, we count from the last nonce instead.
+
+    Nonces are generated synchronously : safe for concurrent tasks, and threads are serialized by a lock.
+    With a path, the last nonce is also shared, through that (locked) file, with other processes using the same key.
+    This needs fcntl : on other platforms (Windows), a path raises OSError.
+
+    >>> nonce = NonceSource(clock=lambda: 1571150298.123)
+    >>> nonce(), nonce(), nonce()
+    (1571150298123, 1571150298124, 1571150298125)
+    """
+
+    def __init__(self, path: typing.Optional[str] = None, clock: typing.Callable[[], float] = time.time):
+        if path is not None and fcntl is None:
+            # silently using a process lock would let other processes reuse our nonces
+            raise OSError("Sharing nonces between processes requires file locks (fcntl), not available here.")
+        self.path = path
+        self.clock = clock
+        self.last = 0
+        self._lock = threading.Lock()
+        self._fd = None
+        self._pid = None
+
+    def __call__(self) -> int:
+        with self._lock:
+            nonce = max(int(1000 * self.clock()), self.last + 1)
+            if self.path is not None:
+                nonce = self._shared(nonce)
+            self.last = nonce
+            return nonce
+
+    def _shared(self, nonce: int) -> int:
+        # a forked process would share the open file, and its lock : we need our own.
+        if self._fd is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._pid = os.getpid()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            stored = os.pread(self._fd, 32, 0)
+            if stored:
+                nonce = max(nonce, int(stored) + 1)
+            raw = str(nonce).encode()
+            os.pwrite(self._fd, raw, 0)
+            os.ftruncate(self._fd, len(raw))
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return nonce
+
+    def close(self):
+        if self._fd is not None and self._pid == os.getpid():
+            os.close(self._fd)
+        self._fd = None
@@ -0,0 +1,66 @@
+"""
+Compact records for high frequency data (one per websocket message, or per trade in a history).
+
+A dataclass instance carries its own __dict__, several times bigger than its values.
+slotted() rebuilds a dataclass with __slots__ instead, like dataclass(slots=True) does in python 3.10.
+The dataclass interface (fields, asdict, replace, eq, repr, frozen) stays the same.
+"""
+import dataclasses
+import typing
+
+
+def _getstate(self):
+    return [getattr(self, f.name) for f in dataclasses.fields(self)]
+
+
+def _setstate(self, state):
+    # frozen : we cannot use setattr
+    for f, value in zip(dataclasses.fields(self), state):
+        object.__setattr__(self, f.name, value)
+
+
+def slotted(cls: type) -> type:
+    """ the same dataclass, storing its fields in __slots__
+
+    >>> @slotted
+    ... @dataclasses.dataclass(frozen=True)
+    ... class Point:
+    ...     x: int
+    ...     y: int = 0
+    >>> p = Point(1)
+    >>> p
+    Point(x=1, y=0)
+    >>> hasattr(p, '__dict__')
+    False
+    >>> dataclasses.asdict(p)
+    {'x': 1, 'y': 0}
+    """
+    names = tuple(f.name for f in dataclasses.fields(cls))
+    cls_dict = dict(cls.__dict__)
+    for name in names:
+        # defaults are already in __init__, and would conflict with the slot descriptors
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    cls_dict['__slots__'] = names
+    if cls.__dataclass_params__.frozen:
+        # default pickling would call the frozen setattr
+        cls_dict['__getstate__'] = _getstate
+        cls_dict['__setstate__'] = _setstate
+    slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    slotted_cls.__qualname__ = cls.__qualname__
+    return slotted_cls
+
+
+R = typing.TypeVar('R')
+
+
+def late_naming(record: R, pairname) -> R:
+    """ setting the pair of a record that was built without it.
+    A record just built has no pair and is not shared yet : it is named in place, without any copy.
+    Otherwise, a named copy is returned, leaving the original untouched.
+    """
+    if record.pairname is None:
+        object.__setattr__(record, 'pairname', pairname)
+        return record
+    return dataclasses.replace(record, pairname=pairname)
@@ -0,0 +1,118 @@
+""" One pooled HTTP session for the whole process, shared by REST clients and websocket connections.
+
+Opening a TCP + TLS connection costs more than most kraken requests.
+By sharing one connector, connections to api.kraken.com are kept alive and reused,
+DNS resolutions are cached, and connections can be opened in advance (pre-warming).
+
+Note : aiohttp sessions are bound to an event loop, so we actually keep one session per running loop.
+Sessions used outside of any context (no acquire / release) are closed when their loop shuts down.
+"""
+import asyncio
+import ssl
+import typing
+
+import aiohttp
+
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+_headers = {
+    'User-Agent': 'aiokraken'
+}
+
+# one TLS context for all connections
+_ssl_context: typing.Optional[ssl.SSLContext] = None
+
+# one session per event loop, with the number of context users
+_sessions: typing.Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = dict()
+_users: typing.Dict[asyncio.AbstractEventLoop, int] = dict()
+# tasks closing the session when their loop shuts down
+_closers: typing.Dict[asyncio.AbstractEventLoop, asyncio.Task] = dict()
+
+
+def _connector() -> aiohttp.TCPConnector:
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return aiohttp.TCPConnector(
+        ssl=_ssl_context,
+        limit=100,
+        limit_per_host=16,
+        use_dns_cache=True,
+        ttl_dns_cache=300,  # seconds
+        keepalive_timeout=60,  # seconds, kraken closes idle connections after a while anyway
+        enable_cleanup_closed=True,
+    )
+
+
+async def _close_at_shutdown(session: aiohttp.ClientSession):
+    """ waits until cancelled, like remaining tasks are when asyncio.run() returns, then closes the session """
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        if not session.closed:
+            await session.close()
+
+
+def shared_session() -> aiohttp.ClientSession:
+    """ The session for the running loop, created if needed. Must be called from a running loop. """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        # forgetting sessions of closed loops
+        for l in [l for l in _sessions if l.is_closed()]:
+            _sessions.pop(l)
+            _users.pop(l, None)
+            _closers.pop(l, None)
+        session = aiohttp.ClientSession(connector=_connector(), headers=_headers,
+                                        raise_for_status=True, trust_env=True)
+        _sessions[loop] = session
+        # a client used without "async with" never releases it
+        _closers[loop] = loop.create_task(_close_at_shutdown(session))
+    return session
+
+
+async def acquire_session() -> aiohttp.ClientSession:
+    """ for context users : counting them so that the last one closes the session """
+    session = shared_session()
+    loop = asyncio.get_running_loop()
+    _users[loop] = _users.get(loop, 0) + 1
+    return session
+
+
+async def release_session():
+    loop = asyncio.get_running_loop()
+    _users[loop] = _users.get(loop, 1) - 1
+    if _users[loop] <= 0:
+        await close_session()
+
+
+async def close_session():
+    loop = asyncio.get_running_loop()
+    _users.pop(loop, None)
+    session = _sessions.pop(loop, None)
+    if session is not None and not session.closed:
+        await session.close()
+    closer = _closers.pop(loop, None)
+    if closer is not None:
+        closer.cancel()
+
+
+async def prewarm(urls: typing.Iterable[str] = ("https://api.kraken.com",), connections: int = 2) -> int:
+    """ Open connections in advance, so that the first requests do not pay for DNS, TCP and TLS handshakes.
+    Uses HEAD requests on the host root, which are not counted by the API rate limiter.
+    Returns the number of connections successfully opened."""
+    session = shared_session()
+
+    async def head(url):
+        try:
+            async with session.head(url, raise_for_status=False, allow_redirects=False):
+                return True
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            LOGGER.warning(f"Could not prewarm connection to {url}: {err}")
+            return False
+
+    # opening them concurrently, otherwise the same connection would be reused
+    opened = await asyncio.gather(*(head(u) for u in urls for _ in range(connections)))
+    return sum(opened)
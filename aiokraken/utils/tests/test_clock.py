@@ -0,0 +1,132 @@
+import asyncio
+import math
+import random
+import unittest
+
+from hypothesis import given, strategies as st
+
+from aiokraken.model.time import Time
+from aiokraken.rest.client import RestClient
+from aiokraken.rest.limiter import unlimited
+from aiokraken.utils.clock import Clock, server_clock
+from aiokraken.utils.nonce import NonceSource
+
+"""
+Clock estimation tests, with a simulated server clock, truncated to the second like kraken's.
+"""
+
+
+def roundtrip(clock: Clock, local: float, offset: float, outbound: float, inbound: float):
+    """ one simulated request to the Time endpoint, sent at local time """
+    clock.observe(sent=local, received=local + outbound + inbound, server=math.floor(local + outbound + offset))
+
+
+class TestClock(unittest.TestCase):
+
+    @given(st.floats(min_value=-3600, max_value=3600), st.randoms(use_true_random=False))
+    def test_bounds_contain_offset(self, offset, rnd):
+        clock = Clock()
+        local = 1571150298.0
+        for _ in range(20):
+            roundtrip(clock, local, offset, outbound=rnd.uniform(0.01, 0.5), inbound=rnd.uniform(0.01, 0.5))
+            assert clock.offset - clock.error <= offset + 1e-6
+            assert offset - 1e-6 <= clock.offset + clock.error
+            local += rnd.uniform(1, 60)
+
+    def test_converges(self):
+        rnd = random.Random(42)
+        clock = Clock()
+        offset = 12.345
+        local = 1571150298.0
+        for _ in range(32):
+            roundtrip(clock, local, offset, outbound=rnd.uniform(0.02, 0.1), inbound=rnd.uniform(0.02, 0.1))
+            local += rnd.uniform(1, 10)
+        # much better than the one second resolution of the server time
+        assert clock.error < 0.1
+        assert abs(clock.offset - offset) <= clock.error
+
+    def test_min_rtt(self):
+        clock = Clock()
+        roundtrip(clock, 1000.0, 5.5, outbound=0.05, inbound=0.05)
+        precise = clock.offset, clock.error
+        # a slow round trip does not loosen the estimation (apart from the possible drift since the precise one)
+        roundtrip(clock, 1010.0, 5.5, outbound=2.0, inbound=2.0)
+        assert clock.error <= precise[1] + 12 * clock.drift
+
+    def test_stepped_clock(self):
+        clock = Clock()
+        for t in range(10):
+            roundtrip(clock, 1000.0 + t * 2.3, 5.5, outbound=0.05, inbound=0.05)
+        assert abs(clock.offset - 5.5) <= clock.error
+        # local clock set one hour back : the offset jumped
+        roundtrip(clock, 1000.0 - 3600, 3605.5, outbound=0.05, inbound=0.05)
+        assert abs(clock.offset - 3605.5) <= clock.error
+        assert len(clock.roundtrips) == 1
+
+    def test_stepped_clock_faster_samples(self):
+        clock = Clock()
+        for t in range(10):
+            roundtrip(clock, 1000.0 + t * 2.3, 10.35, outbound=0.2, inbound=0.2)
+        # local clock stepped 100s forward, and later samples have a smaller round trip than the old ones
+        for t in range(5):
+            roundtrip(clock, 1200.0 + t * 2.3, -89.65, outbound=0.02, inbound=0.02)
+        assert abs(clock.offset - -89.65) <= clock.error
+        assert clock.error < 1
+
+    def test_floor(self):
+        clock = Clock(local=lambda: 1000.0)
+        clock.observe_floor(server=1003.0)  # only one-way : a lower bound
+        assert clock.offset == 3.0 and clock.error == math.inf
+        roundtrip(clock, 1000.0, 5.5, outbound=0.05, inbound=0.05)
+        low = clock.offset - clock.error
+        clock.observe_floor(server=1005.52, received=1000.05)
+        assert clock.offset - clock.error > low
+        assert abs(clock.offset - 5.5) <= clock.error
+
+    def test_nonce(self):
+        clock = Clock(local=lambda: 1000.0)
+        nonce = NonceSource(clock=clock.time)
+        assert nonce() == 1000000
+        clock.observe(sent=1000.0, received=1000.0, server=1010)
+        assert nonce() == 1010500
+
+
+class TestClientClock(unittest.TestCase):
+
+    def client(self, **kwargs):
+        client = RestClient(clock=Clock(), **kwargs)
+        client.public_limiter = unlimited()
+        client.sent = 0
+
+        async def get(request):
+            client.sent += 1
+            return Time(unixtime=int(client.clock.local()) + 100)
+
+        client._get = get
+        return client
+
+    def test_skew_from_client_clock(self):
+        client = self.client()
+        res = asyncio.run(client.time())
+        assert res.clockskew == client.clock.offset
+        assert 99 < res.clockskew < 101
+        assert server_clock.offset != client.clock.offset
+
+    def test_synchronized_while_entered(self):
+        client = self.client(clock_sync=60)
+
+        async def run():
+            async with client:
+                await asyncio.sleep(0.1)  # first sample of the burst
+                assert client.sent == 1
+                task = client._clock_task
+            await asyncio.sleep(0)
+            assert task.cancelled()
+            assert client._clock_task is None
+
+        asyncio.run(run())
+        assert client.clock.roundtrips
+
+
+if __name__ == '__main__':
+    unittest.main()
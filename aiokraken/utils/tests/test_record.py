@@ -0,0 +1,66 @@
+import dataclasses
+import pickle
+import unittest
+
+from hypothesis import given
+
+from aiokraken.rest.schemas.ktrade import KTradeStrategy
+from aiokraken.websockets.schemas.tests.strats.st_ohlc import st_ohlcupdate
+from aiokraken.websockets.schemas.tests.strats.st_openorders import st_openorderws
+from aiokraken.websockets.schemas.tests.strats.st_owntrade import st_owntradews
+from aiokraken.websockets.schemas.tests.strats.st_ticker import st_tickerws
+from aiokraken.websockets.schemas.tests.strats.st_trade import st_tradews
+
+"""
+Slotted records must behave like the frozen dataclasses they replace.
+"""
+
+
+class TestSlotted(unittest.TestCase):
+
+    def assert_record(self, rec):
+        assert not hasattr(rec, '__dict__')
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            setattr(rec, dataclasses.fields(rec)[0].name, None)
+        assert dataclasses.replace(rec) == rec
+        assert pickle.loads(pickle.dumps(rec)) == rec
+        assert hash(rec) == hash(dataclasses.replace(rec))
+
+    @given(trd=st_tradews())
+    def test_trade(self, trd):
+        self.assert_record(trd)
+
+    @given(owntrd=st_owntradews())
+    def test_owntrade(self, owntrd):
+        self.assert_record(owntrd)
+
+    @given(openord=st_openorderws())
+    def test_openorder(self, openord):
+        self.assert_record(openord)
+
+    @given(trd=KTradeStrategy())
+    def test_ktrade(self, trd):
+        self.assert_record(trd)
+        assert dataclasses.asdict(trd)['ordertxid'] == trd.ordertxid
+
+
+class TestLateNaming(unittest.TestCase):
+
+    @given(ohlc=st_ohlcupdate())
+    def test_in_place(self, ohlc):
+        named = ohlc("XBT/EUR")
+        assert named is ohlc
+        assert named.pairname == "XBT/EUR"
+
+    @given(tkr=st_tickerws())
+    def test_renaming_copies(self, tkr):
+        named = tkr("XBT/EUR")
+        renamed = named("ETH/EUR")
+        assert renamed is not named
+        assert named.pairname == "XBT/EUR"
+        assert renamed.pairname == "ETH/EUR"
+        assert renamed.ask == named.ask
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+
+from aiokraken.utils.session import acquire_session, close_session, release_session, shared_session
+
+
+class TestSharedSession(unittest.TestCase):
+
+    def test_shared_until_last_user(self):
+
+        async def users():
+            first = await acquire_session()
+            second = await acquire_session()
+            assert first is second
+            assert shared_session() is first
+
+            await release_session()
+            assert not first.closed  # still used
+
+            await release_session()
+            assert first.closed
+
+            # a new one is created on demand
+            third = shared_session()
+            assert third is not first
+            await close_session()
+            assert third.closed
+
+        asyncio.run(users())
+
+    def test_one_session_per_loop(self):
+
+        async def get():
+            s = shared_session()
+            await close_session()
+            return s
+
+        assert asyncio.run(get()) is not asyncio.run(get())
+
+    def test_closed_at_shutdown(self):
+
+        async def get():
+            # like a client used without "async with"
+            return shared_session()
+
+        session = asyncio.run(get())
+        assert session.closed
+
+    def test_no_closer_left(self):
+
+        async def users():
+            await acquire_session()
+            await release_session()
+            await asyncio.sleep(0)
+            return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+        assert asyncio.run(users()) == []
+
+
+if __name__ == '__main__':
+    unittest.main()
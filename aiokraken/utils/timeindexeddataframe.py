@@ -68,6 +68,7 @@ class TimeindexedDataframe:
         tz: timezone = timezone.utc,  # needed as argument as this definitely depends on context/hyperparams...
         timer: typing.Callable = None,  # Maybe more part of the context than the dataframe ?
         sleeper: typing.Callable = None,
+        copy: bool = True,
     ):
         """
         Dataframe instantiation with explicit time index and datetime human readable equivalent.
@@ -75,12 +76,14 @@ class TimeindexedDataframe:
         :param data:
         :param time_colname:
         :param datetime_colname:
+        :param copy: False to take ownership of data, when nobody else holds it.
         """
         self.tz = tz  # Note None means local (same default as python, is it really a good idea ?)
         self.timer = timer if timer is not None else functools.partial(datetime.now, tz=self.tz)
         self.sleeper = sleeper if sleeper is not None else asyncio.sleep
 
-        self.dataframe = data.copy(deep=True)  # copy to not modify origin (immutable semantics for generic dataframes)
+        # copy to not modify origin (immutable semantics for generic dataframes)
+        self.dataframe = data.copy(deep=True) if copy else data
         # TODO : maybe manage that with contracts instead ?
         if not isinstance(self.dataframe.index, pd.DatetimeIndex):
             if index in self.dataframe.columns:
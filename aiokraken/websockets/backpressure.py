@@ -0,0 +1,182 @@
+""" Backpressure policies for the queues of websocket streams.
+
+All streams of a connection are fed by one reader loop (API.__aiter__), which also handles heartbeats and pongs.
+If delivering a message to a stream had to wait for its consumer, one slow consumer would stall everything else.
+These queues never make the reader wait. Each of them decides differently what to do when its consumer lags :
+
+- ConflatingQueue keeps only the latest message for each pair (ticker : only the current state matters),
+  or for each pair and interval (ohlc : the last update of an interval is its final candle, it is kept).
+- DropOldestQueue keeps the latest messages, up to a maximum, and counts the ones dropped (trade frames).
+- UnboundedQueue keeps everything, and warns when the consumer is falling behind (private channels).
+
+asyncio.Queue(maxsize=...) is still usable as a stream queue : the reader then waits for the consumer, as before.
+"""
+import asyncio
+import collections
+import typing
+
+from aiokraken.utils import get_kraken_logger
+
+LOGGER = get_kraken_logger(__name__)
+
+
+class StreamQueue:
+    """ a queue where put never waits. get waits for a message, like asyncio.Queue.get """
+
+    def __init__(self):
+        self._items = self._init()
+        self._getters: typing.Deque[asyncio.Future] = collections.deque()
+        self.dropped = 0  # messages that were never delivered to the consumer
+
+    def _init(self) -> typing.Collection:
+        return collections.deque()
+
+    def _put(self, item) -> None:
+        self._items.append(item)
+
+    def _get(self):
+        return self._items.popleft()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def _wakeup_next(self):
+        while self._getters:
+            waiter = self._getters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def put_nowait(self, item) -> None:
+        self._put(item)
+        self._wakeup_next()
+
+    async def put(self, item) -> None:
+        """ for the same interface as asyncio.Queue. Never waits. """
+        self.put_nowait(item)
+
+    def get_nowait(self):
+        if self.empty():
+            raise asyncio.QueueEmpty
+        return self._get()
+
+    async def get(self):
+        while self.empty():
+            waiter = asyncio.get_running_loop().create_future()
+            self._getters.append(waiter)
+            try:
+                await waiter
+            except:
+                waiter.cancel()  # Just in case waiter is not done yet.
+                try:
+                    self._getters.remove(waiter)
+                except ValueError:
+                    pass
+                if not self.empty() and not waiter.cancelled():
+                    # we were woken up by put_nowait(), but can't take the message. wake up the next in line.
+                    self._wakeup_next()
+                raise
+        return self.get_nowait()
+
+    def task_done(self) -> None:
+        """ for the same interface as asyncio.Queue. Nothing to do. """
+
+
+class ConflatingQueue(StreamQueue):
+    """ keeps only the latest message for each key. A message replaces the previous one, in its place in the queue.
+
+    >>> q = ConflatingQueue(key=lambda msg: msg[0])
+    >>> for msg in [("XBT/EUR", 1), ("ETH/EUR", 1), ("XBT/EUR", 2)]:
+    ...     q.put_nowait(msg)
+    >>> q.get_nowait(), q.get_nowait(), q.dropped
+    (('XBT/EUR', 2), ('ETH/EUR', 1), 1)
+    """
+
+    def __init__(self, key: typing.Callable[[typing.Any], typing.Hashable] = lambda msg: msg.pairname):
+        self.key = key
+        super(ConflatingQueue, self).__init__()
+
+    def _init(self) -> typing.Collection:
+        return dict()  # insertion ordered
+
+    def _put(self, item) -> None:
+        k = self.key(item)
+        if k in self._items:
+            self.dropped += 1
+        self._items[k] = item
+
+    def _get(self):
+        k = next(iter(self._items))
+        return self._items.pop(k)
+
+
+class DropOldestQueue(StreamQueue):
+    """ keeps the latest maxsize messages, dropping the oldest ones.
+    Note : it counts messages, not trades. One trade message (frame) holds all trades of the same instant, as a list.
+
+    >>> q = DropOldestQueue(maxsize=2)
+    >>> for msg in range(5):
+    ...     q.put_nowait(msg)
+    >>> q.get_nowait(), q.get_nowait(), q.dropped
+    (3, 4, 3)
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        super(DropOldestQueue, self).__init__()
+
+    def _init(self) -> typing.Collection:
+        return collections.deque(maxlen=self.maxsize)
+
+    def _put(self, item) -> None:
+        if len(self._items) == self.maxsize:
+            self.dropped += 1
+            if self.dropped == 1:
+                LOGGER.warning(f"Stream consumer too slow, dropping its oldest messages (keeping {self.maxsize})")
+        self._items.append(item)
+
+
+class UnboundedQueue(StreamQueue):
+    """ keeps every message. Warns when alert messages are waiting, then again each time this doubles.
+
+    >>> q = UnboundedQueue(alert=2)
+    >>> for msg in range(5):
+    ...     q.put_nowait(msg)
+    >>> q.qsize(), q.highest, q.dropped
+    (5, 5, 0)
+    """
+
+    def __init__(self, alert: int = 1024):
+        self.alert = alert
+        self.highest = 0  # the most messages that were waiting at once
+        self._next_alert = alert
+        super(UnboundedQueue, self).__init__()
+
+    def _put(self, item) -> None:
+        self._items.append(item)
+        size = len(self._items)
+        self.highest = max(self.highest, size)
+        if size >= self._next_alert:
+            LOGGER.warning(f"Stream consumer too slow, {size} messages waiting")
+            self._next_alert *= 2
+
+    def _get(self):
+        item = self._items.popleft()
+        if len(self._items) < self.alert:  # caught up
+            self._next_alert = self.alert
+        return item
+
+
+def default_queue(channel_name: str) -> StreamQueue:
+    """ The queue for a stream of this channel, if none is specified on subscribe """
+    if channel_name == "ticker":
+        return ConflatingQueue()
+    elif channel_name.startswith("ohlc"):
+        return ConflatingQueue(key=lambda msg: (msg.pairname, msg.etime))
+    elif channel_name == "trade":
+        return DropOldestQueue()
+    else:  # private channels : every message matters
+        return UnboundedQueue()
@@ -29,6 +29,13 @@ from aiokraken.rest.exceptions import AIOKrakenSchemaValidationException
 
 from aiokraken.rest.schemas.base import BaseSchema
 
+from aiokraken.utils import get_kraken_logger
+
+from aiokraken.websockets.decoders import (
+    decode_ohlc, decode_openorders, decode_owntrades, decode_ticker, decode_trade,
+)
+
+LOGGER = get_kraken_logger(__name__)
 
 _ticker_schema = TickerWSSchema()
 _ohlcupdate_schema = OHLCUpdateSchema()
@@ -44,25 +51,43 @@ def _public_parser(
         # - https://docs.kraken.com/websockets-beta/#message-ohlc
         # - https://docs.kraken.com/websockets-beta/#message-trade
 
+        # trade data may be a list of trades, parsed one at a time
+        many = isinstance(data, list) and bool(data) and isinstance(data[0], list)
         # also calling the parsed model to store the pair here as well...
-        parsed = schema.load(data)
+        parsed = schema.load(data, many=many)
         # this is specific to public streams
-        parsed_with_pair = parsed(pair)
+        parsed_with_pair = [p(pair) for p in parsed] if many else parsed(pair)
 
         return Ok(parsed_with_pair)
     except AIOKrakenSchemaValidationException as sve:
-        return Err(error=sve)
+        return Err(sve)
 
 
-def publicchannelparser(channel_name: str):
+def _public_decoder(*, decoder: typing.Callable, schema: BaseSchema, data: typing.Any, pair: AssetPair):
+    try:
+        # building the record, with its pair, directly from kraken positional data
+        return Ok(decoder(data, pair))
+    except Exception as exc:
+        # the schema knows better what is wrong
+        LOGGER.debug(f"Fast decoding failed ({exc}), validating with {schema}")
+    return _public_parser(schema=schema, data=data, pair=pair)
+
+
+def publicchannelparser(channel_name: str, validate: bool = False):
+    """ the parser for this channel.
+    :param validate: parse with the marshmallow schema, instead of the fast decoder.
+    """
     if channel_name == "trade":
-        return functools.partial(_public_parser, schema=_trade_schema)
+        schema, decoder = _trade_schema, decode_trade
     elif channel_name == "ticker":
-        return functools.partial(_public_parser, schema=_ticker_schema)
+        schema, decoder = _ticker_schema, decode_ticker
     elif channel_name.startswith("ohlc"):
-        return functools.partial(_public_parser, schema=_ohlcupdate_schema)
+        schema, decoder = _ohlcupdate_schema, decode_ohlc
     else:
         raise NotImplementedError
+    if validate:
+        return functools.partial(_public_parser, schema=schema)
+    return functools.partial(_public_decoder, decoder=decoder, schema=schema)
 
 
 ####  PRIVATE
@@ -82,16 +107,31 @@ def _private_parser(*, schema: BaseSchema, data: typing.Any):  # TODO : refine A
         parsed = schema.load(data, many=isinstance(data, list))
         return Ok(parsed)
     except AIOKrakenSchemaValidationException as sve:
-        return Err(error=sve)
+        return Err(sve)
+
+
+def _private_decoder(*, decoder: typing.Callable, schema: BaseSchema, data: typing.Any):
+    try:
+        return Ok(decoder(data))
+    except Exception as exc:
+        # the schema knows better what is wrong
+        LOGGER.debug(f"Fast decoding failed ({exc}), validating with {schema}")
+    return _private_parser(schema=schema, data=data)
 
 
-def privatechannelparser(channel_name: str):
+def privatechannelparser(channel_name: str, validate: bool = False):
+    """ the parser for this channel.
+    :param validate: parse with the marshmallow schema, instead of the fast decoder.
+    """
     if channel_name == "ownTrades":
-        return functools.partial(_private_parser, schema=_owntrades_schema)
+        schema, decoder = _owntrades_schema, decode_owntrades
     elif channel_name == "openOrders":
-        return functools.partial(_private_parser, schema=_openorders_schema)
+        schema, decoder = _openorders_schema, decode_openorders
     else:
         raise NotImplementedError
+    if validate:
+        return functools.partial(_private_parser, schema=schema)
+    return functools.partial(_private_decoder, decoder=decoder, schema=schema)
 
 
 if __name__ == "__main__":
@@ -3,19 +3,43 @@ import typing
 
 from aiokraken.rest import AssetPairs
 
+from aiokraken.websockets.backpressure import StreamQueue, default_queue
 from aiokraken.websockets.channelsubscribe import ChannelPrivate, PublicChannelSet
 
 
+async def get_batch(queue: typing.Union[StreamQueue, asyncio.Queue], max_size: int, max_delay: float) -> typing.List:
+    """ waits for one message, then takes all messages available, up to max_size.
+    If there are less than that, waits up to max_delay (in seconds) after the first message, for more to arrive.
+    """
+    batch = [await queue.get()]
+    deadline = asyncio.get_running_loop().time() + max_delay
+    while len(batch) < max_size:
+        try:
+            batch.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+    for _ in batch:
+        queue.task_done()
+    return batch
+
+
 class SubStreamPrivate:
     # note pair matching is done inside the parser itself
     # here we rely solely on id
     channel: ChannelPrivate
-    queue: asyncio.Queue = None
+    queue: typing.Union[StreamQueue, asyncio.Queue] = None
 
-    def __init__(self, *, channelprivate: ChannelPrivate):
+    def __init__(self, *, channelprivate: ChannelPrivate, queue: typing.Union[StreamQueue, asyncio.Queue] = None):
 
         self.channel = channelprivate
-        self.queue = asyncio.Queue(maxsize=8)  # to quickly trigger exception if no consumer setup.
+        # the backpressure policy of this stream (an asyncio.Queue makes the reader wait for the consumer).
+        self.queue = queue if queue is not None else default_queue("private")
 
     def __await__(self):
         # we wait on future
@@ -28,8 +52,11 @@ class SubStreamPrivate:
 
     async def __call__(self, *, data: typing.Any, channel: str) -> None:
         # channel name and pair matching has been done before. here we only need the channel_id.
-        # parsing message ignoring errors
-        if parsed := self.channel(data=data):
+        await self.deliver(self.channel(data=data))
+
+    async def deliver(self, parsed) -> None:
+        """ a message already parsed, ignoring errors """
+        if parsed.is_ok():
             await self.queue.put(parsed.value)
         else:
             print(parsed.value)  # output directly the error # TODO : proper log...
@@ -41,18 +68,27 @@ class SubStreamPrivate:
             yield await self.queue.get()
             self.queue.task_done()
 
+    async def batches(self, max_size: int = 256, max_delay: float = 0.0):
+        """ Same as async iteration, but yielding lists of all the messages available, in one go (cf. get_batch).
+        In a burst, a consumer is woken up once for a whole batch, instead of once per message.
+        """
+        while self.queue and self.channel.subid is not None:  # channel.subid is used to detect when we unsubscribe
+            yield await get_batch(self.queue, max_size=max_size, max_delay=max_delay)
+
 
 class SubStream:
     # note pair matching is done inside the parser itself
     # here we rely solely on id
     pairs: AssetPairs
     channels: PublicChannelSet
-    queue: asyncio.Queue = None
+    queue: typing.Union[StreamQueue, asyncio.Queue] = None
 
-    def __init__(self, *, channelset: PublicChannelSet, pairs: AssetPairs):
+    def __init__(self, *, channelset: PublicChannelSet, pairs: AssetPairs,
+                 queue: typing.Union[StreamQueue, asyncio.Queue] = None):
         self.pairs = pairs
         self.channels = channelset
-        self.queue = asyncio.Queue(maxsize=8)  # to quickly trigger exception if no consumer setup.
+        # the backpressure policy of this stream (an asyncio.Queue makes the reader wait for the consumer).
+        self.queue = queue if queue is not None else default_queue("trade")
 
     def __await__(self):
 
@@ -72,10 +108,14 @@ class SubStream:
         # channel name and pair matching has been done before. here we only need the channel_id.
         # parsing message ignoring errors
         if pair in self.pairs:  # we need to parse only pairs we are interested in !
-            if parsed := self.channels(chan_id=chan_id, data=data, pair=pair):
-                await self.queue.put(parsed.value)
-            else:
-                print(parsed.value)  # output directly the error # TODO : proper log...
+            await self.deliver(self.channels(chan_id=chan_id, data=data, pair=pair))
+
+    async def deliver(self, parsed) -> None:
+        """ a message already parsed (once for all streams on the channel), ignoring errors """
+        if parsed.is_ok():
+            await self.queue.put(parsed.value)
+        else:
+            print(parsed.value)  # output directly the error # TODO : proper log...
 
     ## SOURCE
 
@@ -84,3 +124,9 @@ class SubStream:
             yield await self.queue.get()
             self.queue.task_done()
 
+    async def batches(self, max_size: int = 256, max_delay: float = 0.0):
+        """ Same as async iteration, but yielding lists of all the messages available, in one go (cf. get_batch).
+        In a burst, a consumer is woken up once for a whole batch, instead of once per message.
+        """
+        while self.queue and self.channels.subids:  # channel.subid is used to detect when we unsubscribe
+            yield await get_batch(self.queue, max_size=max_size, max_delay=max_delay)
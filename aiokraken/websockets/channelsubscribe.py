@@ -23,6 +23,9 @@ class PublicChannelSet:
     subids: typing.Dict[AssetPair, asyncio.Future]
     parsers: typing.Dict[int, typing.Callable]
 
+    # parsing messages with marshmallow schemas instead of fast decoders (slower, but validating everything)
+    validate: bool = False
+
     def __init__(self):
         self.subids = dict()
         self.parsers = dict()
@@ -67,7 +70,8 @@ class PublicChannelSet:
             raise RuntimeWarning(f" Unexpected Subscription: {channel_name} {pairstr} {channel_id}")
         assert pairstr == ap.wsname
 
-        self.parsers[channel_id] = functools.partial(publicchannelparser(channel_name=channel_name), pair=ap)
+        self.parsers[channel_id] = functools.partial(publicchannelparser(channel_name=channel_name, validate=self.validate),
+                                                    pair=ap)
 
         # TMP
         # if self.subids[ap].done():
@@ -211,12 +215,15 @@ class ChannelPrivate:
     subid: typing.Optional[asyncio.Future] = None
     parser: typing.Optional[typing.Callable] = None
 
+    # parsing messages with marshmallow schemas instead of fast decoders (slower, but validating everything)
+    validate: bool = False
+
     def subscribe(self, loop: asyncio.AbstractEventLoop):
         if self.subid is None:
             self.subid = loop.create_future()
 
     def subscribed(self, *, channel_name: str) -> None:
-        self.parser = privatechannelparser(channel_name=channel_name)
+        self.parser = privatechannelparser(channel_name=channel_name, validate=self.validate)
         # signal channel is ready to receive message by setting the subscribed future
         self.subid.set_result(channel_name)  # need to set the future to something...
 
@@ -0,0 +1,210 @@
+""" Fast decoders for websocket data frames (ticker, ohlc, trade, ownTrades, openOrders), bypassing marshmallow.
+
+Kraken sends public data as positional arrays, like [chan_id, [...], "ohlc-1", "XBT/EUR"].
+These decoders build the final record, already named with its pair, in one pass over the data,
+instead of a schema load (pre_load to a dict, field by field validation, post_load) and a late naming copy.
+
+They build exactly what the schemas of channelparser build.
+Whenever the data does not have the exact expected shape, they raise, and the schema is used instead,
+so that the same validation errors are reported.
+"""
+import math
+import typing
+from decimal import Decimal
+
+from aiokraken.model.ticker import DailyValue, MinOrder, MinTrade
+from aiokraken.rest.decoders import UnexpectedPayload
+from aiokraken.websockets.schemas.ohlc import OHLCUpdate
+from aiokraken.websockets.schemas.openorders import openOrderDescrWS, openOrderWS
+from aiokraken.websockets.schemas.owntrades import ownTradeWS
+from aiokraken.websockets.schemas.ticker import TickerWS
+from aiokraken.websockets.schemas.trade import TradeWS
+
+
+def _float(value, allow_none=False) -> typing.Optional[float]:
+    # like marshmallow fields.Float
+    if value is None and allow_none:
+        return None
+    if type(value) not in (float, int, str):  # bool, None...
+        raise UnexpectedPayload(f"Not a valid number: {value}")
+    num = float(value)
+    if not math.isfinite(num):
+        raise UnexpectedPayload(f"Special numeric value not allowed: {value}")
+    return num
+
+
+def _int(value) -> int:
+    # like marshmallow fields.Integer, only for actual integers
+    if type(value) is not int:
+        raise UnexpectedPayload(f"Not a valid integer: {value}")
+    return value
+
+
+def _decimal(value) -> Decimal:
+    # like marshmallow fields.Decimal.
+    # floats are left to the schema : some fields convert them exactly (Decimal(value)), others via str.
+    if not isinstance(value, (str, int, Decimal)) or isinstance(value, bool):
+        raise UnexpectedPayload(f"Not a valid number: {value}")
+    num = Decimal(str(value))
+    if not num.is_finite():
+        raise UnexpectedPayload(f"Special numeric value not allowed: {value}")
+    return num
+
+
+def _str(value, allow_none=False) -> typing.Optional[str]:
+    # like marshmallow fields.Str
+    if not isinstance(value, str) and not (allow_none and value is None):
+        raise UnexpectedPayload(f"Not a valid string: {value}")
+    return value
+
+
+def _keys(data: typing.Mapping, required: typing.AbstractSet[str], optional: typing.AbstractSet[str] = frozenset()):
+    keys = data.keys()
+    if not (required <= keys) or keys - required - optional:
+        raise UnexpectedPayload(f"Unexpected keys: {set(keys)}")
+
+
+#### PUBLIC
+
+_ticker_keys = frozenset({'a', 'b', 'c', 'v', 'p', 't', 'l', 'h', 'o'})
+
+
+def decode_ticker(data: typing.Mapping, pair) -> TickerWS:
+    """ {"a": [...], "b": [...], ...} -> TickerWS """
+    if data.keys() != _ticker_keys:
+        raise UnexpectedPayload(f"Unexpected keys in ticker: {set(data)}")
+    a, b, c, v, p, t, l, h, o = (data['a'], data['b'], data['c'], data['v'], data['p'],
+                                 data['t'], data['l'], data['h'], data['o'])
+    return TickerWS(
+        ask=MinOrder(price=_decimal(a[0]), whole_lot_volume=_decimal(a[1]), lot_volume=_decimal(a[2])),
+        bid=MinOrder(price=_decimal(b[0]), whole_lot_volume=_decimal(b[1]), lot_volume=_decimal(b[2])),
+        last_trade_closed=MinTrade(price=_decimal(c[0]), lot_volume=_decimal(c[1])),
+        volume=DailyValue(today=_decimal(v[0]), last_24_hours=_decimal(v[1])),
+        volume_weighted_average_price=DailyValue(today=_decimal(p[0]), last_24_hours=_decimal(p[1])),
+        number_of_trades=DailyValue(today=_decimal(t[0]), last_24_hours=_decimal(t[1])),
+        low=DailyValue(today=_decimal(l[0]), last_24_hours=_decimal(l[1])),
+        high=DailyValue(today=_decimal(h[0]), last_24_hours=_decimal(h[1])),
+        todays_opening=DailyValue(today=_decimal(o[0]), last_24_hours=_decimal(o[1])),
+        pairname=pair,
+    )
+
+
+def decode_ohlc(data: typing.Sequence, pair) -> OHLCUpdate:
+    """ [time, etime, open, high, low, close, vwap, volume, count] -> OHLCUpdate """
+    return OHLCUpdate(
+        time=_float(data[0]),
+        etime=_float(data[1]),
+        open=_float(data[2]),
+        high=_float(data[3]),
+        low=_float(data[4]),
+        close=_float(data[5]),
+        vwap=_float(data[6]),
+        volume=_float(data[7]),
+        count=_int(data[8]),
+        pairname=pair,
+    )
+
+
+def _trade(data: typing.Sequence, pair) -> TradeWS:
+    return TradeWS(
+        price=_decimal(data[0]),
+        volume=_decimal(data[1]),
+        time=_float(data[2]),
+        side=_str(data[3]),
+        orderType=_str(data[4]),
+        misc=_str(data[5]),
+        pairname=pair,
+    )
+
+
+def decode_trade(data: typing.Sequence, pair) -> typing.Union[TradeWS, typing.List[TradeWS]]:
+    """ [price, volume, time, side, orderType, misc] -> TradeWS, or a list of these -> list of TradeWS """
+    if data and isinstance(data[0], list):
+        return [_trade(t, pair) for t in data]
+    return _trade(data, pair)
+
+
+#### PRIVATE
+
+_owntrade_keys = frozenset({'ordertxid', 'postxid', 'pair', 'time', 'type', 'ordertype',
+                            'price', 'cost', 'fee', 'vol', 'margin'})
+_owntrade_optional_keys = frozenset({'posstatus'})
+
+
+def _owntrade(data: typing.Mapping) -> ownTradeWS:
+    (tradeid, t), = data.items()  # one trade per mapping
+    _keys(t, _owntrade_keys, _owntrade_optional_keys)
+    return ownTradeWS(
+        tradeid=tradeid,
+        ordertxid=_str(t['ordertxid']),
+        postxid=_str(t['postxid']),
+        pair=_str(t['pair']),
+        time=_float(t['time']),
+        type=_str(t['type']),
+        ordertype=_str(t['ordertype']),
+        price=_float(t['price']),
+        cost=_float(t['cost']),
+        fee=_float(t['fee']),
+        vol=_float(t['vol']),
+        margin=_float(t['margin']),
+        posstatus=_str(t.get('posstatus'), allow_none=True),
+    )
+
+
+def decode_owntrades(data: typing.Union[typing.Mapping, typing.List]) -> typing.Union[ownTradeWS, typing.List[ownTradeWS]]:
+    """ {tradeid: {...}} -> ownTradeWS, or a list of these -> list of ownTradeWS """
+    if isinstance(data, list):
+        return [_owntrade(t) for t in data]
+    return _owntrade(data)
+
+
+_openorderdescr_keys = frozenset({'pair', 'type', 'ordertype', 'price', 'price2', 'leverage', 'order', 'close'})
+_openorderdescr_optional_keys = frozenset({'position'})
+_openorder_keys = frozenset({'refid', 'userref', 'status', 'opentm', 'starttm', 'expiretm', 'descr',
+                             'vol', 'vol_exec', 'cost', 'fee', 'avg_price', 'stopprice', 'limitprice', 'misc', 'oflags'})
+
+
+def _openorderdescr(d: typing.Mapping) -> openOrderDescrWS:
+    _keys(d, _openorderdescr_keys, _openorderdescr_optional_keys)
+    return openOrderDescrWS(
+        pair=_str(d['pair']),
+        type=_str(d['type']),
+        ordertype=_str(d['ordertype']),
+        price=_float(d['price']),
+        price2=_float(d['price2']),
+        leverage=_float(d['leverage'], allow_none=True),
+        order=_str(d['order']),
+        close=_str(d['close'], allow_none=True),
+        position=_str(d.get('position'), allow_none=True),
+    )
+
+
+def _openorder(data: typing.Mapping) -> openOrderWS:
+    (orderid, o), = data.items()  # one order per mapping
+    _keys(o, _openorder_keys)
+    return openOrderWS(
+        orderid=orderid,
+        refid=_str(o['refid'], allow_none=True),
+        userref=_int(o['userref']),
+        status=_str(o['status']),
+        opentm=_float(o['opentm']),
+        starttm=_float(o['starttm'], allow_none=True),
+        expiretm=_float(o['expiretm'], allow_none=True),
+        descr=_openorderdescr(o['descr']),
+        vol=_float(o['vol']),
+        vol_exec=_float(o['vol_exec']),
+        cost=_float(o['cost']),
+        fee=_float(o['fee']),
+        avg_price=_float(o['avg_price']),
+        stopprice=_float(o['stopprice']),
+        limitprice=_float(o['limitprice']),
+        misc=_str(o['misc']),
+        oflags=_str(o['oflags']),
+    )
+
+
+def decode_openorders(data: typing.Union[typing.Mapping, typing.List]) -> typing.Union[openOrderWS, typing.List[openOrderWS]]:
+    """ {orderid: {...}} -> openOrderWS, or a list of these -> list of openOrderWS """
+    if isinstance(data, list):
+        return [_openorder(o) for o in data]
+    return _openorder(data)
@@ -1,5 +1,4 @@
 import asyncio
-import json
 from asyncio import Future
 from enum import Enum
 from typing import Callable
@@ -7,10 +6,11 @@ from typing import Callable
 import aiohttp
 import typing
 
-from aiokraken.websockets.channelstream import SubStream
+from aiokraken.rest.decoders import loads
+from aiokraken.websockets.channelstream import SubStream, SubStreamPrivate
 
 from aiokraken.utils import get_kraken_logger
-from aiokraken.websockets.channelsubscribe import subscription_channel_name
+from aiokraken.utils.clock import Clock, server_clock
 
 from aiokraken.websockets.schemas.pingpong import PingSchema, PongSchema
 
@@ -40,6 +40,15 @@ class KrakenEvent(Enum):
     SubscriptionStatus= "SubscriptionStatus"
 
 
+class Route:
+    """ Where the messages of one channel go : parsed once, then queued in each stream of the channel """
+    __slots__ = ('parser', 'streams')
+
+    def __init__(self, parser: Callable):
+        self.parser = parser
+        self.streams: typing.List[typing.Union[SubStream, SubStreamPrivate]] = list()
+
+
 class API:  # 1 instance per connection
 
     # storing a set of stream for each subscription name
@@ -56,8 +65,10 @@ class API:  # 1 instance per connection
     publicsubscriptionstatus_schema = PublicSubscriptionStatusSchema()
     unsubscribe_schema = UnsubscribeSchema()
 
-    def __init__(self, connect: WssConnection):
+    def __init__(self, connect: WssConnection, clock: typing.Optional[Clock] = None):
         self.connect = connect
+        # timestamped messages help estimating the server clock
+        self.clock = clock if clock is not None else server_clock
 
         self.reqid = 1
 
@@ -69,6 +80,30 @@ class API:  # 1 instance per connection
 
         self._streams = dict()
 
+        # routing table : channel id (public) or channel name (private) -> Route
+        # maintained on subscriptionStatus, so that dispatching a message is one lookup.
+        self._routes: typing.Dict[typing.Union[int, str], Route] = dict()
+
+    def _route(self, key: typing.Union[int, str], parser: Callable, stream: typing.Union[SubStream, SubStreamPrivate]):
+        """ messages on this channel will go to this stream """
+        route = self._routes.get(key)
+        if route is None:
+            route = self._routes[key] = Route(parser)
+        route.parser = parser  # a new subscription has a new parser
+        if stream not in route.streams:
+            route.streams.append(stream)
+
+    def _unroute(self, key: typing.Union[int, str]):
+        self._routes.pop(key, None)
+
+    async def _dispatch(self, key: typing.Union[int, str], data) -> None:
+        route = self._routes.get(key)
+        if route is None:  # not subscribed (any longer)
+            return
+        parsed = route.parser(data=data)
+        for strm in route.streams:
+            await strm.deliver(parsed)
+
     def _error_dispatch(self, msg):
         raise NotImplementedError
 
@@ -85,6 +120,17 @@ class API:  # 1 instance per connection
 
         return self.pong_schema.dumps(pong)  # returning original message (after parsing and reserializing)
 
+    def _clock_cb(self, data, channel: str):
+        """ Server timestamps in public data : sent before we received them """
+        # Note : heartbeats carry no timestamp.
+        try:
+            if channel == 'trade':  # [[price, volume, time, side, orderType, misc], ...]
+                self.clock.observe_floor(float(data[-1][2]))
+            elif channel.startswith('ohlc'):  # [time, etime, open, ...]
+                self.clock.observe_floor(float(data[0]))
+        except (IndexError, TypeError, ValueError) as exc:  # not for us to validate the data
+            LOGGER.debug(f"No timestamp in {channel} message: {exc}")
+
     def _heartbeat_cb(self, msg: Heartbeat):
         # TODO : somehow "expect" a beat at a certain time...
         pass
@@ -133,23 +179,18 @@ class API:  # 1 instance per connection
         # pulling data, linearized...
         async for message in self.connect:
 
-            # parsing json string
-            message = json.loads(message)
+            # parsing json string (with orjson if available)
+            message = loads(message)
             # print(f" DEBUG msg : {message}")
 
             # only receiving unknowns here but mandatory to pull data...
             if isinstance(message, list):
-                if len(message) == 4:  # public api
-                    channame = message[2]
-                    for subdata, strm in self._streams.items():
-                        if subscription_channel_name(subdata.subscription) == channame:
-                            await strm(chan_id=message[0], data=message[1], channel=message[2], pair=message[3])
-
-                elif len(message) == 2:  # private api
-                    channame = message[1]
-                    for subdata, strm in self._streams.items():
-                        if subscription_channel_name(subdata.subscription) == channame:
-                            await strm(data=message[0], channel=message[1])
+                if len(message) == 4:  # public api : [channel_id, data, channel_name, pair]
+                    self._clock_cb(message[1], message[2])
+                    await self._dispatch(message[0], message[1])
+
+                elif len(message) == 2:  # private api : [data, channel_name]
+                    await self._dispatch(message[1], message[0])
                 else:
                     raise NotImplementedError
 
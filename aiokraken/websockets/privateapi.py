@@ -4,6 +4,7 @@
 import asyncio
 import typing
 
+from aiokraken.websockets.backpressure import StreamQueue, default_queue
 from aiokraken.websockets.channelstream import SubStreamPrivate
 
 from aiokraken.websockets.channelsubscribe import private_subscribe, private_subscribed, private_unsubscribe
@@ -33,9 +34,12 @@ class PrivateAPI(API):
     def __init__(self, connect: WssConnection):
         super(PrivateAPI, self).__init__(connect=connect)
 
-    async def subscribe(self, subscription: Subscription, reqid: int) -> SubStreamPrivate:
+    async def subscribe(self, subscription: Subscription, reqid: int,
+                        queue: typing.Union[StreamQueue, asyncio.Queue] = None) -> SubStreamPrivate:
         #  a simple request response API, unblocking.
-        """ add new subscription and return a substream, ready to be used as an async iterator """
+        """ add new subscription and return a substream, ready to be used as an async iterator
+        :param queue: the backpressure policy of the stream. By default, keeping every message (cf. backpressure.py)
+        """
 
         # Because subscribe is callable multiple times with the same subdata,
         # but this would trigger "already subscribed" error on kraken side
@@ -45,13 +49,15 @@ class PrivateAPI(API):
 
         subdata = Subscribe(subscription=subscription, reqid=reqid)
 
+        # the stream is set up before sending, to be routed to when the subscription status arrives
+        self._streams[subdata] = SubStreamPrivate(channelprivate=chanpriv,
+                                                  queue=queue if queue is not None else default_queue(subscription.name))
+        if chanpriv.subid.done():  # already subscribed
+            self._route(subscription.name, chanpriv.parser, self._streams[subdata])
+
         strdata = self.subscribe_schema.dumps(subdata)
         await self.connect(strdata)
 
-        # retrieving all channel_ids for this subscription:
-
-        self._streams[subdata] = SubStreamPrivate(channelprivate=chanpriv)
-
         # await subscription to be set before returning
         return await self._streams[subdata]
         # TODO : maybe context manager to cleanup the queue when we dont use it or unsubscribe ?
@@ -86,10 +92,13 @@ class PrivateAPI(API):
 
                         print(f"Channel created: {chan}")
 
-                        # retrieve potentially existing channels for this id
+                        # routing messages of the channel to its streams
+                        for strm in self._streams.values():
+                            if strm.channel is chan:
+                                self._route(data.channel_name, chan.parser, strm)
 
                     elif data.status == 'unsubscribed':
-                        raise NotImplementedError  # TODO
+                        self._unroute(data.channel_name)
 
             else:
                 # unknown message type
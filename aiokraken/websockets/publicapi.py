@@ -6,7 +6,9 @@ import asyncio
 import typing
 
 from aiokraken.rest import AssetPairs
+from aiokraken.rest.symbols import symbols
 
+from aiokraken.websockets.backpressure import StreamQueue, default_queue
 from aiokraken.websockets.channelstream import SubStream
 
 from aiokraken.websockets.channelsubscribe import (
@@ -47,9 +49,12 @@ class PublicAPI(API):
     def __init__(self, connect: WssConnection):
         super(PublicAPI, self).__init__(connect=connect)
 
-    async def subscribe(self, pairs: typing.Iterable[AssetPair], subscription: Subscription, reqid: int) -> SubStream:
+    async def subscribe(self, pairs: typing.Iterable[AssetPair], subscription: Subscription, reqid: int,
+                        queue: typing.Union[StreamQueue, asyncio.Queue] = None) -> SubStream:
         #  a simple request response API, unblocking.
-        """ add new subscription and return a substream, ready to be used as an async iterator """
+        """ add new subscription and return a substream, ready to be used as an async iterator
+        :param queue: the backpressure policy of the stream. By default, depends on the channel (cf. backpressure.py)
+        """
 
         # Because one request can potentially trigger multiple responses
         # Beware: channel matching with subscription is relying on SubscribeOne equality!
@@ -60,15 +65,21 @@ class PublicAPI(API):
                                             subscription=subscription,
                                             loop=asyncio.get_running_loop(), reqid=reqid)
 
+        # the stream is set up before sending, to be routed to when the subscription status arrives
+        self._streams[subdata] = SubStream(channelset=chanset, pairs=AssetPairs({p.wsname: p for p in pairs}),
+                                           queue=queue if queue is not None else default_queue(subscription.name))
+        # routing now the pairs already subscribed
+        for p in pairs:
+            subid = chanset.subids.get(p)
+            if subid is not None and subid.done():
+                self._route(subid.result(), chanset.parsers[subid.result()], self._streams[subdata])
+
         if subdata:
             # we use the exact same subdata here
             strdata = self.subscribe_schema.dumps(subdata)
             await self.connect(strdata)
 
         # retrieving all channel_ids for this subscription:
-
-        self._streams[subdata] = SubStream(channelset=chanset, pairs=AssetPairs({p.wsname: p for p in pairs}))
-
         return await self._streams[subdata]
         # TODO : maybe context manager to cleanup the queue when we dont use it or unsubscribe ?
 
@@ -97,12 +108,16 @@ class PublicAPI(API):
                 else:  # normal case
                     # based on docs https://docs.kraken.com/websockets/#message-subscriptionStatus
                     if data.status == 'subscribed':
-                        public_subscribed(channel_id=data.channel_id,
-                                          channel_name=data.channel_name,
-                                          pairstr=data.pair)
+                        chanset = public_subscribed(channel_id=data.channel_id,
+                                                    channel_name=data.channel_name,
+                                                    pairstr=data.pair)
+                        # routing messages of the channel to the streams interested in this pair
+                        for strm in self._streams.values():
+                            if strm.channels is chanset and data.pair in strm.pairs:
+                                self._route(data.channel_id, chanset.parsers[data.channel_id], strm)
 
                     elif data.status == 'unsubscribed':
-                        raise NotImplementedError  # TODO
+                        self._unroute(data.channel_id)
 
             else:
                 # unknown message type
@@ -126,11 +141,25 @@ def msgpull():
         asyncio.get_running_loop().create_task(unknown())
 
 
+async def resolve_pairs(pairs: typing.List[typing.Union[AssetPair, str]], restclient=None) -> typing.List[AssetPair]:
+    """ pairs from their names. Known names (from the persisted registry) do not need a request to kraken. """
+    registry = restclient.symbols if restclient is not None else symbols
+    resolved = list()
+    for p in pairs:
+        if isinstance(p, str):
+            try:
+                p = registry.pair(p)
+            except KeyError:  # unknown yet
+                p = (await restclient.assetpairs)[p]
+        resolved.append(p)
+    return resolved
+
+
 async def ticker(pairs: typing.List[typing.Union[AssetPair, str]], restclient = None):
     global reqid, public_connection
 
     # we need to depend on restclient for usability TODO : unicity : we just need to import it here...
-    pairs = [(await restclient.assetpairs)[p] if isinstance(p, str) else p for p in pairs] if pairs else []
+    pairs = await resolve_pairs(pairs, restclient=restclient) if pairs else []
 
     reqid += 1  # leveraging reqid to recognize response
 
@@ -155,7 +184,7 @@ async def ohlc(pairs: typing.List[typing.Union[AssetPair, str]], interval: int =
     global reqid, public_connection
 
     # we need to depend on restclient for usability TODO : unicity : we just need to import it here...
-    pairs = [(await restclient.assetpairs)[p] if isinstance(p, str) else p for p in pairs] if pairs else []
+    pairs = await resolve_pairs(pairs, restclient=restclient) if pairs else []
 
     reqid += 1  # leveraging reqid to recognize response
 
@@ -180,7 +209,7 @@ async def trade(pairs: typing.List[typing.Union[AssetPair, str]], restclient=Non
     global reqid, public_connection
 
     # we need to depend on restclient for usability TODO : unicity : we just need to import it here...
-    pairs = [(await restclient.assetpairs)[p] if isinstance(p, str) else p for p in pairs] if pairs else []
+    pairs = await resolve_pairs(pairs, restclient=restclient) if pairs else []
 
     reqid += 1  # leveraging reqid to recognize response
 
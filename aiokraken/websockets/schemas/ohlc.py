@@ -10,8 +10,10 @@ from aiokraken.rest.schemas.base import BaseSchema
 import pandas as pd
 
 from aiokraken.model.ohlc import OHLC
+from aiokraken.utils.record import late_naming, slotted
 
 
+@slotted
 @dataclass(frozen=True)
 class OHLCUpdate:
     time: float  # Time, seconds since epoch
@@ -27,9 +29,7 @@ class OHLCUpdate:
     pairname: typing.Optional[str] = dataclasses.field(default=None)  # this will be set a bit after initialization
 
     def __call__(self, pairname):  # for late naming of the pair (same design as tickerWS)
-        newdata = dataclasses.asdict(self)
-        newdata.update({'pairname': pairname})
-        return OHLCUpdate(**newdata)
+        return late_naming(self, pairname)
 
     def to_tidfrow(self):  # Goal : retrieved an indexed dataframe , suitable for appending to timeindexedDF
         datadict = dataclasses.asdict(self)
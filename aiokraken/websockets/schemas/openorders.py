@@ -10,9 +10,12 @@ from decimal import Decimal
 
 import typing
 
+from aiokraken.utils.record import slotted
+
 
 """ A common data structure for an openOrder """
 
+@slotted
 @dataclass(frozen=True, init=True)
 class openOrderDescrWS:
     pair: str           #  	string 	asset pair
@@ -31,6 +34,7 @@ class openOrderDescrWS:
         return st_openorderdescrws()
 
 
+@slotted
 @dataclass(frozen=True, init=True)
 class openOrderWS:
 
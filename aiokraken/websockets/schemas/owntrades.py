@@ -14,9 +14,12 @@ from decimal import Decimal
 
 import typing
 
+from aiokraken.utils.record import slotted
+
 
 """ A common data structure for a Ticker """
 
+@slotted
 @dataclass(frozen=True, init=True)
 class ownTradeWS:
 
@@ -17,10 +17,13 @@ from decimal import Decimal
 
 import typing
 
+from aiokraken.utils.record import late_naming, slotted
+
 
 """ A common data structure for a Ticker """
 
 # TODO : ticker timeindexed frame ?
+@slotted
 @dataclass(frozen=True, init=True)
 class TickerWS:
     ask: MinOrder
@@ -56,9 +59,7 @@ class TickerWS:
     # o = today's opening price
 
     def __call__(self, pairname):  # for late naming
-        newdata = asdict(self)
-        newdata.update({'pairname': pairname})
-        return TickerWS(**newdata)
+        return late_naming(self, pairname)
 
     def __repr__(self):
         # TODO : refine... andc ompare with REST model
@@ -14,9 +14,12 @@ from decimal import Decimal
 
 import typing
 
+from aiokraken.utils.record import late_naming, slotted
+
 
 """ A common data structure for a Trade """
 
+@slotted
 @dataclass(frozen=True, init=True)
 class TradeWS:
 
@@ -29,9 +32,7 @@ class TradeWS:
     pairname: typing.Optional[str] = field(default=None)  # this will be set a bit after initialization
 
     def __call__(self, pairname):  # for late naming
-        newdata = asdict(self)
-        newdata.update({'pairname': pairname})
-        return TradeWS(**newdata)
+        return late_naming(self, pairname)
 
     def strategy(self):
         from aiokraken.websockets.schemas.tests.strats.st_trade import st_tradews
@@ -8,24 +8,19 @@ import signal
 import aiohttp
 import typing
 
+from aiokraken.utils.session import acquire_session, release_session
 
-_headers = {
-    'User-Agent': 'aiokraken'
-}
-
-# Only one session per process (one in this module, instantiated by interpreter on import)
-_single_session: typing.Optional[aiohttp.ClientSession] = None
-
-
-def unified_session_context() -> typing.AsyncContextManager:
-    global _single_session
-    if _single_session is None:
-        # Note : async loop must already be running here.
-        _single_session = aiohttp.ClientSession(headers=_headers, raise_for_status=True)
-    return _single_session
 
+@contextlib.asynccontextmanager
+async def unified_session_context() -> typing.AsyncIterator[aiohttp.ClientSession]:
+    # Note : async loop must already be running here.
+    # The session is shared with rest clients, it is closed only when the last user leaves.
+    session = await acquire_session()
+    try:
+        yield session
+    finally:
+        await release_session()
 
-# Note maybe we should use the session for both websockets and rest...
 
 if __name__ == '__main__':
 
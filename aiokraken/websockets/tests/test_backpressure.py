@@ -0,0 +1,104 @@
+import asyncio
+import unittest
+
+from hypothesis import given, strategies as st
+
+from aiokraken.websockets.backpressure import ConflatingQueue, DropOldestQueue, UnboundedQueue, default_queue
+from aiokraken.websockets.publicapi import PublicAPI
+from aiokraken.websockets.schemas.ohlc import OHLCUpdate
+from aiokraken.websockets.schemas.subscribe import Subscription
+from aiokraken.websockets.schemas.trade import TradeWS
+from aiokraken.websockets.tests.test_generalapi import FakeConnection, assetpair, status, trade
+
+
+class TestQueues(unittest.TestCase):
+
+    @given(st.lists(st.tuples(st.sampled_from(["XBT/EUR", "ETH/EUR", "XTZ/EUR"]), st.integers())))
+    def test_conflating(self, msgs):
+        q = ConflatingQueue(key=lambda msg: msg[0])
+        for m in msgs:
+            q.put_nowait(m)
+        latest = dict()
+        for m in msgs:
+            latest[m[0]] = m
+        got = [q.get_nowait() for _ in range(q.qsize())]
+        assert got == list(latest.values())  # in order of first arrival
+        assert q.dropped == len(msgs) - len(latest)
+
+    @given(st.lists(st.integers()), st.integers(min_value=1, max_value=16))
+    def test_drop_oldest(self, msgs, maxsize):
+        q = DropOldestQueue(maxsize=maxsize)
+        for m in msgs:
+            q.put_nowait(m)
+        assert [q.get_nowait() for _ in range(q.qsize())] == msgs[-maxsize:]
+        assert q.dropped == max(0, len(msgs) - maxsize)
+
+    @given(st.lists(st.integers()))
+    def test_unbounded(self, msgs):
+        q = UnboundedQueue(alert=4)
+        for m in msgs:
+            q.put_nowait(m)
+        assert [q.get_nowait() for _ in range(q.qsize())] == msgs
+        assert q.dropped == 0 and q.highest == len(msgs)
+
+    def test_ohlc_keeps_intervals(self):
+        q = default_queue("ohlc-1")
+        for etime, close in [(60.0, 1.0), (60.0, 2.0), (120.0, 3.0), (120.0, 4.0)]:
+            q.put_nowait(OHLCUpdate(time=etime - 1, etime=etime, open=1.0, high=4.0, low=1.0, close=close,
+                                    vwap=2.0, volume=1.0, count=1, pairname="XBT/EUR"))
+        # the final update of an interval is not replaced by the next interval
+        assert [q.get_nowait().close for _ in range(q.qsize())] == [2.0, 4.0]
+        assert q.dropped == 2
+
+    def test_get_waits(self):
+        async def runner():
+            q = DropOldestQueue(maxsize=2)
+            getter = asyncio.create_task(q.get())
+            await asyncio.sleep(0)
+            assert not getter.done()
+            await q.put(42)
+            assert await asyncio.wait_for(getter, timeout=1) == 42
+
+        asyncio.run(runner())
+
+
+class TestSlowConsumer(unittest.TestCase):
+
+    def test_slow_stream_does_not_block_others(self):
+        # channel sets are global : pairs not used by other tests
+        slow_pair, pair = assetpair('RTC/EUR'), assetpair('RTD/EUR')
+
+        async def runner():
+            conn = FakeConnection()
+            api = PublicAPI(conn)
+
+            async def pull():
+                async for msg in api:
+                    pass
+
+            puller = asyncio.create_task(pull())
+            subscribing = asyncio.gather(
+                api.subscribe(pairs=[slow_pair], subscription=Subscription(name='trade'), reqid=1,
+                              queue=DropOldestQueue(maxsize=4)),
+                api.subscribe(pairs=[pair], subscription=Subscription(name='trade'), reqid=2),
+            )
+            await asyncio.sleep(0.01)
+            conn.feed(status('subscribed', 4444, 'RTC/EUR'))
+            conn.feed(status('subscribed', 4545, 'RTD/EUR'))
+            slow, stream = await subscribing
+
+            # nobody consumes the slow stream
+            for _ in range(20):
+                conn.feed(trade(4444, 'RTC/EUR'))
+            conn.feed(trade(4545, 'RTD/EUR'))
+            assert isinstance(await asyncio.wait_for(stream.queue.get(), timeout=1), TradeWS)
+            assert slow.queue.qsize() == 4
+            assert slow.queue.dropped == 16
+
+            puller.cancel()
+
+        asyncio.run(runner())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -76,5 +76,33 @@ class TestSubStreamPrivate(unittest.TestCase):
         asyncio.run(runner())
 
 
+class TestBatches(unittest.TestCase):
+
+    @given(pair=AssetPairStrategy())
+    def test_batches(self, pair):
+
+        chan = PublicChannelSet()
+
+        async def runner():
+            pairs = AssetPairs(assetpairs_as_dict={pair.wsname: pair})
+            chan.subscribe(pairs=pairs, loop=asyncio.get_running_loop())
+            chan.subscribed(channel_name="trade", pairstr=pair.wsname, channel_id=randint(0, 9999))
+
+            stream = SubStream(channelset=chan, pairs=pairs)
+            for i in range(20):  # a burst
+                stream.queue.put_nowait(i)
+
+            batches = stream.batches(max_size=8, max_delay=0.05)
+            assert await batches.__anext__() == list(range(8))
+            assert await batches.__anext__() == list(range(8, 16))
+            # less than max_size available : waiting for more, up to max_delay
+            asyncio.get_running_loop().call_later(0.01, stream.queue.put_nowait, 20)
+            assert await batches.__anext__() == list(range(16, 21))
+
+            chan.unsubscribe(pairs=pairs)
+
+        asyncio.run(runner())
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,102 @@
+import json
+import unittest
+
+import hypothesis.strategies as st
+from hypothesis import given
+
+from aiokraken.model.tests.strats.st_assetpair import AssetPairStrategy
+from aiokraken.rest.decoders import UnexpectedPayload
+from aiokraken.websockets.channelparser import privatechannelparser, publicchannelparser
+from aiokraken.websockets.decoders import decode_ticker
+from aiokraken.websockets.schemas.ohlc import OHLCUpdateSchema
+from aiokraken.websockets.schemas.openorders import openOrderWSSchema
+from aiokraken.websockets.schemas.owntrades import ownTradeWSSchema
+from aiokraken.websockets.schemas.ticker import TickerWSSchema
+from aiokraken.websockets.schemas.trade import TradeWSSchema
+
+"""
+Parity tests : fast decoders must build exactly what the marshmallow schemas build.
+"""
+
+
+def frame(data):
+    # going through json, like a message from the network
+    return json.loads(json.dumps(data))
+
+
+class TestPublicDecodersParity(unittest.TestCase):
+
+    def assert_parity(self, channel_name, data, pair):
+        expected = publicchannelparser(channel_name, validate=True)(data=data, pair=pair)
+        decoded = publicchannelparser(channel_name)(data=data, pair=pair)
+        assert expected.is_ok() and decoded.is_ok()
+        assert decoded.value == expected.value
+        assert repr(decoded.value) == repr(expected.value)
+
+    @given(trade_data=TradeWSSchema.strategy(), pair=AssetPairStrategy())
+    def test_trade(self, trade_data, pair):
+        self.assert_parity("trade", frame(trade_data), pair)
+
+    @given(trades_data=st.lists(TradeWSSchema.strategy(), min_size=1, max_size=5), pair=AssetPairStrategy())
+    def test_trades(self, trades_data, pair):
+        # kraken sends all trades of the same instant in one message
+        self.assert_parity("trade", frame(trades_data), pair)
+
+    @given(ticker_data=TickerWSSchema.strategy(), pair=AssetPairStrategy())
+    def test_ticker(self, ticker_data, pair):
+        # number_of_trades is dumped as Decimal, not serializable as json
+        self.assert_parity("ticker", {k: [vv for vv in v] for k, v in ticker_data.items()}, pair)
+
+    @given(ohlc_data=OHLCUpdateSchema.strategy(), pair=AssetPairStrategy())
+    def test_ohlc(self, ohlc_data, pair):
+        self.assert_parity("ohlc-1", frame([v for v in ohlc_data.values()]), pair)
+
+    @given(ohlc_data=OHLCUpdateSchema.strategy(), pair=AssetPairStrategy())
+    def test_ohlc_invalid(self, ohlc_data, pair):
+        data = frame([v for v in ohlc_data.values()])
+        data[2] = "nan"
+        # the schema reports the error
+        assert publicchannelparser("ohlc-1")(data=data, pair=pair).is_err()
+
+    @given(ticker_data=TickerWSSchema.strategy(), pair=AssetPairStrategy(),
+           field=st.sampled_from(['a', 'b', 'c', 'v', 'p', 'l', 'h', 'o']),
+           special=st.sampled_from(["NaN", "nan", "Infinity", "-inf"]))
+    def test_ticker_special_values(self, ticker_data, pair, field, special):
+        data = {k: [vv for vv in v] for k, v in ticker_data.items()}
+        data[field][0] = special
+        # special values are left to the schema, on every field
+        with self.assertRaises(UnexpectedPayload):
+            decode_ticker(data, pair)
+        expected = publicchannelparser("ticker", validate=True)(data=data, pair=pair)
+        decoded = publicchannelparser("ticker")(data=data, pair=pair)
+        assert repr(decoded) == repr(expected)  # NaN != NaN
+
+
+class TestPrivateDecodersParity(unittest.TestCase):
+
+    def assert_parity(self, channel_name, data):
+        expected = privatechannelparser(channel_name, validate=True)(data=data)
+        decoded = privatechannelparser(channel_name)(data=data)
+        assert expected.is_ok() and decoded.is_ok()
+        assert decoded.value == expected.value
+        assert repr(decoded.value) == repr(expected.value)
+
+    @given(owntrades_data=ownTradeWSSchema.strategy())
+    def test_owntrades(self, owntrades_data):
+        self.assert_parity("ownTrades", frame(owntrades_data))
+
+    @given(owntrades_data=st.lists(ownTradeWSSchema.strategy(), min_size=1, max_size=5))
+    def test_owntrades_list(self, owntrades_data):
+        self.assert_parity("ownTrades", frame(owntrades_data))
+
+    @given(openorders_data=openOrderWSSchema.strategy())
+    def test_openorders(self, openorders_data):
+        self.assert_parity("openOrders", frame(openorders_data))
+
+    @given(openorders_data=st.lists(openOrderWSSchema.strategy(), min_size=1, max_size=5))
+    def test_openorders_list(self, openorders_data):
+        self.assert_parity("openOrders", frame(openorders_data))
+
+
+if __name__ == '__main__':
+    unittest.main()
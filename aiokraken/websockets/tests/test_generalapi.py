@@ -0,0 +1,98 @@
+import asyncio
+import json
+import time
+import unittest
+
+from aiokraken.model.asset import AssetClass
+from aiokraken.model.assetpair import AssetPair
+from aiokraken.websockets.publicapi import PublicAPI
+from aiokraken.websockets.schemas.subscribe import Subscription
+from aiokraken.websockets.schemas.trade import TradeWS
+
+
+def assetpair(wsname):
+    base, quote = wsname.split('/')
+    return AssetPair(altname=base + quote, wsname=wsname, aclass_base=AssetClass.currency, base=base,
+                     aclass_quote=AssetClass.currency, quote=quote, lot='unit', pair_decimals=1, lot_decimals=8,
+                     lot_multiplier=1, leverage_buy=[], leverage_sell=[], fees=[], fees_maker=[],
+                     fee_volume_currency='ZUSD', margin_call=80, margin_stop=40, restname='X' + base + 'Z' + quote)
+
+
+class FakeConnection:
+    """ records what is sent, and receives what the test feeds """
+
+    def __init__(self):
+        self.sent = list()
+        self.incoming = asyncio.Queue()
+
+    async def __call__(self, strdata):
+        self.sent.append(json.loads(strdata))
+
+    def feed(self, message):
+        self.incoming.put_nowait(json.dumps(message))
+
+    async def __aiter__(self):
+        while True:
+            yield await self.incoming.get()
+
+
+def status(status, channel_id, pair):
+    return {'channelID': channel_id, 'channelName': 'trade', 'event': 'subscriptionStatus',
+            'pair': pair, 'status': status, 'subscription': {'name': 'trade'}}
+
+
+def trade(channel_id, pair):
+    # one trade, as the trade parser expects it
+    return [channel_id, ["5541.20000", "0.15850568", f"{time.time():.6f}", "s", "l", ""], 'trade', pair]
+
+
+class TestRouting(unittest.TestCase):
+
+    def test_subscribe_dispatch_unsubscribe(self):
+        pair = assetpair('RTA/EUR')
+
+        async def runner():
+            conn = FakeConnection()
+            api = PublicAPI(conn)
+            unknown = list()
+
+            async def pull():
+                async for msg in api:
+                    unknown.append(msg)
+
+            puller = asyncio.create_task(pull())
+            subscribing = asyncio.create_task(api.subscribe(pairs=[pair], subscription=Subscription(name='trade'), reqid=1))
+            await asyncio.sleep(0.01)
+            assert conn.sent[0]['pair'] == ['RTA/EUR']
+            conn.feed(status('subscribed', 4242, 'RTA/EUR'))
+            stream = await subscribing
+
+            # routed by channel id, to the stream of the pair
+            assert api._routes[4242].streams == [stream]
+            conn.feed(trade(4242, 'RTA/EUR'))
+            conn.feed(trade(4343, 'RTB/EUR'))  # not subscribed : dropped
+            msg = await asyncio.wait_for(stream.queue.get(), timeout=1)
+            assert isinstance(msg, TradeWS)
+
+            # another stream on the same pair : the same channel
+            other = await api.subscribe(pairs=[pair], subscription=Subscription(name='trade'), reqid=2)
+            assert api._routes[4242].streams == [stream, other]
+            conn.feed(trade(4242, 'RTA/EUR'))
+            assert isinstance(await asyncio.wait_for(other.queue.get(), timeout=1), TradeWS)
+            assert isinstance(await asyncio.wait_for(stream.queue.get(), timeout=1), TradeWS)
+
+            conn.feed(status('unsubscribed', 4242, 'RTA/EUR'))
+            await asyncio.sleep(0.01)
+            assert 4242 not in api._routes
+            conn.feed(trade(4242, 'RTA/EUR'))
+            await asyncio.sleep(0.01)
+            assert stream.queue.empty() and other.queue.empty()
+            assert not unknown
+
+            puller.cancel()
+
+        asyncio.run(runner())
+
+
+if __name__ == '__main__':
+    unittest.main()
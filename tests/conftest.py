@@ -1,3 +1,5 @@
+import os
+
 import pytest
 
 
@@ -17,4 +19,13 @@ def keyfile(request):
         keystruct = load_api_keyfile()
     return keystruct
 
-# TODO : disable rate limiter when testing with replay...
+
+
+@pytest.fixture
+def replay(request):
+    """ Replays the cassette of the test (like the vcr marker finds it), without rate limiting. """
+    from aiokraken.rest.replay import ReplaySession
+    marker = request.node.get_closest_marker('default_cassette')
+    name = marker.args[0] if marker is not None else request.node.name + '.yaml'
+    module = request.module.__name__.rsplit('.', 1)[-1]
+    return ReplaySession.from_cassettes(os.path.join(os.path.dirname(request.module.__file__), 'cassettes', module, name))
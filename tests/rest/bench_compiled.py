@@ -0,0 +1,65 @@
+""" Benchmark : compiled vs interpreted schema loading, on the payloads recorded in cassettes.
+
+Usage : python -m tests.rest.bench_compiled [number]
+"""
+import json
+import os
+import sys
+import timeit
+import typing
+
+import yaml
+
+from aiokraken.rest.payloads import AssetPairPayloadSchema, AssetPayloadSchema, TickerPayloadSchema
+from aiokraken.rest.schemas.compiled import interpreted
+from aiokraken.rest.schemas.kclosedorder import ClosedOrdersResponseSchema
+from aiokraken.rest.schemas.kledger import KLedgersResponseSchema
+from aiokraken.rest.schemas.kopenorder import OpenOrdersResponseSchema
+from aiokraken.rest.schemas.ktrade import TradeResponseSchema
+from aiokraken.rest.schemas.payload import PayloadSchema
+
+CASSETTES = os.path.join(os.path.dirname(__file__), "cassettes")
+
+# cassette, endpoint, schema
+PAYLOADS = [
+    ("test_assets/test_asset_all.yaml", "Assets", AssetPayloadSchema()),
+    ("test_assetpairs/test_assetpairs_all.yaml", "AssetPairs", AssetPairPayloadSchema()),
+    ("test_ticker/test_ticker_one_pair.yaml", "Ticker", TickerPayloadSchema()),
+    ("test_trades/test_trades_nonempty.yaml", "TradesHistory", PayloadSchema(result_schema=TradeResponseSchema())),
+    ("test_ledgers/test_ledgers_nonempty.yaml", "Ledgers", PayloadSchema(result_schema=KLedgersResponseSchema())),
+    ("test_closedorders/test_closedorders_nonempty.yaml", "ClosedOrders",
+     PayloadSchema(result_schema=ClosedOrdersResponseSchema())),
+    ("test_openorders/test_openorders_one_low_limit_buy.yaml", "OpenOrders",
+     PayloadSchema(result_schema=OpenOrdersResponseSchema())),
+]
+
+
+def recorded(cassette: str, endpoint: str) -> typing.List[dict]:
+    """ the response bodies recorded in the cassette for this endpoint """
+    with open(os.path.join(CASSETTES, cassette)) as f:
+        interactions = yaml.safe_load(f)['interactions']
+    return [json.loads(i['response']['body']['string']) for i in interactions
+            if i['request']['uri'].split('?')[0].endswith('/' + endpoint)]
+
+
+def bench(number: int = 100):
+    print(f"{'payload':<55}{'interpreted':>14}{'compiled':>14}{'speedup':>10}")
+    for cassette, endpoint, schema in PAYLOADS:
+        responses = recorded(cassette, endpoint)
+
+        def load():
+            return [schema.load(r) for r in responses]
+
+        # pre_load hooks complete the data in place : the first load makes it stable for the next ones
+        with interpreted():
+            expected = repr(load())
+        assert repr(load()) == expected
+
+        with interpreted():
+            slow = min(timeit.repeat(load, number=number, repeat=3)) / number
+        fast = min(timeit.repeat(load, number=number, repeat=3)) / number
+        print(f"{endpoint:<55}{slow * 1e6:>12.1f}us{fast * 1e6:>12.1f}us{slow / fast:>9.1f}x")
+
+
+if __name__ == '__main__':
+    bench(*(int(a) for a in sys.argv[1:]))
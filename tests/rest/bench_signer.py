@@ -0,0 +1,42 @@
+""" Benchmark : signing private requests, reference implementation vs Signer, and nonces.
+
+Usage : python -m tests.rest.bench_signer [number]
+"""
+import base64
+import os
+import sys
+import tempfile
+import timeit
+
+from aiokraken.rest.request import _sign_message
+from aiokraken.rest.signer import Signer
+from aiokraken.utils import NonceSource
+
+SECRET = base64.b64encode(os.urandom(64)).decode()
+URLPATH = '/0/private/AddOrder'
+DATA = {'pair': 'XXBTZEUR', 'type': 'buy', 'ordertype': 'limit', 'price': '8000.0', 'volume': '0.01',
+        'validate': True, 'nonce': 1571150298123}
+
+
+def bench(number: int = 100000):
+    signer = Signer(key='key', secret=SECRET)
+    assert signer.signature(URLPATH, DATA) == _sign_message(DATA, URLPATH, SECRET)
+
+    def timed(stmt):
+        return min(timeit.repeat(stmt, number=number, repeat=3)) / number * 1e6
+
+    reference = timed(lambda: _sign_message(DATA, URLPATH, SECRET))
+    primed = timed(lambda: signer.signature(URLPATH, DATA))
+    print(f"{'signature':<30}{'reference':>12}{'signer':>12}{'speedup':>10}")
+    print(f"{URLPATH:<30}{reference:>10.2f}us{primed:>10.2f}us{reference / primed:>9.1f}x")
+
+    print(f"{'nonce':<30}{'per call':>12}")
+    print(f"{'in process':<30}{timed(NonceSource()):>10.2f}us")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        shared = NonceSource(path=os.path.join(tmpdir, 'nonce'))
+        print(f"{'shared file':<30}{timed(shared):>10.2f}us")
+        shared.close()
+
+
+if __name__ == '__main__':
+    bench(*(int(a) for a in sys.argv[1:]))
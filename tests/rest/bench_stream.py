@@ -0,0 +1,62 @@
+""" Benchmark : peak memory and time to build a ledger frame from a long Ledgers response,
+parsing the whole body and loading it with the schema, vs streaming it into columns.
+
+Usage : python -m tests.rest.bench_stream [records]
+"""
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+
+from aiokraken.model.ledgerframe import ledgerframe
+from aiokraken.rest.api import Server
+from aiokraken.rest.decoders import loads
+
+
+class Content:
+    """ the response body, arriving in network-sized chunks """
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def iter_chunked(self, n):
+        for i in range(0, len(self.body), 16384):
+            yield self.body[i: i + 16384]
+
+
+def body(records: int) -> bytes:
+    ledger = {f"L{i:06}-ABCDE-FGHIJK": {
+        "refid": f"T{i:06}-ABCDE-FGHIJK", "time": 1571150298.0 + i, "type": "trade", "aclass": "currency",
+        "asset": "XXBT", "amount": "0.0100000000", "fee": "0.0000000000", "balance": f"{i / 100:.10f}"
+    } for i in range(records)}
+    return json.dumps({'error': [], 'result': {'ledger': ledger, 'count': records}}).encode()
+
+
+def bench(records: int = 50000):
+    expected = Server().ledgers().expected
+    data = body(records)
+
+    def schema():
+        ledgers, count = expected.schema.load(loads(data))
+        return ledgerframe(ledgers).value
+
+    def streamed():
+        columns, count = asyncio.run(expected.stream(Content(data)))
+        return ledgerframe(columns).value
+
+    print(f"{records} ledger records, {len(data) / 1e6:.1f}MB body (not counted)")
+    print(f"{'':<12}{'peak':>12}{'time':>10}")
+    for name, build in [('schema', schema), ('streamed', streamed)]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        frame = build()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert len(frame) == records
+        print(f"{name:<12}{peak / 1e6:>10.1f}MB{elapsed:>9.2f}s")
+
+
+if __name__ == '__main__':
+    bench(*(int(a) for a in sys.argv[1:]))
@@ -20,6 +20,20 @@ async def test_closedorders_nonempty(keyfile):
     assert 'OSFLKN-U4LLK-RVLQI4' in closedorders
 
 
+@pytest.mark.asyncio
+@pytest.mark.default_cassette("test_closedorders_nonempty.yaml")
+@pytest.mark.vcr(filter_headers=['API-Key', 'API-Sign'], allow_playback_repeats=True)
+async def test_closedorders_columns(keyfile):
+    async with RestClient(server=Server(**keyfile)) as rest_kraken:
+        closedorders, count = await rest_kraken.closedorders()
+        columns, columns_count = await rest_kraken.closedorders(columns=True)
+
+    # streamed straight into flattened columns : same records
+    assert columns_count == count
+    assert list(columns) == list(closedorders)
+    assert columns.frame()['descr_pair'].tolist() == [o.descr.pair for o in closedorders.values()]
+
+
 if __name__ == '__main__':
     # replay
     pytest.main(['-s', __file__, '--block-network'])
@@ -35,6 +35,36 @@ async def test_ledgers_nonempty(keyfile):
     assert "LF5JBR-DPMZL-M6XVFA" in ledgers
 
 
+@pytest.mark.asyncio
+@pytest.mark.default_cassette("test_ledgers_nonempty.yaml")
+@pytest.mark.vcr(filter_headers=['API-Key', 'API-Sign'], allow_playback_repeats=True)
+async def test_ledgers_columns(keyfile):
+    async with RestClient(server=Server(**keyfile)) as rest_kraken:
+        ledgers, count = await rest_kraken.ledgers()
+        columns, columns_count = await rest_kraken.ledgers(columns=True)
+
+    # streamed straight into columns : same records
+    assert columns_count == count
+    assert list(columns) == list(ledgers)
+    assert columns.frame()['ledger_id'].tolist() == list(ledgers)
+    assert columns.frame()['amount'].tolist() == [l.amount for l in ledgers.values()]
+
+
+@pytest.mark.asyncio
+@pytest.mark.default_cassette("test_ledgers_nonempty.yaml")
+async def test_ledgers_replay(replay):
+    rest_kraken = RestClient(replay=replay)
+    ledgers, count = await rest_kraken.ledgers()
+    while len(ledgers) < count:
+        more_ledgers, count = await rest_kraken.ledgers(offset=len(ledgers))
+        ledgers.update(more_ledgers)
+
+    # pages matched on their offset, served without waiting for the limiters
+    assert count == len(ledgers) == 13
+    assert replay.served == 3
+    assert rest_kraken.private_limiter.wait_time(cost=100) == 0
+
+
 if __name__ == '__main__':
     # replay
     pytest.main(['-s', __file__, '--block-network'])
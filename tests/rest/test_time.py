@@ -21,6 +21,15 @@ async def test_time(keyfile):
         print(time)
 
 
+@pytest.mark.asyncio
+@pytest.mark.default_cassette("test_time.yaml")
+async def test_time_replay(replay):
+    async with RestClient(replay=replay) as rest_kraken:
+        for _ in range(20):  # without a limiter, any number of times, right away
+            time = await rest_kraken.time()
+            assert time.unixtime == 1577873240
+
+
 if __name__ == '__main__':
     pytest.main(['-s', __file__, '--block-network'])
     # record run
@@ -29,6 +29,21 @@ async def test_trades_nonempty(keyfile):
         assert 'TZT4H6-MKFDM-DAVW4C' in trades
         assert 'THNILV-B4KOW-NCBBTN' in trades
 
+@pytest.mark.asyncio
+@pytest.mark.default_cassette("test_trades_nonempty.yaml")
+@pytest.mark.vcr(filter_headers=['API-Key', 'API-Sign'], allow_playback_repeats=True)
+async def test_trades_columns(keyfile):
+    async with RestClient(server=Server(**keyfile)) as rest_kraken:
+        trades, count = await rest_kraken.trades(offset=0)
+        columns, columns_count = await rest_kraken.trades(offset=0, columns=True)
+
+    # streamed straight into columns : same records
+    assert columns_count == count
+    assert list(columns) == list(trades)
+    assert columns.frame()['trade_id'].tolist() == list(trades)
+    assert columns.frame()['price'].tolist() == [t.price for t in trades.values()]
+
+
 if __name__ == '__main__':
     # replay
     pytest.main(['-s', __file__, '--block-network'])
@@ -0,0 +1,79 @@
+""" Benchmark : memory and allocated objects per websocket message, for the records of market data,
+as they were (frozen dataclasses with a __dict__, late named with asdict and a full rebuild),
+vs slotted records named in place.
+
+Values are built once and shared by all messages, so only the record itself (and its naming) is measured.
+
+Usage : python -m tests.websockets.bench_records [messages]
+"""
+import dataclasses
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+
+from aiokraken.model.ticker import DailyValue, MinOrder, MinTrade
+from aiokraken.websockets.schemas.ohlc import OHLCUpdate
+from aiokraken.websockets.schemas.ticker import TickerWS
+from aiokraken.websockets.schemas.trade import TradeWS
+
+
+def legacy(record_cls):
+    """ the record type as it was : a frozen dataclass with a __dict__, late named with a full copy """
+    fields = [(f.name, f.type, dataclasses.field(default=f.default)) if f.default is not dataclasses.MISSING
+              else (f.name, f.type) for f in dataclasses.fields(record_cls)]
+
+    def late_naming(self, pairname):
+        newdata = dataclasses.asdict(self)
+        newdata.update({'pairname': pairname})
+        return type(self)(**newdata)
+
+    return dataclasses.make_dataclass(record_cls.__name__, fields, frozen=True, namespace={'__call__': late_naming})
+
+
+samples = {
+    OHLCUpdate: dict(time=1584781828.943175, etime=1584781860.0, open=5710.2, high=5710.2, low=5702.1, close=5702.1,
+                     vwap=5704.85879, volume=5.4984997, count=20),
+    TickerWS: dict(ask=MinOrder(Decimal('5710.2'), Decimal('1'), Decimal('1.000')),
+                   bid=MinOrder(Decimal('5710.1'), Decimal('2'), Decimal('2.000')),
+                   last_trade_closed=MinTrade(Decimal('5710.2'), Decimal('0.01')),
+                   volume=DailyValue(Decimal('2541.1'), Decimal('4417.5')),
+                   volume_weighted_average_price=DailyValue(Decimal('5684.7'), Decimal('5641.2')),
+                   high=DailyValue(Decimal('5753.8'), Decimal('5753.8')),
+                   number_of_trades=DailyValue(Decimal('10223'), Decimal('18442')),
+                   low=DailyValue(Decimal('5602.0'), Decimal('5491.5')),
+                   todays_opening=DailyValue(Decimal('5651.1'), Decimal('5602.3'))),
+    TradeWS: dict(price=Decimal('5541.20000'), volume=Decimal('0.15850568'), time=1534614057.321597,
+                  side='s', orderType='l', misc=''),
+}
+
+
+def measure(build, messages):
+    """ bytes and objects still allocated per message, peak bytes per message (with temporary copies), time """
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    records = [build() for _ in range(messages)]
+    elapsed = time.perf_counter() - start
+    objects = sys.getallocatedblocks() - blocks
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(records) == messages
+    return current / messages, objects / messages, peak / messages, elapsed
+
+
+def bench(messages: int = 100000):
+    print(f"{messages} messages per record type")
+    print(f"{'':<24}{'bytes/msg':>12}{'objects/msg':>13}{'peak/msg':>10}{'time':>9}")
+    for record_cls, values in samples.items():
+        before = legacy(record_cls)
+        for name, build in [
+            ('before', lambda: before(**values)('XBT/EUR')),
+            ('after', lambda: record_cls(**values)('XBT/EUR')),
+        ]:
+            size, objects, peak, elapsed = measure(build, messages)
+            print(f"{record_cls.__name__ + ' ' + name:<24}{size:>12.0f}{objects:>13.1f}{peak:>10.0f}{elapsed:>8.2f}s")
+
+
+if __name__ == '__main__':
+    bench(*(int(a) for a in sys.argv[1:]))